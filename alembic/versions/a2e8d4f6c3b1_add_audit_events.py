@@ -0,0 +1,46 @@
+"""Add audit events
+
+Revision ID: a2e8d4f6c3b1
+Revises: f7c1d5b3a9e2
+Create Date: 2026-10-20 09:30:00.000000
+
+Creates ``audit_events``, the append-only trail the audit writer flushes
+batches into, indexed by ``occurred_at`` and by ``(actor_id, occurred_at)``
+for a user's history. The trail lives on the primary database only, so
+shards (no ``users`` table) are left alone, as are databases that have the
+table already.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2e8d4f6c3b1'
+down_revision = 'f7c1d5b3a9e2'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("users") and not _has_table("audit_events"):
+        op.create_table(
+            "audit_events",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("occurred_at", sa.DateTime(), nullable=False),
+            sa.Column("action", sa.String(length=50), nullable=False),
+            sa.Column("actor_id", sa.Uuid(), nullable=True),
+            sa.Column("subject_id", sa.Uuid(), nullable=True),
+            sa.Column("details", sa.String(), nullable=True),
+        )
+        op.create_index("ix_audit_events_occurred_at", "audit_events", ["occurred_at"])
+        op.create_index(
+            "ix_audit_events_actor_id_occurred_at", "audit_events", ["actor_id", "occurred_at"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("audit_events", if_exists=True)
@@ -0,0 +1,223 @@
+"""Partition tasks by hash of user_id
+
+Revision ID: a3f1c9d2e7b4
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+Converts an existing plain ``tasks`` table on Postgres into one hash-partitioned
+by ``user_id``, while the app keeps serving:
+
+1. ``tasks_partitioned`` is created with the same columns, indexes and foreign
+   key, its primary key widened to ``(id, user_id)``, plus its partitions.
+2. A trigger on ``tasks`` mirrors every insert, update and delete into it.
+3. Existing rows are copied in batches of ``batch_size``, each in its own
+   transaction. Rows are read ``FOR SHARE`` so a concurrent update either
+   lands before the copy (and is read by it) or after it (and is mirrored by
+   the trigger); ``ON CONFLICT DO NOTHING`` skips rows the trigger already
+   copied.
+4. In one short transaction the tables swap names and the trigger is dropped.
+   The old table is kept as ``tasks_unpartitioned`` with ``keep_old=true``.
+
+Options are passed with ``-x``::
+
+    alembic -x partitions=16 -x batch_size=5000 -x keep_old=false upgrade head
+
+``partitions`` defaults to ``TASK_PARTITIONS``. Nothing happens on other
+databases, when ``tasks`` doesn't exist yet (``create_tables`` then creates it
+partitioned) or is partitioned already. Run it once per shard by pointing
+``DATABASE_URL`` at each one.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.core.config import settings
+from app.infrastructure.persistence.partitioning import hash_partition_ddl
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e7b4'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TABLE = "tasks"
+NEW_TABLE = "tasks_partitioned"
+OLD_TABLE = "tasks_unpartitioned"
+MIRROR_FUNCTION = "tasks_mirror_to_partitioned"
+MIRROR_TRIGGER = "tasks_mirror_to_partitioned"
+
+
+def _options():
+    options = context.get_x_argument(as_dictionary=True)
+    return (
+        int(options.get("partitions", settings.task_partitions)),
+        int(options.get("batch_size", 5000)),
+        options.get("keep_old", "false").lower() in ("1", "true", "yes"),
+    )
+
+
+def _relkind(connection, table):
+    return connection.execute(
+        sa.text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+        {"table": table},
+    ).scalar()
+
+
+def _columns(connection, table):
+    return connection.execute(
+        sa.text(
+            "SELECT attname FROM pg_attribute "
+            "WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped "
+            "ORDER BY attnum"
+        ),
+        {"table": table},
+    ).scalars().all()
+
+
+def _indexes(connection, table):
+    """``(name, definition)`` of every index but the primary key."""
+    return connection.execute(
+        sa.text(
+            "SELECT c.relname, pg_get_indexdef(i.indexrelid) FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass(:table) AND NOT i.indisprimary "
+            "ORDER BY c.relname"
+        ),
+        {"table": table},
+    ).all()
+
+
+def _foreign_keys(connection, table):
+    return connection.execute(
+        sa.text(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = to_regclass(:table) AND contype = 'f' ORDER BY conname"
+        ),
+        {"table": table},
+    ).all()
+
+
+def _copy_structure(connection, source, target, partition_sql):
+    """Create ``target`` like ``source``; index names get a ``_new`` suffix."""
+    connection.execute(sa.text(
+        f"CREATE TABLE {target} (LIKE {source} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        f"{partition_sql}"
+    ))
+    connection.execute(sa.text(f"ALTER TABLE {target} ADD CONSTRAINT {target}_pkey PRIMARY KEY (id, user_id)"))
+    for name, definition in _foreign_keys(connection, source):
+        connection.execute(sa.text(f"ALTER TABLE {target} ADD CONSTRAINT {name}_new {definition}"))
+    renamed = []
+    for name, definition in _indexes(connection, source):
+        head, _, tail = definition.partition(" ON ")
+        tail = tail.split(" USING ", 1)[1]
+        prefix = head[: -len(name)]
+        connection.execute(sa.text(f"{prefix}{name}_new ON {target} USING {tail}"))
+        renamed.append(name)
+    return renamed
+
+
+def _swap(connection, indexes, foreign_keys, keep_old):
+    """Give ``NEW_TABLE`` the name, index and constraint names of ``TABLE``."""
+    connection.execute(sa.text(f"ALTER TABLE {TABLE} RENAME TO {OLD_TABLE}"))
+    connection.execute(sa.text(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {TABLE}_pkey TO {OLD_TABLE}_pkey"))
+    for name in indexes:
+        connection.execute(sa.text(f"ALTER INDEX {name} RENAME TO {name}_old"))
+    for name in foreign_keys:
+        connection.execute(sa.text(f"ALTER TABLE {OLD_TABLE} RENAME CONSTRAINT {name} TO {name}_old"))
+
+    connection.execute(sa.text(f"ALTER TABLE {NEW_TABLE} RENAME TO {TABLE}"))
+    connection.execute(sa.text(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {NEW_TABLE}_pkey TO {TABLE}_pkey"))
+    for name in indexes:
+        connection.execute(sa.text(f"ALTER INDEX {name}_new RENAME TO {name}"))
+    for name in foreign_keys:
+        connection.execute(sa.text(f"ALTER TABLE {TABLE} RENAME CONSTRAINT {name}_new TO {name}"))
+
+    if not keep_old:
+        connection.execute(sa.text(f"DROP TABLE {OLD_TABLE}"))
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    partitions, batch_size, keep_old = _options()
+    if connection.dialect.name != "postgresql" or partitions < 1:
+        return
+    if _relkind(connection, TABLE) != "r":
+        return
+
+    columns = _columns(connection, TABLE)
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"NEW.{column}" for column in columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns)
+    foreign_keys = [name for name, _ in _foreign_keys(connection, TABLE)]
+
+    op.execute(f"DROP TABLE IF EXISTS {NEW_TABLE}")
+    indexes = _copy_structure(connection, TABLE, NEW_TABLE, " PARTITION BY HASH (user_id)")
+    for statement in hash_partition_ddl(TABLE, partitions, parent=NEW_TABLE):
+        op.execute(statement)
+
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION {MIRROR_FUNCTION}() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                IF TG_OP = 'DELETE' OR OLD.user_id IS DISTINCT FROM NEW.user_id THEN
+                    DELETE FROM {NEW_TABLE} WHERE id = OLD.id AND user_id = OLD.user_id;
+                END IF;
+                IF TG_OP = 'DELETE' THEN
+                    RETURN OLD;
+                END IF;
+            END IF;
+            INSERT INTO {NEW_TABLE} ({column_list}) VALUES ({new_values})
+            ON CONFLICT (id, user_id) DO UPDATE SET {updates};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(
+        f"CREATE TRIGGER {MIRROR_TRIGGER} AFTER INSERT OR UPDATE OR DELETE ON {TABLE} "
+        f"FOR EACH ROW EXECUTE FUNCTION {MIRROR_FUNCTION}()"
+    )
+
+    # Commit the trigger before copying, and let every batch commit on its
+    # own: each copy statement is a transaction of its own in autocommit mode.
+    copy = sa.text(f"""
+        WITH batch AS (
+            SELECT {column_list} FROM {TABLE}
+            WHERE id > CAST(:last_id AS uuid)
+            ORDER BY id
+            LIMIT :batch_size
+            FOR SHARE
+        ), copied AS (
+            INSERT INTO {NEW_TABLE} ({column_list})
+            SELECT {column_list} FROM batch
+            ON CONFLICT DO NOTHING
+        )
+        SELECT count(*), (SELECT id FROM batch ORDER BY id DESC LIMIT 1) FROM batch
+    """)
+    with op.get_context().autocommit_block():
+        last_id = "00000000-0000-0000-0000-000000000000"
+        while True:
+            copied, last_id = connection.execute(
+                copy, {"last_id": str(last_id), "batch_size": batch_size}
+            ).one()
+            if copied < batch_size:
+                break
+
+    # Back in a transaction: the swap is all-or-nothing.
+    op.execute(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE")
+    op.execute(f"DROP TRIGGER {MIRROR_TRIGGER} ON {TABLE}")
+    op.execute(f"DROP FUNCTION {MIRROR_FUNCTION}()")
+    _swap(connection, indexes, foreign_keys, keep_old)
+
+
+def downgrade() -> None:
+    """Copy the rows back into a plain table; writes are blocked meanwhile."""
+    connection = op.get_bind()
+    if connection.dialect.name != "postgresql" or _relkind(connection, TABLE) != "p":
+        return
+    foreign_keys = [name for name, _ in _foreign_keys(connection, TABLE)]
+
+    op.execute(f"LOCK TABLE {TABLE} IN EXCLUSIVE MODE")
+    op.execute(f"DROP TABLE IF EXISTS {NEW_TABLE}")
+    indexes = _copy_structure(connection, TABLE, NEW_TABLE, "")
+    op.execute(f"INSERT INTO {NEW_TABLE} SELECT * FROM {TABLE}")
+    _swap(connection, indexes, foreign_keys, keep_old=False)
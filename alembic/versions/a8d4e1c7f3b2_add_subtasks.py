@@ -0,0 +1,56 @@
+"""Add subtasks
+
+Revision ID: a8d4e1c7f3b2
+Revises: f2c9a7e4b8d3
+Create Date: 2026-10-19 20:00:00.000000
+
+Adds ``parent_id`` and the cached ``child_count`` to ``tasks`` and
+``tasks_archive`` (the archiver copies every task column), and the
+``(user_id, parent_id)`` index the subtree queries step through. Existing
+tasks have no parent; ``child_count`` gets a constant default, which
+Postgres stores without rewriting the table. On a partitioned ``tasks`` the
+index is created on every partition.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d4e1c7f3b2'
+down_revision = 'f2c9a7e4b8d3'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        if "parent_id" not in existing:
+            op.add_column(table, sa.Column("parent_id", sa.Uuid(), nullable=True))
+        if "child_count" not in existing:
+            op.add_column(table, sa.Column("child_count", sa.Integer(), nullable=False, server_default="0"))
+    if _has_table("tasks"):
+        op.create_index(
+            "ix_tasks_user_id_parent_id",
+            "tasks",
+            ["user_id", "parent_id"],
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_id_parent_id", table_name="tasks", if_exists=True)
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        with op.batch_alter_table(table) as batch:
+            for column in ("child_count", "parent_id"):
+                if column in existing:
+                    batch.drop_column(column)
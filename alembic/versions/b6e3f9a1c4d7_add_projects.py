@@ -0,0 +1,77 @@
+"""Add shared projects
+
+Revision ID: b6e3f9a1c4d7
+Revises: a8d4e1c7f3b2
+Create Date: 2026-10-19 22:00:00.000000
+
+Creates ``projects`` and ``project_members``, keyed by ``(project_id,
+user_id)`` for a project's members and indexed by ``(user_id, project_id)``
+for a user's memberships. Adds ``project_id`` to ``tasks`` and
+``tasks_archive`` (the archiver copies every task column), and a partial
+``(project_id, id)`` index over the tasks that have one. On a partitioned
+``tasks`` the index is created on every partition. Shards only get the task
+columns: projects stay on the primary database, next to the users.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e3f9a1c4d7'
+down_revision = 'a8d4e1c7f3b2'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("users") and not _has_table("projects"):
+        op.create_table(
+            "projects",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("owner_id", sa.Uuid(), sa.ForeignKey("users.id"), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+    if _has_table("users") and not _has_table("project_members"):
+        op.create_table(
+            "project_members",
+            sa.Column("project_id", sa.Uuid(), sa.ForeignKey("projects.id"), primary_key=True),
+            sa.Column("user_id", sa.Uuid(), sa.ForeignKey("users.id"), primary_key=True),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_project_members_user_id_project_id", "project_members", ["user_id", "project_id"]
+        )
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        if "project_id" not in existing:
+            op.add_column(table, sa.Column("project_id", sa.Uuid(), nullable=True))
+    if _has_table("tasks"):
+        op.create_index(
+            "ix_tasks_project_id_id",
+            "tasks",
+            ["project_id", "id"],
+            postgresql_where=sa.text("project_id IS NOT NULL"),
+            sqlite_where=sa.text("project_id IS NOT NULL"),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_project_id_id", table_name="tasks", if_exists=True)
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        if "project_id" in existing:
+            with op.batch_alter_table(table) as batch:
+                batch.drop_column("project_id")
+    op.drop_table("project_members", if_exists=True)
+    op.drop_table("projects", if_exists=True)
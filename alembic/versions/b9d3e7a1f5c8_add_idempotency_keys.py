@@ -0,0 +1,46 @@
+"""Add idempotency keys
+
+Revision ID: b9d3e7a1f5c8
+Revises: a2e8d4f6c3b1
+Create Date: 2026-10-20 09:40:00.000000
+
+Creates ``idempotency_keys``, the stored outcome of each ``Idempotency-Key``
+request, unique per ``(scope, key)`` and indexed by ``expires_at`` for the
+sweep. The keys live on the primary database only, so shards (no ``users``
+table) are left alone, as are databases that have the table already.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d3e7a1f5c8'
+down_revision = 'a2e8d4f6c3b1'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("users") and not _has_table("idempotency_keys"):
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("scope", sa.String(length=100), nullable=False),
+            sa.Column("key", sa.String(length=255), nullable=False),
+            sa.Column("fingerprint", sa.String(length=64), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("response_status", sa.Integer(), nullable=True),
+            sa.Column("response_body", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),
+        )
+        op.create_index("ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("idempotency_keys", if_exists=True)
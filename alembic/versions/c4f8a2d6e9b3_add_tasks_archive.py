@@ -0,0 +1,70 @@
+"""Add the completed task archive
+
+Revision ID: c4f8a2d6e9b3
+Revises: b9d3e7a1f5c8
+Create Date: 2026-10-20 09:50:00.000000
+
+Creates ``tasks_archive``, where the archiver moves old completed tasks,
+with every task column as of this revision, and the partial index over
+completed tasks the archiver finds them through. On a partitioned ``tasks``
+the index is created on every partition. The ``taskstatus`` type ``tasks``
+created on Postgres is reused. Nothing happens for what exists already.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.domain.constants.TASK_STATUS import TaskStatus
+from app.infrastructure.persistence.entities_configuration import RankKey
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f8a2d6e9b3'
+down_revision = 'b9d3e7a1f5c8'
+branch_labels = None
+depends_on = None
+
+TaskStatusType = sa.Enum(TaskStatus, name="taskstatus").with_variant(
+    postgresql.ENUM(TaskStatus, name="taskstatus", create_type=False), "postgresql"
+)
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("tasks"):
+        op.create_index(
+            "ix_tasks_completed_updated_at",
+            "tasks",
+            ["updated_at"],
+            postgresql_where=sa.text("status = 'COMPLETED'"),
+            sqlite_where=sa.text("status = 'COMPLETED'"),
+            if_not_exists=True,
+        )
+    if not _has_table("tasks_archive"):
+        op.create_table(
+            "tasks_archive",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("title", sa.String(length=200), nullable=False),
+            sa.Column("description", sa.String(length=1000), nullable=True),
+            sa.Column("status", TaskStatusType, nullable=False),
+            sa.Column("creation_date", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("due_at", sa.DateTime(), nullable=True),
+            sa.Column("remind_at", sa.DateTime(), nullable=True),
+            sa.Column("reminded_at", sa.DateTime(), nullable=True),
+            sa.Column("position", RankKey, nullable=True),
+            sa.Column("parent_id", sa.Uuid(), nullable=True),
+            sa.Column("child_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("project_id", sa.Uuid(), nullable=True),
+            sa.Column("archived_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ix_tasks_archive_user_id_id", "tasks_archive", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("tasks_archive", if_exists=True)
+    op.drop_index("ix_tasks_completed_updated_at", table_name="tasks", if_exists=True)
@@ -0,0 +1,60 @@
+"""Add due dates and reminders to tasks
+
+Revision ID: c7e2a4b9d1f0
+Revises: a3f1c9d2e7b4
+Create Date: 2026-10-19 14:00:00.000000
+
+Adds ``due_at``, ``remind_at`` and ``reminded_at`` to ``tasks`` and
+``tasks_archive`` (the archiver copies every task column), and the partial
+index the reminder scheduler reads its window from. The new columns are
+nullable without defaults, so adding them doesn't rewrite either table.
+On a partitioned ``tasks`` the index is created on every partition.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.infrastructure.persistence.entities_configuration import PENDING_REMINDER
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2a4b9d1f0'
+down_revision = 'a3f1c9d2e7b4'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("due_at", "remind_at", "reminded_at")
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        for column in COLUMNS:
+            if column not in existing:
+                op.add_column(table, sa.Column(column, sa.DateTime(), nullable=True))
+    if _has_table("tasks"):
+        op.create_index(
+            "ix_tasks_pending_reminders",
+            "tasks",
+            ["remind_at"],
+            postgresql_where=sa.text(PENDING_REMINDER),
+            sqlite_where=sa.text(PENDING_REMINDER),
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_pending_reminders", table_name="tasks", if_exists=True)
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        with op.batch_alter_table(table) as batch:
+            for column in COLUMNS:
+                if column in existing:
+                    batch.drop_column(column)
@@ -0,0 +1,47 @@
+"""Add delta sync tombstones and index
+
+Revision ID: d4a7c2e9f1b5
+Revises: b6e3f9a1c4d7
+Create Date: 2026-10-20 09:00:00.000000
+
+Creates ``task_tombstones``, indexed by ``(user_id, deleted_at)``, and the
+``(user_id, updated_at)`` index on ``tasks`` that a delta sync reads the
+changes since a cursor from. On a partitioned ``tasks`` the index is created
+on every partition. Nothing happens for what exists already, e.g. created by
+``create_tables``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7c2e9f1b5'
+down_revision = 'b6e3f9a1c4d7'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("tasks"):
+        op.create_index(
+            "ix_tasks_user_id_updated_at", "tasks", ["user_id", "updated_at"], if_not_exists=True
+        )
+    if not _has_table("task_tombstones"):
+        op.create_table(
+            "task_tombstones",
+            sa.Column("task_id", sa.Uuid(), primary_key=True),
+            sa.Column("user_id", sa.Uuid(), nullable=False),
+            sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_task_tombstones_user_id_deleted_at", "task_tombstones", ["user_id", "deleted_at"]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("task_tombstones", if_exists=True)
+    op.drop_index("ix_tasks_user_id_updated_at", table_name="tasks", if_exists=True)
@@ -0,0 +1,91 @@
+"""Add a manual order to tasks
+
+Revision ID: e5b8d3f2a6c1
+Revises: c7e2a4b9d1f0
+Create Date: 2026-10-19 16:00:00.000000
+
+Adds the ``position`` rank key to ``tasks`` and ``tasks_archive`` (the
+archiver copies every task column), with the ``C`` collation on Postgres so
+keys compare by code point. Existing tasks get evenly spread keys in
+creation order, one user at a time, and then the ``(user_id, position, id)``
+index the ordered listing reads. On a partitioned ``tasks`` the index is
+created on every partition.
+"""
+from itertools import groupby
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.infrastructure.common.rank_keys import n_keys_between
+from app.infrastructure.persistence.entities_configuration import RankKey
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8d3f2a6c1'
+down_revision = 'c7e2a4b9d1f0'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def _backfill(connection):
+    tasks = sa.table(
+        "tasks",
+        sa.column("id", sa.Uuid()),
+        sa.column("user_id", sa.Uuid()),
+        sa.column("creation_date", sa.DateTime()),
+        sa.column("position", RankKey),
+    )
+    rows = connection.execute(
+        sa.select(tasks.c.id, tasks.c.user_id)
+        .where(tasks.c.position.is_(None))
+        .order_by(tasks.c.user_id, tasks.c.creation_date, tasks.c.id)
+    ).fetchall()
+    statement = (
+        sa.update(tasks)
+        .where(tasks.c.user_id == sa.bindparam("owner"), tasks.c.id == sa.bindparam("task_id"))
+        .values(position=sa.bindparam("new_position"))
+    )
+    batch = []
+    for user_id, user_rows in groupby(rows, key=lambda row: row.user_id):
+        user_rows = list(user_rows)
+        for row, key in zip(user_rows, n_keys_between(None, None, len(user_rows))):
+            batch.append({"owner": user_id, "task_id": row.id, "new_position": key})
+        if len(batch) >= BATCH_SIZE:
+            connection.execute(statement, batch)
+            batch = []
+    if batch:
+        connection.execute(statement, batch)
+
+
+def upgrade() -> None:
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        if "position" not in existing:
+            op.add_column(table, sa.Column("position", RankKey, nullable=True))
+    if _has_table("tasks"):
+        _backfill(op.get_bind())
+        op.create_index(
+            "ix_tasks_user_id_position",
+            "tasks",
+            ["user_id", "position", "id"],
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_id_position", table_name="tasks", if_exists=True)
+    for table in ("tasks", "tasks_archive"):
+        if not _has_table(table):
+            continue
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns(table)}
+        if "position" in existing:
+            with op.batch_alter_table(table) as batch:
+                batch.drop_column("position")
@@ -0,0 +1,42 @@
+"""Add task counts and the keyset anchor index
+
+Revision ID: e9b3f6a2d8c4
+Revises: d4a7c2e9f1b5
+Create Date: 2026-10-20 09:10:00.000000
+
+Creates ``task_counts``, the per-user counter that creates and deletes keep
+up to date, and the ``(user_id, id)`` index page-number pagination counts
+and seeks through. Counters start empty: the repository counts a user's
+tasks once, on their first create or delete after the upgrade. On a
+partitioned ``tasks`` the index is created on every partition.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b3f6a2d8c4'
+down_revision = 'd4a7c2e9f1b5'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("tasks"):
+        op.create_index("ix_tasks_user_id_id", "tasks", ["user_id", "id"], if_not_exists=True)
+    if not _has_table("task_counts"):
+        op.create_table(
+            "task_counts",
+            sa.Column("user_id", sa.Uuid(), primary_key=True),
+            sa.Column("task_count", sa.Integer(), nullable=False),
+            sa.Column("version", sa.Integer(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("task_counts", if_exists=True)
+    op.drop_index("ix_tasks_user_id_id", table_name="tasks", if_exists=True)
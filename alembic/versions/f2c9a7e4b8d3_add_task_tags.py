@@ -0,0 +1,59 @@
+"""Add task tags
+
+Revision ID: f2c9a7e4b8d3
+Revises: e5b8d3f2a6c1
+Create Date: 2026-10-19 18:00:00.000000
+
+Creates ``tags``, one row per user and lowercased name, and the
+``task_tags`` links. ``ux_tags_user_id_name`` uses the ``C`` collation on
+Postgres so autocomplete prefixes are index ranges; ``task_tags`` is keyed
+by ``(task_id, tag_id)`` for loading a page's tags and indexed by
+``(tag_id, task_id)`` for tag filters. Nothing happens for tables that
+exist already, e.g. created by ``create_tables``.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.infrastructure.persistence.entities_configuration import TagName
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c9a7e4b8d3'
+down_revision = 'e5b8d3f2a6c1'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table("tags"):
+        # Shards have no users table to reference.
+        references_users = _has_table("users")
+        op.create_table(
+            "tags",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column(
+                "user_id",
+                sa.Uuid(),
+                *([sa.ForeignKey("users.id")] if references_users else []),
+                nullable=False,
+            ),
+            sa.Column("name", TagName, nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index("ux_tags_user_id_name", "tags", ["user_id", "name"], unique=True)
+    if not _has_table("task_tags"):
+        op.create_table(
+            "task_tags",
+            sa.Column("task_id", sa.Uuid(), primary_key=True),
+            sa.Column("tag_id", sa.Uuid(), primary_key=True),
+        )
+        op.create_index("ix_task_tags_tag_id_task_id", "task_tags", ["tag_id", "task_id"])
+
+
+def downgrade() -> None:
+    op.drop_table("task_tags")
+    op.drop_table("tags")
@@ -0,0 +1,46 @@
+"""Add pending jobs
+
+Revision ID: f7c1d5b3a9e2
+Revises: e9b3f6a2d8c4
+Create Date: 2026-10-20 09:20:00.000000
+
+Creates ``pending_jobs``, where durable background jobs are written in the
+transaction that enqueues them, with the ``claimed_until`` index workers
+find expired leases through. Jobs run against the primary database only,
+so shards (no ``users`` table) are left alone, as are databases that have
+the table already.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7c1d5b3a9e2'
+down_revision = 'e9b3f6a2d8c4'
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if _has_table("users") and not _has_table("pending_jobs"):
+        op.create_table(
+            "pending_jobs",
+            sa.Column("id", sa.Uuid(), primary_key=True),
+            sa.Column("name", sa.String(length=100), nullable=False),
+            sa.Column("payload", sa.String(), nullable=False),
+            sa.Column("attempts", sa.Integer(), nullable=False),
+            sa.Column("run_at", sa.DateTime(), nullable=False),
+            sa.Column("claimed_until", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("last_error", sa.String(length=1000), nullable=True),
+            sa.Column("failed_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_pending_jobs_claimed_until", "pending_jobs", ["claimed_until"])
+
+
+def downgrade() -> None:
+    op.drop_table("pending_jobs", if_exists=True)
@@ -31,3 +31,27 @@ class InvalidCredentials(ApplicationException):
     
     def __init__(self, message: str = "Invalid credentials"):
         super().__init__(message)
+
+
+class SyncTokenExpired(ApplicationException):
+
+    def __init__(self):
+        super().__init__("Sync token expired, a full resync is required")
+
+
+class InvalidSyncToken(ApplicationException):
+
+    def __init__(self):
+        super().__init__("Invalid sync token")
+
+
+class ProjectNotFound(ApplicationException):
+
+    def __init__(self):
+        super().__init__("Project not found")
+
+
+class PermissionDenied(ApplicationException):
+
+    def __init__(self, message: str = "Insufficient permissions"):
+        super().__init__(message)
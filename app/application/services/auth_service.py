@@ -1,6 +1,9 @@
 from app.domain.unit_of_work import IUnitOfWork
 from app.infrastructure.dtos.user_dtos import SignUpDto, SignInDto, RefreshTokenResponseDto, UserDto
 from app.infrastructure.common.auth_service import AuthService as InfrastructureAuthService
+from app.infrastructure.jobs.handlers import PURGE_REFRESH_TOKENS
+from app.infrastructure.audit.audit_log import audit_event, record_audit_events
+from app.infrastructure.exceptions import InvalidCredentials as InfrastructureInvalidCredentials
 from uuid import UUID
 from app.application.exceptions import AuthenticationFailed, InvalidCredentials, ServiceException
 from sqlmodel import Session
@@ -19,7 +22,6 @@ class AuthService:
                     user_sign_up_request.email,
                     user_sign_up_request.password
                 )
-                uow.commit()
                 
                 user_dto = UserDto(
                     id=saved_user.id,
@@ -29,6 +31,9 @@ class AuthService:
                     updated_at=saved_user.updated_at
                 )
                 tokens = self._infrastructure_auth_service.create_tokens_for_user(user_dto)
+                uow.audit("auth.signed_up", actor_id=saved_user.id)
+                # The user and its refresh token are committed together.
+                uow.commit()
                 
                 return tokens
             except Exception as e:
@@ -37,24 +42,21 @@ class AuthService:
     def sign_in(self, user_sign_in_request: SignInDto) -> dict:
         with self._uow as uow:
             try:
-                user = uow.users.sign_in(
+                user_id, tokens = self._infrastructure_auth_service.sign_in(
                     user_sign_in_request.email,
                     user_sign_in_request.password
                 )
-                
-               
-                user_dto = UserDto(
-                    id=user.id,
-                    name=user.name,
-                    email=user.email,
-                    created_at=user.created_at,
-                    updated_at=user.updated_at
-                )
-                tokens = self._infrastructure_auth_service.create_tokens_for_user(user_dto)
+                # Every sign-in adds a refresh token; old ones are swept afterwards.
+                uow.enqueue(PURGE_REFRESH_TOKENS, user_id=user_id)
+                uow.audit("auth.signed_in", actor_id=user_id)
+                uow.commit()
                 
                 return tokens
             except InvalidCredentials:
                 raise
+            except InfrastructureInvalidCredentials as e:
+                record_audit_events([audit_event("auth.sign_in_failed", email=user_sign_in_request.email)])
+                raise ServiceException(f"Sign in failed: {str(e)}")
             except Exception as e:
                 raise ServiceException(f"Sign in failed: {str(e)}")
     
@@ -0,0 +1,101 @@
+from uuid import UUID
+from app.domain.unit_of_work import IUnitOfWork
+from app.domain.constants.PROJECT_ROLE import ProjectRole
+from app.domain.entities.projects import Project
+from app.infrastructure.dtos.project_dtos import CreateProjectDto, ProjectDto, ProjectMemberDto
+from app.infrastructure.dtos.task_dtos import TaskDto
+from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult, CursorPaginationHelper
+from app.application.exceptions import PermissionDenied, ProjectNotFound, ServiceException, UserNotFound
+
+class ProjectService:
+    def __init__(self, uow: IUnitOfWork):
+        self._uow = uow
+
+    def create_project(self, project_dto: CreateProjectDto) -> ProjectDto:
+        with self._uow as uow:
+            if not uow.users.get_by_id(project_dto.user_id):
+                raise UserNotFound()
+            project = uow.projects.create(Project(name=project_dto.name, owner_id=project_dto.user_id))
+            uow.audit("project.created", actor_id=project.owner_id, subject_id=project.id)
+            uow.commit()
+            return self._domain_to_dto(project, ProjectRole.OWNER)
+
+    def get_project(self, project_id: UUID, user_id: UUID) -> ProjectDto:
+        with self._uow as uow:
+            role = self._role(uow, project_id, user_id)
+            project = uow.projects.get_by_id(project_id)
+            if not project:
+                raise ProjectNotFound()
+            return self._domain_to_dto(project, role)
+
+    def get_user_projects(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectDto]:
+        if not user_id:
+            raise ServiceException("User ID is required")
+
+        with self._uow as uow:
+            return uow.projects.get_user_projects_paginated(user_id, pagination_request)
+
+    def get_members(self, project_id: UUID, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectMemberDto]:
+        with self._uow as uow:
+            self._role(uow, project_id, user_id)
+            return uow.projects.get_members_paginated(project_id, pagination_request)
+
+    def add_member(self, project_id: UUID, user_id: UUID, member_id: UUID) -> ProjectMemberDto:
+        with self._uow as uow:
+            if self._role(uow, project_id, user_id) != ProjectRole.OWNER:
+                raise PermissionDenied("Only the project owner can add members")
+            if not uow.users.get_by_id(member_id):
+                raise UserNotFound()
+            member = uow.projects.add_member(project_id, member_id, ProjectRole.MEMBER)
+            uow.audit("project.member_added", actor_id=user_id, subject_id=project_id, member_id=str(member_id))
+            uow.commit()
+            return member
+
+    def remove_member(self, project_id: UUID, user_id: UUID, member_id: UUID) -> None:
+        """Owners remove members; members remove themselves, i.e. leave."""
+        with self._uow as uow:
+            role = self._role(uow, project_id, user_id)
+            if member_id == user_id and role == ProjectRole.OWNER:
+                raise ServiceException("The project owner can't leave the project")
+            if member_id != user_id and role != ProjectRole.OWNER:
+                raise PermissionDenied("Only the project owner can remove members")
+            if not uow.projects.remove_member(project_id, member_id):
+                raise UserNotFound()
+            uow.audit("project.member_removed", actor_id=user_id, subject_id=project_id, member_id=str(member_id))
+            uow.commit()
+
+    def get_project_tasks(self, project_id: UUID, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        with self._uow as uow:
+            self._role(uow, project_id, user_id)
+            # The tasks are on their owners' shards when sharding is on: the
+            # same keyset page is read from each and merged.
+            pages = [
+                tasks.get_project_tasks_paginated(project_id, pagination_request)
+                for tasks in uow.task_repositories()
+            ]
+            if len(pages) == 1:
+                return pages[0]
+            return CursorPaginationHelper.merge_pages(
+                pages,
+                key_selector="id",
+                cursor=pagination_request.cursor,
+                page_size=pagination_request.page_size,
+                direction=pagination_request.direction
+            )
+
+    @staticmethod
+    def _role(uow: IUnitOfWork, project_id: UUID, user_id: UUID) -> ProjectRole:
+        # Non-members get the same answer as for a project that doesn't exist.
+        role = uow.projects.get_memberships(user_id).get(project_id)
+        if role is None:
+            raise ProjectNotFound()
+        return role
+
+    def _domain_to_dto(self, project: Project, role: ProjectRole) -> ProjectDto:
+        return ProjectDto(
+            id=project.id,
+            name=project.name,
+            owner_id=project.owner_id,
+            role=role,
+            created_at=project.created_at
+        )
@@ -1,9 +1,17 @@
 from uuid import UUID
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, List, Optional
+from app.core.config import settings
 from app.domain.unit_of_work import IUnitOfWork
 from app.domain.entities.tasks import Task
-from app.infrastructure.dtos.task_dtos import CreateTaskDto, UpdateTaskDto, TaskDto, TaskResponseDto
-from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult
-from app.application.exceptions import TaskNotFound, ServiceException
+from app.infrastructure.dtos.task_dtos import (
+    BatchMode, BatchOperationDto, BatchOperationResultDto, BatchOperationStatus, BatchOperationType, BatchRequestDto, BatchResultDto,
+    CreateTaskDto, UpdateTaskDto, TagDto, TaskDto, TaskResponseDto, TaskChangesDto, normalize_tags
+)
+from app.infrastructure.common.sync_watermark import SyncWatermark
+from app.infrastructure.jobs.handlers import PURGE_TOMBSTONES, REBALANCE_POSITIONS
+from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult, PaginationRequest, PagedResult
+from app.application.exceptions import ApplicationException, TaskNotFound, ServiceException, InvalidSyncToken, SyncTokenExpired
 
 class TaskService:
     def __init__(self, uow: IUnitOfWork):
@@ -11,19 +19,18 @@ class TaskService:
 
     def create_task(self, task_dto: CreateTaskDto) -> TaskResponseDto:
         with self._uow as uow:
-            task = Task(
-                title=task_dto.title, 
-                description=task_dto.description, 
-                status=task_dto.status, 
-                user_id=task_dto.user_id
-            )
-            saved_task = uow.tasks.create(task)
+            saved_task = self._create(uow, task_dto)
             uow.commit()
             return self._domain_to_response_dto(saved_task)
 
-    def get_task_by_id(self, task_id: UUID, user_id: UUID) -> TaskResponseDto:
+    def get_task_by_id(self, task_id: UUID, user_id: UUID, fields: Optional[FrozenSet[str]] = None) -> TaskResponseDto:
         with self._uow as uow:
             try:
+                if fields is not None:
+                    task_dto = uow.tasks.get_fields_by_id(task_id, user_id, fields)
+                    if not task_dto:
+                        raise TaskNotFound()
+                    return task_dto
                 task = uow.tasks.get_by_id(task_id, user_id)
                 if not task:
                     raise TaskNotFound()
@@ -36,16 +43,7 @@ class TaskService:
     def update_task(self, task_update_dto: UpdateTaskDto, user_id: UUID) -> TaskResponseDto:
         with self._uow as uow:
             try:
-                task = uow.tasks.get_by_id(task_update_dto.id, user_id)
-                if not task:
-                    raise TaskNotFound()
-                
-                task.update_task(
-                    task_update_dto.title, 
-                    task_update_dto.description, 
-                    task_update_dto.status
-                )
-                updated_task = uow.tasks.update(task)
+                updated_task = self._update(uow, task_update_dto, user_id)
                 uow.commit()
                 return self._domain_to_response_dto(updated_task)
             except TaskNotFound:
@@ -56,22 +54,287 @@ class TaskService:
     def delete_task(self, task_id: UUID, user_id: UUID) -> None:
         with self._uow as uow:
             try:
-                task = uow.tasks.get_by_id(task_id, user_id)
-                if not task:
-                    raise TaskNotFound()
-                uow.tasks.delete(task_id)
+                self._delete(uow, task_id, user_id)
                 uow.commit()
             except TaskNotFound:
                 raise
             except Exception as e:
                 raise ServiceException(f"Failed to delete task: {str(e)}")
         
-    def get_all_tasks_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+    def complete_task(self, task_id: UUID, user_id: UUID, include_subtasks: bool = True) -> TaskResponseDto:
+        with self._uow as uow:
+            try:
+                self._complete(uow, task_id, user_id, include_subtasks)
+                uow.commit()
+                return self._domain_to_response_dto(uow.tasks.get_by_id(task_id, user_id))
+            except TaskNotFound:
+                raise
+            except Exception as e:
+                raise ServiceException(f"Failed to complete task: {str(e)}")
+
+    def get_subtasks(self, task_id: UUID, user_id: UUID) -> List[TaskDto]:
+        with self._uow as uow:
+            subtree = uow.tasks.get_subtree(task_id, user_id)
+            if not subtree:
+                raise TaskNotFound()
+            return subtree
+
+    def get_task_ancestors(self, task_id: UUID, user_id: UUID) -> List[TaskDto]:
+        with self._uow as uow:
+            if not uow.tasks.get_by_id(task_id, user_id):
+                raise TaskNotFound()
+            return uow.tasks.get_ancestors(task_id, user_id)
+
+    def move_task(self, task_id: UUID, user_id: UUID, after_id: Optional[UUID]) -> TaskResponseDto:
+        with self._uow as uow:
+            try:
+                moved_task = uow.tasks.move(task_id, user_id, after_id)
+                if len(moved_task.position) > settings.task_position_max_length:
+                    # Repeated moves into one gap lengthen its keys.
+                    uow.enqueue(REBALANCE_POSITIONS, user_id=user_id)
+                uow.audit("task.moved", actor_id=user_id, subject_id=task_id, after_id=after_id and str(after_id))
+                uow.commit()
+                return self._domain_to_response_dto(moved_task)
+            except TaskNotFound:
+                raise
+            except Exception as e:
+                raise ServiceException(f"Failed to move task: {str(e)}")
+
+    def get_tasks_by_position(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        if not user_id:
+            raise ServiceException("User ID is required")
+
+        with self._uow as uow:
+            return uow.tasks.get_all_paginated_by_position(user_id, pagination_request)
+
+    def get_all_tasks_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest, tags: Optional[List[str]] = None, fields: Optional[FrozenSet[str]] = None) -> CursorPagedResult[TaskDto]:
+        if not user_id:
+            raise ServiceException("User ID is required")
+        
+        with self._uow as uow:
+            return uow.tasks.get_all_paginated_by_cursor(user_id, pagination_request, normalize_tags(tags), fields)
+
+    def search_tags(self, user_id: UUID, prefix: str, limit: int) -> List[TagDto]:
+        with self._uow as uow:
+            return uow.tasks.search_tags(user_id, prefix.strip().lower(), limit)
+
+    def get_all_tasks_paginated(self, user_id: UUID, pagination_request: PaginationRequest, fields: Optional[FrozenSet[str]] = None) -> PagedResult[TaskDto]:
+        if not user_id:
+            raise ServiceException("User ID is required")
+        
+        with self._uow as uow:
+            return uow.tasks.get_all_paginated(user_id, pagination_request, fields)
+
+    def get_archived_tasks_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
         if not user_id:
             raise ServiceException("User ID is required")
         
         with self._uow as uow:
-            return uow.tasks.get_all_paginated_by_cursor(user_id, pagination_request)
+            return uow.tasks.get_archived_paginated_by_cursor(user_id, pagination_request)
+
+    def get_archived_task_by_id(self, task_id: UUID, user_id: UUID) -> TaskResponseDto:
+        with self._uow as uow:
+            task = uow.tasks.get_archived_by_id(task_id, user_id)
+            if not task:
+                raise TaskNotFound()
+            return self._domain_to_response_dto(task)
+
+    def get_task_changes(self, user_id: UUID, since_token: Optional[str], limit: int) -> TaskChangesDto:
+        now = datetime.now(timezone.utc)
+        since = None
+        if since_token:
+            try:
+                since = SyncWatermark.decode(since_token)
+            except ValueError:
+                raise InvalidSyncToken()
+            # Tombstones older than the retention window may be gone already.
+            retention = timedelta(days=settings.tombstone_retention_days)
+            if since.changed_at.replace(tzinfo=timezone.utc) < now - retention:
+                raise SyncTokenExpired()
+
+        until = now - timedelta(seconds=settings.sync_settle_seconds)
+        with self._uow as uow:
+            changes = uow.tasks.get_changes_since(user_id, since, until, limit)
+        if changes.next_token is None:
+            changes.next_token = since_token
+        return changes
+
+    def run_batch(self, batch_dto: BatchRequestDto) -> BatchResultDto:
+        """Run the batch's operations in order, in one transaction.
+
+        Atomic batches stop at the first failure and roll everything back;
+        best-effort ones put each operation in a savepoint, so a failure
+        undoes only that operation. Either way there is a single commit.
+        """
+        operations = batch_dto.operations
+        if len(operations) > settings.batch_max_operations:
+            raise ServiceException(f"A batch can have at most {settings.batch_max_operations} operations")
+
+        atomic = batch_dto.mode == BatchMode.ATOMIC
+        user_id = batch_dto.user_id
+        results: List[BatchOperationResultDto] = []
+        # ref -> id of the task a create in this batch made
+        refs: Dict[str, UUID] = {}
+        with self._uow as uow:
+            for index, operation in enumerate(operations):
+                result = BatchOperationResultDto(index=index, op=operation.op, status=BatchOperationStatus.OK, ref=operation.ref)
+                try:
+                    if atomic:
+                        result.task = self._run_operation(uow, operation, user_id, refs)
+                    else:
+                        with uow.savepoint():
+                            result.task = self._run_operation(uow, operation, user_id, refs)
+                except ApplicationException as e:
+                    result.status, result.error = BatchOperationStatus.FAILED, str(e)
+                except Exception as e:
+                    result.status, result.error = BatchOperationStatus.FAILED, f"Failed to {operation.op.value} task: {str(e)}"
+                results.append(result)
+                if result.status == BatchOperationStatus.FAILED and atomic:
+                    uow.rollback()
+                    return self._batch_result(batch_dto, results, committed=False)
+                if result.status == BatchOperationStatus.OK and operation.ref is not None:
+                    refs[operation.ref] = result.task.id
+            uow.commit()
+        return self._batch_result(batch_dto, results, committed=True)
+
+    def _run_operation(self, uow: IUnitOfWork, operation: BatchOperationDto, user_id: UUID, refs: Dict[str, UUID]) -> Optional[TaskResponseDto]:
+        if operation.op == BatchOperationType.CREATE:
+            if operation.ref is not None and operation.ref in refs:
+                raise ServiceException(f"Duplicate ref: {operation.ref}")
+            parent_id = operation.parent_id
+            if operation.parent_ref is not None:
+                parent_id = self._resolve_ref(refs, operation.parent_ref)
+            task = self._create(uow, CreateTaskDto(
+                title=operation.title,
+                description=operation.description,
+                status=operation.status,
+                user_id=user_id,
+                due_at=operation.due_at,
+                remind_at=operation.remind_at,
+                tags=operation.tags,
+                parent_id=parent_id,
+                project_id=operation.project_id
+            ))
+            return self._domain_to_response_dto(task)
+
+        task_id = operation.task_id
+        if operation.task_ref is not None:
+            task_id = self._resolve_ref(refs, operation.task_ref)
+        if operation.op == BatchOperationType.UPDATE:
+            task = self._update(uow, UpdateTaskDto(
+                id=task_id,
+                title=operation.title,
+                description=operation.description,
+                status=operation.status,
+                due_at=operation.due_at,
+                remind_at=operation.remind_at,
+                tags=operation.tags,
+                updated_at=datetime.now(timezone.utc)
+            ), user_id)
+            return self._domain_to_response_dto(task)
+        if operation.op == BatchOperationType.DELETE:
+            self._delete(uow, task_id, user_id)
+            return None
+        self._complete(uow, task_id, user_id, include_subtasks=True)
+        return self._domain_to_response_dto(uow.tasks.get_by_id(task_id, user_id))
+
+    @staticmethod
+    def _resolve_ref(refs: Dict[str, UUID], ref: str) -> UUID:
+        if ref not in refs:
+            raise ServiceException(f"Unknown ref: {ref}")
+        return refs[ref]
+
+    @staticmethod
+    def _batch_result(batch_dto: BatchRequestDto, results: List[BatchOperationResultDto], committed: bool) -> BatchResultDto:
+        if not committed:
+            # What ran before the failure was undone, and nothing after it ran.
+            for result in results[:-1]:
+                result.status, result.task = BatchOperationStatus.ROLLED_BACK, None
+            results += [
+                BatchOperationResultDto(index=index, op=operation.op, status=BatchOperationStatus.SKIPPED, ref=operation.ref)
+                for index, operation in enumerate(batch_dto.operations[len(results):], start=len(results))
+            ]
+        return BatchResultDto(
+            mode=batch_dto.mode,
+            committed=committed,
+            succeeded=sum(result.status == BatchOperationStatus.OK for result in results),
+            failed=sum(result.status == BatchOperationStatus.FAILED for result in results),
+            results=results
+        )
+
+    # The write operations, without the commit: the callers above commit,
+    # once per request or once per batch.
+
+    def _create(self, uow: IUnitOfWork, task_dto: CreateTaskDto) -> Task:
+        project_id = task_dto.project_id
+        if task_dto.parent_id is not None:
+            parent = self._check_parent(uow, task_dto.parent_id, task_dto.user_id)
+            if project_id is None:
+                project_id = parent.project_id
+            elif project_id != parent.project_id:
+                raise ServiceException("A subtask must be in its parent's project")
+        if project_id is not None and project_id not in uow.projects.get_memberships(task_dto.user_id):
+            raise ServiceException("Project not found")
+        task = Task(
+            title=task_dto.title, 
+            description=task_dto.description, 
+            status=task_dto.status, 
+            user_id=task_dto.user_id,
+            due_at=task_dto.due_at,
+            remind_at=task_dto.remind_at,
+            tags=task_dto.tags,
+            parent_id=task_dto.parent_id,
+            project_id=project_id
+        )
+        saved_task = uow.tasks.create(task)
+        uow.audit("task.created", actor_id=saved_task.user_id, subject_id=saved_task.id)
+        return saved_task
+
+    @staticmethod
+    def _update(uow: IUnitOfWork, task_update_dto: UpdateTaskDto, user_id: UUID) -> Task:
+        task = uow.tasks.get_by_id(task_update_dto.id, user_id)
+        if not task:
+            raise TaskNotFound()
+        
+        task.update_task(
+            task_update_dto.title, 
+            task_update_dto.description, 
+            task_update_dto.status,
+            task_update_dto.due_at,
+            task_update_dto.remind_at,
+            task_update_dto.tags
+        )
+        updated_task = uow.tasks.update(task)
+        uow.audit("task.updated", actor_id=user_id, subject_id=updated_task.id, status=updated_task.status.value)
+        return updated_task
+
+    @staticmethod
+    def _delete(uow: IUnitOfWork, task_id: UUID, user_id: UUID) -> None:
+        task = uow.tasks.get_by_id(task_id, user_id)
+        if not task:
+            raise TaskNotFound()
+        uow.tasks.delete(task_id, user_id)
+        # The delete left a tombstone; expired ones go in the background.
+        uow.enqueue(PURGE_TOMBSTONES, user_id=user_id)
+        uow.audit("task.deleted", actor_id=user_id, subject_id=task_id)
+
+    @staticmethod
+    def _complete(uow: IUnitOfWork, task_id: UUID, user_id: UUID, include_subtasks: bool) -> int:
+        if not uow.tasks.get_by_id(task_id, user_id):
+            raise TaskNotFound()
+        completed = uow.tasks.complete(task_id, user_id, include_subtasks)
+        uow.audit("task.completed", actor_id=user_id, subject_id=task_id, completed=completed)
+        return completed
+
+    @staticmethod
+    def _check_parent(uow: IUnitOfWork, parent_id: UUID, user_id: UUID) -> Task:
+        parent = uow.tasks.get_by_id(parent_id, user_id)
+        if not parent:
+            raise ServiceException("Parent task not found")
+        # The parent sits at depth len(ancestors) + 1, the new task one below.
+        if len(uow.tasks.get_ancestors(parent_id, user_id)) + 2 > settings.task_max_depth:
+            raise ServiceException(f"Subtasks can't be nested more than {settings.task_max_depth} levels deep")
+        return parent
 
     def _domain_to_response_dto(self, task: Task) -> TaskResponseDto:
         return TaskResponseDto(
@@ -80,6 +343,13 @@ class TaskService:
             description=task.description,
             status=task.status,
             user_id=task.user_id,
+            due_at=task.due_at,
+            remind_at=task.remind_at,
+            position=task.position,
+            tags=task.tags,
+            parent_id=task.parent_id,
+            child_count=task.child_count,
+            project_id=task.project_id,
             created_at=task.creation_date,
             updated_at=task.updated_at
         ) 
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Production server launcher.
+
+Runs the app under gunicorn's process manager with uvicorn workers on uvloop
+and httptools. The app is imported once in the master (``preload_app``) and
+shared copy-on-write by the forked workers; each worker then warms its own
+database pool in the lifespan handler before it accepts connections. SIGTERM
+stops accepting new connections and lets in-flight requests drain for up to
+``GRACEFUL_TIMEOUT`` seconds.
+
+Falls back to uvicorn's own multi-process supervisor (no preload) when
+gunicorn is not installed, e.g. on Windows.
+"""
+import os
+from typing import Any, Dict
+
+from app.core.config import settings
+
+try:
+    from uvicorn.workers import UvicornWorker
+except ImportError:  # gunicorn is not installed
+    UvicornWorker = None
+
+APP_PATH = "app.main:app"
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on; honours container cpusets and affinity."""
+    if hasattr(os, "sched_getaffinity"):
+        return max(1, len(os.sched_getaffinity(0)))
+    return max(1, os.cpu_count() or 1)
+
+
+def worker_count() -> int:
+    return settings.workers if settings.workers > 0 else available_cpus()
+
+
+def _prepare_settings() -> None:
+    # Must happen before app.main is imported: engines read these at import.
+    # The environment is updated too for workers that re-import the settings.
+    os.environ["DEBUG"] = "false"
+    os.environ.setdefault("WARMUP_ON_STARTUP", "true")
+    settings.debug = False
+    settings.warmup_on_startup = os.environ["WARMUP_ON_STARTUP"].lower() == "true"
+
+
+if UvicornWorker is not None:
+
+    class ProductionUvicornWorker(UvicornWorker):
+        CONFIG_KWARGS = {
+            "loop": "uvloop",
+            "http": "httptools",
+            "lifespan": "on",
+            "timeout_graceful_shutdown": settings.graceful_timeout,
+        }
+
+
+def _post_fork(server, worker) -> None:
+    """Never reuse connections opened by the master in a forked worker."""
+    from app.infrastructure.database import dispose_engines
+
+    dispose_engines(close=False)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": worker_count(),
+        "worker_class": "app.core.server.ProductionUvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.graceful_timeout,
+        "keepalive": settings.keepalive,
+        "post_fork": _post_fork,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+
+def run_production() -> None:
+    _prepare_settings()
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        _run_uvicorn_supervisor()
+        return
+
+    class PreloadedApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options().items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+    PreloadedApplication().run()
+
+
+def _run_uvicorn_supervisor() -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=settings.host,
+        port=settings.port,
+        workers=worker_count(),
+        loop="uvloop",
+        http="httptools",
+        lifespan="on",
+        timeout_keep_alive=settings.keepalive,
+        timeout_graceful_shutdown=settings.graceful_timeout,
+    )
+
+
+def run_development() -> None:
+    import uvicorn
+
+    uvicorn.run(
+        APP_PATH,
+        host=settings.host,
+        port=settings.port,
+        reload=settings.debug,
+    )
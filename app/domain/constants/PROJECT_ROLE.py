@@ -0,0 +1,6 @@
+from enum import Enum
+
+class ProjectRole(Enum):
+    # The creator; manages the members and can't leave
+    OWNER = "OWNER"
+    MEMBER = "MEMBER"
@@ -0,0 +1,11 @@
+from uuid import UUID
+from datetime import datetime, timezone
+import uuid
+
+
+class Project:
+    def __init__(self, name: str, owner_id: UUID):
+        self.id = uuid.uuid4()
+        self.name = name
+        self.owner_id = owner_id
+        self.created_at = datetime.now(timezone.utc)
@@ -1,6 +1,6 @@
 from uuid import UUID
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timezone
 from app.domain.constants.TASK_STATUS import TaskStatus
 import uuid
 
@@ -12,26 +12,65 @@ class Task():
     creation_date: datetime
     updated_at: datetime
     user_id: UUID
+    due_at: Optional[datetime]
+    remind_at: Optional[datetime]
+    # Rank key in the user's manual order, assigned by the repository.
+    position: Optional[str]
+    tags: List[str]
+    parent_id: Optional[UUID]
+    # Direct subtasks, maintained by the repository.
+    child_count: int
+    project_id: Optional[UUID]
     
-    def __init__(self, title: str, description: Optional[str], status: TaskStatus, user_id: UUID):
+    def __init__(
+        self,
+        title: str,
+        description: Optional[str],
+        status: TaskStatus,
+        user_id: UUID,
+        due_at: Optional[datetime] = None,
+        remind_at: Optional[datetime] = None,
+        tags: Optional[List[str]] = None,
+        parent_id: Optional[UUID] = None,
+        project_id: Optional[UUID] = None,
+    ):
         self.id = uuid.uuid4()
         self.title = title
         self.description = description
         self.status = status
-        self.creation_date = datetime.now()
-        self.updated_at = datetime.now()
+        self.creation_date = datetime.now(timezone.utc)
+        self.updated_at = datetime.now(timezone.utc)
         self.user_id = user_id
+        self.due_at = due_at
+        self.remind_at = remind_at
+        self.position = None
+        self.tags = tags or []
+        self.parent_id = parent_id
+        self.child_count = 0
+        self.project_id = project_id
         
-    def update_task(self, title: str, description: Optional[str], status: TaskStatus):
+    def update_task(
+        self,
+        title: str,
+        description: Optional[str],
+        status: TaskStatus,
+        due_at: Optional[datetime] = None,
+        remind_at: Optional[datetime] = None,
+        tags: Optional[List[str]] = None,
+    ):
         self.title = title
         self.description = description
         self.status = status
-        self.updated_at = datetime.now()
+        self.due_at = due_at
+        self.remind_at = remind_at
+        if tags is not None:
+            self.tags = tags
+        self.updated_at = datetime.now(timezone.utc)
         
     def mark_as_pending(self):
         self.status = TaskStatus.PENDING
-        self.updated_at = datetime.now()
+        self.updated_at = datetime.now(timezone.utc)
         
     def mark_as_completed(self):
         self.status = TaskStatus.COMPLETED
-        self.updated_at = datetime.now()
\ No newline at end of file
+        self.updated_at = datetime.now(timezone.utc)
\ No newline at end of file
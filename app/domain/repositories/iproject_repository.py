@@ -0,0 +1,46 @@
+from app.domain.entities.projects import Project
+from app.domain.constants.PROJECT_ROLE import ProjectRole
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+from uuid import UUID
+
+from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult
+from app.infrastructure.dtos.project_dtos import ProjectDto, ProjectMemberDto
+
+class IProjectRepository(ABC):
+    """Project repository interface."""
+
+    @abstractmethod
+    def create(self, project: Project) -> Project:
+        """Create a project with its owner as the first member."""
+        pass
+
+    @abstractmethod
+    def get_by_id(self, id: UUID) -> Optional[Project]:
+        """Get project by id."""
+        pass
+
+    @abstractmethod
+    def get_memberships(self, user_id: UUID) -> Dict[UUID, ProjectRole]:
+        """The user's role in each of their projects, by project id."""
+        pass
+
+    @abstractmethod
+    def get_user_projects_paginated(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectDto]:
+        """Get the projects a user is a member of, paginated by cursor."""
+        pass
+
+    @abstractmethod
+    def get_members_paginated(self, project_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectMemberDto]:
+        """Get a project's members, paginated by cursor."""
+        pass
+
+    @abstractmethod
+    def add_member(self, project_id: UUID, user_id: UUID, role: ProjectRole) -> ProjectMemberDto:
+        """Add a user to a project."""
+        pass
+
+    @abstractmethod
+    def remove_member(self, project_id: UUID, user_id: UUID) -> bool:
+        """Remove a user from a project; False if they weren't a member."""
+        pass
@@ -1,10 +1,12 @@
 from app.domain.entities.tasks import Task
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 from uuid import UUID
+from datetime import datetime
 
-from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult
-from app.infrastructure.dtos.task_dtos import TaskDto
+from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult, PaginationRequest, PagedResult
+from app.infrastructure.dtos.task_dtos import TagDto, TaskDto, TaskChangesDto
+from app.infrastructure.common.sync_watermark import SyncWatermark
 
 class ITaskRepository(ABC):
     """Task repository interface."""
@@ -15,8 +17,18 @@ class ITaskRepository(ABC):
         pass
     
     @abstractmethod
-    def get_all_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
-        """Get all tasks paginated by cursor efficiently."""
+    def get_all_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest, tags: Optional[List[str]] = None, fields: Optional[FrozenSet[str]] = None) -> CursorPagedResult[TaskDto]:
+        """Get all tasks paginated by cursor efficiently, optionally only those carrying every tag, or only some fields."""
+        pass
+    
+    @abstractmethod
+    def get_all_paginated(self, user_id: UUID, pagination_request: PaginationRequest, fields: Optional[FrozenSet[str]] = None) -> PagedResult[TaskDto]:
+        """Get a page of tasks by page number, with an approximate total count, optionally only some fields."""
+        pass
+
+    @abstractmethod
+    def get_project_tasks_paginated(self, project_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        """Get a project's tasks, whoever owns them, paginated by cursor."""
         pass
     
     @abstractmethod
@@ -24,6 +36,21 @@ class ITaskRepository(ABC):
         """Get task by id and user_id."""
         pass
     
+    @abstractmethod
+    def get_fields_by_id(self, id: UUID, user_id: UUID, fields: FrozenSet[str]):
+        """Get only some fields of a task by id and user_id."""
+        pass
+
+    @abstractmethod
+    def get_archived_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        """Get archived tasks paginated by cursor."""
+        pass
+    
+    @abstractmethod
+    def get_archived_by_id(self, id: UUID, user_id: UUID) -> Optional[Task]:
+        """Get an archived task by id and user_id."""
+        pass
+    
     @abstractmethod
     def create(self, task: Task) -> Task:  
         """Create a new task."""
@@ -35,7 +62,51 @@ class ITaskRepository(ABC):
         pass
     
     @abstractmethod
-    def delete(self, id: UUID) -> None:
-        """Delete a task by id."""
+    def delete(self, id: UUID, user_id: UUID) -> None:
+        """Delete a task by id for a specific user."""
+        pass
+    
+    @abstractmethod
+    def get_changes_since(self, user_id: UUID, since: Optional[SyncWatermark], until: datetime, limit: int) -> TaskChangesDto:
+        """Get tasks changed or deleted after a watermark, oldest first."""
+        pass
+    
+    @abstractmethod
+    def purge_tombstones(self, before: datetime, user_id: Optional[UUID] = None) -> int:
+        """Delete tombstones older than a cutoff, optionally for one user."""
+        pass
+
+    @abstractmethod
+    def get_all_paginated_by_position(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        """Get tasks in the user's manual order, paginated by cursor."""
+        pass
+
+    @abstractmethod
+    def move(self, id: UUID, user_id: UUID, after_id: Optional[UUID]) -> Task:
+        """Place a task right after another one, or first when after_id is None."""
+        pass
+
+    @abstractmethod
+    def rebalance_positions(self, user_id: UUID) -> int:
+        """Respread a user's rank keys, keeping their order."""
+        pass
+
+    @abstractmethod
+    def search_tags(self, user_id: UUID, prefix: str, limit: int) -> List[TagDto]:
+        """Get the user's tags starting with a prefix, by name."""
+        pass
+
+    @abstractmethod
+    def get_subtree(self, id: UUID, user_id: UUID) -> List[TaskDto]:
+        """Get a task and all of its descendants, shallowest first."""
+        pass
+
+    @abstractmethod
+    def get_ancestors(self, id: UUID, user_id: UUID) -> List[TaskDto]:
+        """Get the chain of a task's ancestors, from its root to its parent."""
+        pass
+
+    @abstractmethod
+    def complete(self, id: UUID, user_id: UUID, include_subtasks: bool = True) -> int:
+        """Mark a task, and by default all its descendants, completed; returns how many changed."""
         pass
-        
\ No newline at end of file
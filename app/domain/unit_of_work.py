@@ -13,5 +13,25 @@ class IUnitOfWork(ABC):
     def rollback(self):
         """Rollback the current transaction."""
         pass
+
+    @abstractmethod
+    def savepoint(self):
+        """Context manager that undoes only its block's work if the block raises."""
+        pass
+
+    @abstractmethod
+    def task_repositories(self):
+        """Task repositories covering every database that holds tasks."""
+        pass
+
+    @abstractmethod
+    def enqueue(self, name: str, **payload):
+        """Schedule a background job to run once this transaction commits."""
+        pass
+
+    @abstractmethod
+    def audit(self, action: str, actor_id=None, subject_id=None, **details):
+        """Record an audit event once this transaction commits."""
+        pass
     
     
\ No newline at end of file
@@ -0,0 +1,174 @@
+"""
+Move COMPLETED tasks that haven't changed for a while into ``tasks_archive``.
+
+Usage::
+
+    python -m app.infrastructure.archiving.task_archiver \\
+        [--older-than-days 180] [--batch-size 500] [--pause 0.1] [--max-batches N]
+
+Each batch moves at most ``--batch-size`` tasks in one short transaction, so
+locks stay brief and replicas don't fall behind; ``--pause`` spaces batches
+out further. Candidate rows are locked with ``SKIP LOCKED`` on Postgres, so
+the command can run from cron while the app is serving, and concurrent runs
+split the work instead of blocking each other. Every shard is processed when
+``DATABASE_SHARD_URLS`` is set.
+
+Tasks with subtasks wait until their subtasks are archived, so subtrees
+leave ``tasks`` leaves first and never lose their parent; a completed tree
+can take a few runs to move entirely. To delta sync an archived task is a
+deleted one: each gets a tombstone, and its parent's new ``child_count`` is
+reported as an update.
+"""
+import argparse
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, delete, literal, select, update
+from sqlalchemy.engine import Engine
+
+from app.domain.constants.TASK_STATUS import TaskStatus
+from app.infrastructure.common.sync_watermark import to_naive_utc
+from app.infrastructure.persistence.entities_configuration import (
+    Task as TaskEntity, TaskArchive, TaskCount, TaskTombstone
+)
+
+tasks_table = TaskEntity.__table__
+archive_table = TaskArchive.__table__
+counts_table = TaskCount.__table__
+tombstones_table = TaskTombstone.__table__
+
+ARCHIVED_COLUMNS = [column.name for column in tasks_table.columns]
+
+
+def archive_batch(engine: Engine, cutoff: datetime, batch_size: int = 500) -> int:
+    """Archive up to ``batch_size`` tasks completed before ``cutoff``."""
+    cutoff = to_naive_utc(cutoff)
+    # Checked again when copying and deleting, in case a row changed after
+    # it was picked (only Postgres holds the rows locked in between).
+    archivable = and_(
+        tasks_table.c.status == TaskStatus.COMPLETED,
+        tasks_table.c.updated_at < cutoff,
+        tasks_table.c.child_count == 0,
+    )
+    with engine.begin() as connection:
+        candidates = (
+            select(tasks_table.c.id, tasks_table.c.user_id, tasks_table.c.parent_id)
+            .where(archivable)
+            .order_by(tasks_table.c.updated_at)
+            .limit(batch_size)
+        )
+        if engine.dialect.name == "postgresql":
+            candidates = candidates.with_for_update(skip_locked=True)
+        candidate_rows = connection.execute(candidates).all()
+        if not candidate_rows:
+            return 0
+
+        ids = [row.id for row in candidate_rows]
+        # The user ids let Postgres prune hash partitions it won't touch.
+        user_ids = {row.user_id for row in candidate_rows}
+        selected = and_(tasks_table.c.user_id.in_(user_ids), tasks_table.c.id.in_(ids), archivable)
+        archived_at = datetime.now(timezone.utc)
+        connection.execute(
+            archive_table.insert().from_select(
+                ARCHIVED_COLUMNS + ["archived_at"],
+                select(
+                    *[tasks_table.c[name] for name in ARCHIVED_COLUMNS],
+                    literal(archived_at, archive_table.c.archived_at.type),
+                ).where(selected),
+            )
+        )
+        rows = connection.execute(
+            delete(tasks_table)
+            .where(selected)
+            .returning(tasks_table.c.id, tasks_table.c.user_id, tasks_table.c.parent_id)
+        ).all()
+        if not rows:
+            return 0
+        connection.execute(
+            tombstones_table.insert(),
+            [{"task_id": row.id, "user_id": row.user_id, "deleted_at": archived_at} for row in rows],
+        )
+
+        # Archived tasks leave the listings: keep the counters (and with
+        # their version, the pagination anchors) in step.
+        for user_id, count in Counter(row.user_id for row in rows).items():
+            connection.execute(
+                update(counts_table)
+                .where(counts_table.c.user_id == user_id)
+                .values(
+                    task_count=counts_table.c.task_count - count,
+                    version=counts_table.c.version + 1,
+                )
+            )
+        # Their parents have fewer subtasks left (a parent archived in this
+        # batch had none, so it isn't among them), which synced clients see.
+        for (user_id, parent_id), count in Counter(
+            (row.user_id, row.parent_id) for row in rows if row.parent_id is not None
+        ).items():
+            connection.execute(
+                update(tasks_table)
+                .where(tasks_table.c.user_id == user_id, tasks_table.c.id == parent_id)
+                .values(child_count=tasks_table.c.child_count - count, updated_at=archived_at)
+            )
+    return len(rows)
+
+
+def archive_completed_tasks(
+    engine: Engine,
+    older_than: timedelta,
+    batch_size: int = 500,
+    pause_seconds: float = 0.0,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Archive in batches until no old completed task is left; returns the count."""
+    cutoff = datetime.now(timezone.utc) - older_than
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(engine, cutoff, batch_size)
+        archived += moved
+        batches += 1
+        if moved < batch_size:
+            break
+        if pause_seconds:
+            time.sleep(pause_seconds)
+    return archived
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from app.core.config import settings
+    from app.infrastructure.database import dispose_engines, get_engine, get_shard_router
+
+    parser = argparse.ArgumentParser(description="Archive old completed tasks")
+    parser.add_argument("--older-than-days", type=float, default=settings.archive_after_days)
+    parser.add_argument("--batch-size", type=int, default=settings.archive_batch_size)
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches per database")
+    args = parser.parse_args(argv)
+
+    router = get_shard_router()
+    if router is not None:
+        targets = [(name, router.engine_by_name(name)) for name in router.shard_names]
+    else:
+        targets = [("database", get_engine())]
+
+    try:
+        for name, engine in targets:
+            archived = archive_completed_tasks(
+                engine,
+                timedelta(days=args.older_than_days),
+                args.batch_size,
+                args.pause,
+                args.max_batches,
+            )
+            print(f"{name}: archived {archived} tasks")
+    finally:
+        dispose_engines()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
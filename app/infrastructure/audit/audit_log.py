@@ -0,0 +1,192 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import insert
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.infrastructure.persistence.entities_configuration import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+
+def audit_event(action: str, actor_id: Optional[UUID] = None, subject_id: Optional[UUID] = None, **details: Any) -> Dict[str, Any]:
+    """An ``audit_events`` row, stamped now."""
+    return {
+        "id": uuid4(),
+        "occurred_at": datetime.now(timezone.utc),
+        "action": action,
+        "actor_id": actor_id,
+        "subject_id": subject_id,
+        "details": json.dumps(details, default=str) if details else None,
+    }
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class AuditLog:
+    """Buffers audit events in memory and writes them in multi-row inserts.
+
+    Requests only append to a bounded buffer. A writer thread flushes it
+    once ``batch_size`` events are waiting or ``flush_interval_ms`` after the
+    oldest one arrived, one ``INSERT ... VALUES (...), (...)`` per batch.
+    When the buffer is full, threadpool callers wait up to ``backpressure_ms``
+    for the writer to make room and their events are dropped after that, so
+    a slow database costs requests a bounded delay rather than memory.
+    Callers on the event loop (the ``async def`` routes) never wait: their
+    events are dropped at once, rather than stall every other request.
+    ``stop`` writes whatever is left.
+
+    Events of requests in flight when the process dies are lost; the log
+    trades that for not adding a write to every request.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        capacity: int = 10_000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 200,
+        backpressure_ms: int = 50,
+    ):
+        self._session_factory = session_factory
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval_ms / 1000
+        self._backpressure = backpressure_ms / 1000
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.written = 0
+        self.dropped = 0
+        self.failed_flushes = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        self._stopping = False
+        self._thread = threading.Thread(target=self._write, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush the buffer and stop the writer."""
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        if self._buffer:
+            logger.warning("Stopped with %d audit events unwritten", len(self._buffer))
+
+    def record(self, action: str, actor_id: Optional[UUID] = None, subject_id: Optional[UUID] = None, **details: Any) -> bool:
+        return self.record_many([audit_event(action, actor_id, subject_id, **details)])
+
+    def record_many(self, events: List[Dict[str, Any]]) -> bool:
+        """Buffer events from any thread; False if they were dropped.
+
+        A no-op until started.
+        """
+        if not events or self._thread is None:
+            return False
+        deadline = time.monotonic() + (0 if _on_event_loop() else self._backpressure)
+        with self._condition:
+            while len(self._buffer) + len(events) > self._capacity and not self._stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.dropped += len(events)
+                    logger.warning("Audit buffer full, dropping %d events", len(events))
+                    return False
+                self._condition.wait(remaining)
+            was_empty = not self._buffer
+            self._buffer.extend(events)
+            # Wake the writer for a full batch, or to start the flush
+            # interval of a partial one.
+            if was_empty or len(self._buffer) >= self._batch_size:
+                self._condition.notify_all()
+        return True
+
+    def _write(self) -> None:
+        while True:
+            with self._condition:
+                # Wait for a full batch, or give the first event of a partial
+                # one flush_interval to be joined by others.
+                if len(self._buffer) < self._batch_size and not self._stopping:
+                    if not self._buffer:
+                        self._condition.wait_for(lambda: self._buffer or self._stopping)
+                    self._condition.wait_for(
+                        lambda: len(self._buffer) >= self._batch_size or self._stopping,
+                        self._flush_interval,
+                    )
+                if not self._buffer and self._stopping:
+                    return
+                batch = [self._buffer.popleft() for _ in range(min(self._batch_size, len(self._buffer)))]
+                # Callers waiting for space can go on.
+                self._condition.notify_all()
+            if not self._flush(batch) and not self._stopping:
+                # Keep the events and retry after a pause; meanwhile the
+                # buffer fills up and backpressure kicks in.
+                with self._condition:
+                    self._buffer.extendleft(reversed(batch))
+                    self._condition.wait_for(lambda: self._stopping, self._flush_interval)
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> bool:
+        try:
+            with self._session_factory() as session:
+                session.exec(insert(AuditEvent.__table__).values(batch))
+                session.commit()
+        except Exception:
+            self.failed_flushes += 1
+            logger.exception("Writing %d audit events failed", len(batch))
+            return False
+        self.flushes += 1
+        self.written += len(batch)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "buffered": len(self._buffer),
+            "capacity": self._capacity,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_audit_log() -> AuditLog:
+    from app.infrastructure.database import get_session
+
+    return AuditLog(
+        get_session,
+        capacity=settings.audit_buffer_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_ms=settings.audit_flush_interval_ms,
+        backpressure_ms=settings.audit_backpressure_ms,
+    )
+
+
+def record_audit_events(events: Iterable[Dict[str, Any]]) -> None:
+    if settings.audit_enabled:
+        get_audit_log().record_many(list(events))
@@ -1,6 +1,5 @@
-import jwt
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from uuid import UUID, uuid4
 from app.domain.entities.users import User
 from app.infrastructure.persistence.entities_configuration import RefreshToken
@@ -10,13 +9,15 @@ from app.core.config import settings
 from app.infrastructure.dtos.user_dtos import UserDto
 from app.infrastructure.persistence.entities_configuration import User as UserEntity
 from sqlmodel import select, update
-from app.infrastructure.exceptions import InvalidToken, UserNotFound
+from sqlalchemy import insert, literal
+from app.infrastructure.common.jwt_keys import get_key_ring
+from app.infrastructure.audit.audit_log import audit_event, record_audit_events
+from app.infrastructure.exceptions import InvalidCredentials, InvalidToken, UserNotFound
 
 class AuthService:
     def __init__(self, session: Session):
         self._session = session
-        self._secret_key = settings.jwt_secret_key
-        self._algorithm = "HS256"
+        self._keys = get_key_ring()
         self._access_token_expire_minutes = settings.access_token_expire_minutes
         self._refresh_token_expire_days = settings.refresh_token_expire_days
 
@@ -29,37 +30,31 @@ class AuthService:
             expire = datetime.now(timezone.utc) + timedelta(minutes=self._access_token_expire_minutes)
         
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self._secret_key, algorithm=self._algorithm)
-        return encoded_jwt
+        return self._keys.encode(to_encode)
 
     def create_refresh_token(self, user_id: UUID) -> str:
-       
-        
+        """Add a refresh token to the session; the caller's commit stores it."""
+        refresh_token_value, refresh_token_entity = self._new_refresh_token(user_id)
+        self._session.add(refresh_token_entity)
+        return refresh_token_value
+
+    def _new_refresh_token(self, user_id: Optional[UUID]) -> Tuple[str, RefreshToken]:
         refresh_token_value = str(uuid4())
-        
-        
         hashed_token = hashlib.sha256(refresh_token_value.encode()).hexdigest()
-        
-        
         expires_at = datetime.now(timezone.utc) + timedelta(days=self._refresh_token_expire_days)
-        
-        
         refresh_token_entity = RefreshToken(
             token=hashed_token,
             expires_at=expires_at,
             user_id=user_id
         )
-        
-        self._session.add(refresh_token_entity)
-        self._session.commit()
-        
-        return refresh_token_value
+        return refresh_token_value, refresh_token_entity
 
     def verify_access_token(self, token: str) -> Optional[Dict[str, Any]]:
        
+        import jwt  # deferred: only needed once a request carries a token
+
         try:
-            payload = jwt.decode(token, self._secret_key, algorithms=[self._algorithm])
-            return payload
+            return self._keys.decode(token)
         except jwt.PyJWTError:
             return None
 
@@ -70,7 +65,7 @@ class AuthService:
         
         statement = select(RefreshToken).where(
             RefreshToken.token == hashed_token,
-            RefreshToken.is_revoked is False,
+            RefreshToken.is_revoked.is_(False),
             RefreshToken.expires_at > datetime.now(timezone.utc)
         )
         
@@ -83,6 +78,9 @@ class AuthService:
         if refresh_token_entity:
             refresh_token_entity.is_revoked = True
             self._session.commit()
+            record_audit_events([audit_event(
+                "auth.token_revoked", actor_id=refresh_token_entity.user_id, subject_id=refresh_token_entity.id
+            )])
             return True
         raise InvalidToken("Invalid refresh token")
 
@@ -91,11 +89,12 @@ class AuthService:
         
         statement = update(RefreshToken).where(
             RefreshToken.user_id == user_id,
-            RefreshToken.is_revoked is False
+            RefreshToken.is_revoked.is_(False)
         ).values(is_revoked=True)
         
-        self._session.exec(statement)
+        result = self._session.exec(statement)
         self._session.commit()
+        record_audit_events([audit_event("auth.tokens_revoked", actor_id=user_id, count=result.rowcount)])
 
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
        
@@ -137,6 +136,51 @@ class AuthService:
             "token_type": "bearer"
         }
 
+    def sign_in(self, email: str, password: str) -> Tuple[UUID, Dict[str, str]]:
+        """Check the credentials and issue tokens, leaving the commit to the caller.
+
+        Returns the user's id with the tokens.
+
+        On Postgres the user lookup and the refresh-token insert are one
+        statement, which matches the password too: a failed sign-in inserts
+        nothing, and returns no user.
+        """
+        refresh_token_value, refresh_token_entity = self._new_refresh_token(None)
+        credentials = (
+            UserEntity.email == email,
+            UserEntity.password == hashlib.sha256(password.encode()).hexdigest()
+        )
+        if self._session.get_bind().dialect.name == "postgresql":
+            table = RefreshToken.__table__
+            values = refresh_token_entity.model_dump(exclude={"user_id"})
+            issued = insert(table).from_select(
+                [*values, "user_id"],
+                select(
+                    *[literal(value, table.c[name].type) for name, value in values.items()],
+                    UserEntity.id
+                ).where(*credentials)
+            ).returning(table.c.user_id).cte("issued")
+            user_statement = select(UserEntity).join(issued, issued.c.user_id == UserEntity.id)
+            user_entity = self._session.exec(user_statement).first()
+        else:
+            user_entity = self._session.exec(select(UserEntity).where(*credentials)).first()
+            if user_entity:
+                refresh_token_entity.user_id = user_entity.id
+                self._session.add(refresh_token_entity)
+
+        if not user_entity:
+            raise InvalidCredentials("Invalid email or password")
+
+        return user_entity.id, {
+            "access_token": self.create_access_token({
+                "sub": str(user_entity.id),
+                "email": user_entity.email,
+                "name": user_entity.name
+            }),
+            "refresh_token": refresh_token_value,
+            "token_type": "bearer"
+        }
+
     def refresh_access_token(self, refresh_token: str) -> Optional[Dict[str, str]]:
        
         refresh_token_entity = self.verify_refresh_token(refresh_token)
@@ -0,0 +1,235 @@
+"""
+Keys for signing and verifying access tokens.
+
+With ``JWT_ALGORITHM=ES256`` or ``EdDSA`` tokens are signed with the private
+key in ``JWT_PRIVATE_KEY_FILE`` and carry its ``kid``. Other services verify
+them with the public keys published at ``/.well-known/jwks.json``, so no secret
+is shared. ``JWT_VERIFICATION_KEYS`` (``"kid=path,kid=path"``) lists more
+public keys to accept and publish, which is how keys are rotated::
+
+    # 1. Create the next key; its public half is printed, kid on stderr
+    python -m app.infrastructure.common.jwt_keys generate --out keys/next.pem > keys/next.pub.pem
+    # 2. Publish it: add keys/next.pub.pem to JWT_VERIFICATION_KEYS and wait
+    #    for downstream JWKS caches (JWKS_MAX_AGE_SECONDS) to expire.
+    # 3. Sign with it: JWT_PRIVATE_KEY_FILE=keys/next.pem, and list the old
+    #    public key in JWT_VERIFICATION_KEYS until the last access token it
+    #    signed has expired (ACCESS_TOKEN_EXPIRE_MINUTES).
+
+``HS256`` keeps signing with ``JWT_SECRET_KEY`` and publishes no keys.
+
+PEM files are parsed once per process into key objects; signing and
+verifying reuse them.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("ES256", "EdDSA")
+
+
+@dataclass(frozen=True)
+class VerificationKey:
+    kid: Optional[str]
+    algorithm: str
+    key: Any
+    jwk: Optional[Dict[str, str]] = None
+
+
+def _public_jwk(public_key: Any, algorithm: str) -> Dict[str, str]:
+    from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+    to_jwk = ECAlgorithm.to_jwk if algorithm == "ES256" else OKPAlgorithm.to_jwk
+    return to_jwk(public_key, as_dict=True)
+
+
+def thumbprint(jwk: Dict[str, str]) -> str:
+    """RFC 7638 thumbprint of a public JWK, the default ``kid``."""
+    members = {name: jwk[name] for name in ("crv", "e", "kty", "n", "x", "y") if name in jwk}
+    digest = hashlib.sha256(json.dumps(members, separators=(",", ":"), sort_keys=True).encode()).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _check_key_type(key: Any, algorithm: str, path: str) -> None:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    expected = (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey) if algorithm == "ES256" else (
+        ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey
+    )
+    if not isinstance(key, expected):
+        raise ValueError(f"{path} is not an {algorithm} key")
+
+
+def load_private_key(path: str, algorithm: str) -> Any:
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+    with open(path, "rb") as pem:
+        key = load_pem_private_key(pem.read(), password=None)
+    _check_key_type(key, algorithm, path)
+    return key
+
+
+def load_public_key(path: str, algorithm: str) -> Any:
+    """A public key PEM, or the public half of a private key PEM."""
+    from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
+
+    with open(path, "rb") as pem:
+        data = pem.read()
+    if b"PRIVATE KEY" in data:
+        key = load_pem_private_key(data, password=None).public_key()
+    else:
+        key = load_pem_public_key(data)
+    _check_key_type(key, algorithm, path)
+    return key
+
+
+class JwtKeyRing:
+    """One signing key plus every key currently accepted for verification.
+
+    Verification picks the key by the token's ``kid`` and only accepts that
+    key's algorithm, so a token can't choose how it is checked.
+    """
+
+    def __init__(self, algorithm: str, signing_key: Any, signing_kid: Optional[str], verification_keys: List[VerificationKey]):
+        self.algorithm = algorithm
+        self._signing_key = signing_key
+        self._signing_kid = signing_kid
+        self._headers = {"kid": signing_kid} if signing_kid else None
+        self._keys = {key.kid: key for key in verification_keys}
+        self._jwks = json.dumps(
+            {"keys": [key.jwk for key in verification_keys if key.jwk is not None]},
+            separators=(",", ":"),
+        ).encode()
+        self.jwks_etag = '"' + hashlib.sha256(self._jwks).hexdigest()[:32] + '"'
+
+    @property
+    def signing_kid(self) -> Optional[str]:
+        return self._signing_kid
+
+    @property
+    def jwks(self) -> bytes:
+        """Serialized JWK Set of the public keys; empty for HS256."""
+        return self._jwks
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        import jwt
+
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=self._headers)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verified claims; raises ``jwt.PyJWTError`` otherwise."""
+        import jwt
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._keys.get(kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid!r}")
+        return jwt.decode(token, key.key, algorithms=[key.algorithm])
+
+
+def parse_key_list(raw: str) -> List[Tuple[Optional[str], str]]:
+    """Parse ``"kid=path,path"`` into ``(kid or None, path)`` pairs."""
+    keys = []
+    for entry in filter(None, (part.strip() for part in raw.split(","))):
+        kid, _, path = entry.rpartition("=")
+        keys.append((kid.strip() or None, path.strip()))
+    return keys
+
+
+def build_key_ring(
+    algorithm: str,
+    secret_key: str = "",
+    private_key_file: Optional[str] = None,
+    key_id: Optional[str] = None,
+    extra_public_keys: str = "",
+) -> JwtKeyRing:
+    if algorithm == "HS256":
+        return JwtKeyRing(algorithm, secret_key, None, [VerificationKey(None, algorithm, secret_key)])
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(f"Unsupported JWT algorithm {algorithm!r}")
+    if not private_key_file:
+        raise ValueError(f"JWT_PRIVATE_KEY_FILE is required with {algorithm}")
+
+    private_key = load_private_key(private_key_file, algorithm)
+    public_keys = [(key_id, private_key.public_key())]
+    public_keys += [(kid, load_public_key(path, algorithm)) for kid, path in parse_key_list(extra_public_keys)]
+
+    verification_keys = []
+    published = set()
+    for kid, public_key in public_keys:
+        jwk = _public_jwk(public_key, algorithm)
+        key_thumbprint = thumbprint(jwk)
+        kid = kid or key_thumbprint
+        jwk.update(kid=kid, alg=algorithm, use="sig")
+        # A key listed again under another kid (e.g. the signing key also in
+        # JWT_VERIFICATION_KEYS) still verifies tokens carrying that kid, but
+        # the JWKS publishes each key once, under its first kid.
+        if key_thumbprint in published:
+            jwk = None
+        published.add(key_thumbprint)
+        verification_keys.append(VerificationKey(kid, algorithm, public_key, jwk))
+    return JwtKeyRing(algorithm, private_key, verification_keys[0].kid, verification_keys)
+
+
+@lru_cache(maxsize=None)
+def get_key_ring() -> JwtKeyRing:
+    return build_key_ring(
+        settings.jwt_algorithm,
+        settings.jwt_secret_key,
+        settings.jwt_private_key_file,
+        settings.jwt_key_id,
+        settings.jwt_verification_keys,
+    )
+
+
+def generate_private_key_pem(algorithm: str) -> bytes:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    if algorithm == "ES256":
+        key = ec.generate_private_key(ec.SECP256R1())
+    elif algorithm == "EdDSA":
+        key = ed25519.Ed25519PrivateKey.generate()
+    else:
+        raise ValueError(f"Unsupported JWT algorithm {algorithm!r}")
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage JWT signing keys")
+    commands = parser.add_subparsers(dest="command", required=True)
+    generate = commands.add_parser("generate", help="Write a new private key PEM")
+    generate.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="ES256")
+    generate.add_argument("--out", required=True, help="Private key file to create")
+    public = commands.add_parser("public", help="Print the public key PEM and kid of a key file")
+    public.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="ES256")
+    public.add_argument("path")
+    args = parser.parse_args(argv)
+
+    from cryptography.hazmat.primitives import serialization
+
+    if args.command == "generate":
+        # Readable by the owner only, and never overwrites an existing key.
+        try:
+            descriptor = os.open(args.out, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            parser.error(f"{args.out} already exists")
+        with os.fdopen(descriptor, "wb") as pem:
+            pem.write(generate_private_key_pem(args.algorithm))
+    key = load_public_key(args.out if args.command == "generate" else args.path, args.algorithm)
+    print(key.public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo).decode(), end="")
+    print(f"kid: {thumbprint(_public_jwk(key, args.algorithm))}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
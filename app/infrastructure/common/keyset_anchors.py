@@ -0,0 +1,94 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class KeysetAnchorCache:
+    """Remembers where offsets fall in each listing so pages can seek to them.
+
+    An anchor ``(offset, key)`` says that the rows at positions ``offset`` and
+    later are exactly those whose sort key is greater than ``key``. Serving a
+    page at offset ``o`` then only skips ``o - offset`` rows after an index
+    seek, instead of ``o`` rows from the start.
+
+    Anchors are only valid while rows aren't inserted or removed, so each
+    listing carries a ``version`` and anchors recorded under another version
+    are discarded. Listings are kept in least-recently-used order, bounded by
+    ``max_listings``, each with at most ``max_anchors`` anchors.
+    """
+
+    def __init__(self, max_listings: int = 10_000, max_anchors: int = 64):
+        self._max_listings = max_listings
+        self._max_anchors = max_anchors
+        self._listings: "OrderedDict[Hashable, Tuple[Any, List[int], Dict[int, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def nearest(self, listing: Hashable, version: Any, offset: int) -> Tuple[int, Optional[Any]]:
+        """Closest anchor at or before ``offset``; ``(0, None)`` means the start."""
+        with self._lock:
+            entry = self._listings.get(listing)
+            if entry is None or entry[0] != version:
+                return 0, None
+            self._listings.move_to_end(listing)
+            _, offsets, keys = entry
+            index = bisect.bisect_right(offsets, offset)
+            if index == 0:
+                return 0, None
+            return offsets[index - 1], keys[offsets[index - 1]]
+
+    def remember(self, listing: Hashable, version: Any, offset: int, key: Any) -> None:
+        if offset <= 0:
+            return
+        with self._lock:
+            entry = self._listings.get(listing)
+            if entry is None or entry[0] != version:
+                entry = (version, [], {})
+                self._listings[listing] = entry
+            self._listings.move_to_end(listing)
+            _, offsets, keys = entry
+            if offset not in keys:
+                bisect.insort(offsets, offset)
+                if len(offsets) > self._max_anchors:
+                    # Keep the spread: drop the anchor closest to a neighbour.
+                    gaps = [offsets[i + 1] - offsets[i - 1] for i in range(1, len(offsets) - 1)]
+                    dropped = offsets.pop(gaps.index(min(gaps)) + 1)
+                    keys.pop(dropped, None)
+                    if dropped == offset:
+                        return
+            keys[offset] = key
+            while len(self._listings) > self._max_listings:
+                self._listings.popitem(last=False)
+
+    def forget(self, listing: Hashable) -> None:
+        with self._lock:
+            self._listings.pop(listing, None)
+
+
+class CountEstimateCache:
+    """Short-lived per-user counts for listings that have no maintained counter."""
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10_000):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._counts: "OrderedDict[Hashable, Tuple[float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        with self._lock:
+            entry = self._counts.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[1]
+
+    def set(self, key: Hashable, count: int) -> None:
+        with self._lock:
+            self._counts[key] = (time.monotonic() + self._ttl_seconds, count)
+            self._counts.move_to_end(key)
+            while len(self._counts) > self._max_entries:
+                self._counts.popitem(last=False)
+
+
+task_anchors = KeysetAnchorCache()
+task_count_estimates = CountEstimateCache()
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+
+class MembershipCache:
+    """Short-lived per-user project memberships, so access checks are lookups.
+
+    A user's whole membership map is loaded once and then answers every
+    check for ``ttl_seconds``. The unit of work drops the entries of users
+    whose memberships it changed, once its commit succeeds. That is per
+    process: other workers pick the change up when their entry expires,
+    which is what the TTL bounds.
+
+    A load that started before an invalidation may have read the old
+    memberships, so ``get`` hands out a generation and ``set`` ignores
+    values loaded under an older one.
+    """
+
+    def __init__(self, ttl_seconds: float = 15.0, max_entries: int = 10_000):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[Optional[Dict], int]:
+        """The cached memberships or None, and the generation to ``set`` with."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None, self._generation
+            self._entries.move_to_end(key)
+            return entry[1], self._generation
+
+    def set(self, key: Hashable, generation: int, memberships: Dict) -> None:
+        if self._ttl_seconds <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self._ttl_seconds, memberships)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+project_memberships = MembershipCache(
+    settings.project_membership_cache_seconds, settings.project_membership_cache_size
+)
@@ -1,5 +1,5 @@
 from typing import Generic, TypeVar, List, Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from enum import Enum
 import base64
 import json
@@ -19,16 +19,19 @@ class PagedResult(BaseModel, Generic[T]):
     page_number: int = 1
     page_size: int = 10
     
+    @computed_field
     @property
     def total_pages(self) -> int:
         
         return (self.total_count + self.page_size - 1) // self.page_size
     
+    @computed_field
     @property
     def has_next_page(self) -> bool:
         
         return self.page_number < self.total_pages
     
+    @computed_field
     @property
     def has_previous_page(self) -> bool:
         
@@ -192,3 +195,31 @@ class CursorPaginationHelper:
             has_previous_page=bool(cursor),
             page_size=page_size
         )
+
+    @staticmethod
+    def merge_pages(
+        pages: List[CursorPagedResult[T]],
+        key_selector: str,
+        cursor: Optional[str] = None,
+        page_size: int = 10,
+        direction: PaginationDirection = PaginationDirection.FORWARD
+    ) -> CursorPagedResult[T]:
+        """Merge the pages one cursor query returned from several databases."""
+        
+        items = sorted(
+            (item for page in pages for item in page.items),
+            key=lambda item: getattr(item, key_selector),
+            reverse=direction == PaginationDirection.BACKWARD
+        )
+        merged = CursorPaginationHelper.apply_cursor_pagination_to_query_result(
+            items=items,
+            key_selector=key_selector,
+            cursor=cursor,
+            page_size=page_size,
+            direction=direction
+        )
+        if not merged.has_next_page and any(page.has_next_page for page in pages):
+            # A database had more rows past its own page, all beyond this one.
+            merged.has_next_page = True
+            merged.next_cursor = CursorPaginationHelper.encode_cursor(getattr(merged.items[-1], key_selector))
+        return merged
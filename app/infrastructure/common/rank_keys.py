@@ -0,0 +1,168 @@
+"""
+Lexicographic rank keys for manual ordering ("fractional indexing").
+
+A key is a string that sorts, byte by byte, between its neighbours, so an
+item moves by getting a new key between the two it lands between and no
+other row changes. Keys are an integer part, whose first character encodes
+its length (``a`` = 2 characters, ``b`` = 3, ..., ``Z`` = 2 below zero,
+``Y`` = 3, ...), followed by an optional base-62 fraction that never ends in
+``0``. Appending after the last key increments the integer part, so keys of
+a list built by appends grow logarithmically; repeated inserts into the same
+gap lengthen the fraction by about one character per six inserts, which is
+what rebalancing (``n_keys_between(None, None, n)``) resets.
+
+The same scheme as https://observablehq.com/@dgreensp/implementing-fractional-indexing.
+Keys must be compared by code point: on Postgres the column uses the ``C``
+collation.
+"""
+from typing import List, Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+ZERO = DIGITS[0]
+SMALLEST_INTEGER = "A" + ZERO * 26
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between fractions ``a`` and ``b`` (None = 1)."""
+    if b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+    if a.endswith(ZERO) or (b is not None and b.endswith(ZERO)):
+        raise ValueError("Fractions can't end in 0")
+    if b:
+        # Skip the common prefix, padding a with zeros.
+        n = 0
+        while (a[n] if n < len(a) else ZERO) == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[round((digit_a + digit_b) / 2)]
+    # Adjacent digits: take b's first digit if b continues, else extend a.
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank key head {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank key {key!r}")
+    return key[:length]
+
+
+def validate_key(key: str) -> None:
+    if not key or key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank key {key!r}")
+    integer = _integer_part(key)
+    if key[len(integer):].endswith(ZERO):
+        raise ValueError(f"Invalid rank key {key!r}")
+
+
+def _increment_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) + 1
+        if digit < len(DIGITS):
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = ZERO
+    # Carried out of every digit: one more digit, or the next length.
+    if head == "Z":
+        return "a" + ZERO
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append(ZERO)
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> Optional[str]:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = DIGITS.index(digits[i]) - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """A key after ``a`` and before ``b``; None means the start or the end."""
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"{a!r} >= {b!r}")
+    if a is None:
+        if b is None:
+            return "a" + ZERO
+        integer_b = _integer_part(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement_integer(integer_b)
+        if decremented is None:
+            raise ValueError("Can't create a key before the smallest one")
+        return decremented
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        incremented = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if incremented is None else incremented
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    incremented = _increment_integer(integer_a)
+    if incremented is None:
+        raise ValueError("Can't create a key after the largest one")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def n_keys_between(a: Optional[str], b: Optional[str], n: int) -> List[str]:
+    """``n`` ascending keys between ``a`` and ``b``, as short as possible."""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(n - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(None, keys[-1]))
+        return keys[::-1]
+    middle = key_between(a, b)
+    half = n // 2
+    return n_keys_between(a, middle, half) + [middle] + n_keys_between(middle, b, n - half - 1)
@@ -0,0 +1,86 @@
+import threading
+import time
+from typing import Dict, Iterable, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.infrastructure.persistence.entities_configuration import User as UserEntity
+
+_WRITTEN_USERS_KEY = "written_user_ids"
+
+
+class ReadYourWritesTracker:
+    """Remembers which users wrote recently so their reads stay on the primary.
+
+    State is per process: with several workers a user is only pinned on the
+    worker that served the write, which is what the sticky window is sized for.
+    """
+
+    def __init__(self, sticky_seconds: float):
+        self._sticky_seconds = sticky_seconds
+        self._pinned_until: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+
+    def mark_write(self, user_id: UUID) -> None:
+        expires_at = time.monotonic() + self._sticky_seconds
+        with self._lock:
+            self._pinned_until[user_id] = expires_at
+            if len(self._pinned_until) > 10_000:
+                self._prune()
+
+    def mark_writes(self, user_ids: Iterable[UUID]) -> None:
+        for user_id in set(user_ids):
+            self.mark_write(user_id)
+
+    def is_pinned(self, user_id: Optional[UUID]) -> bool:
+        if user_id is None:
+            return False
+        expires_at = self._pinned_until.get(user_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            with self._lock:
+                self._pinned_until.pop(user_id, None)
+            return False
+        return True
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, until in self._pinned_until.items() if until <= now]
+        for key in expired:
+            del self._pinned_until[key]
+
+
+def _owner_id(instance) -> Optional[UUID]:
+    if isinstance(instance, UserEntity):
+        return instance.id
+    return getattr(instance, "user_id", None)
+
+
+def register_write_tracking(tracker: ReadYourWritesTracker) -> None:
+    """Pin the owners of every committed row to the primary.
+
+    Repositories commit directly on the session, so the hooks live on the
+    ``Session`` class rather than on ``SQLModelUnitOfWork.commit``. They only
+    see rows written through the ORM: whoever runs Core statements (task
+    completion, rank rebalances) marks the owners with ``mark_writes``.
+    """
+
+    @event.listens_for(Session, "after_flush")
+    def _collect_owners(session: Session, flush_context) -> None:
+        owners: Set[UUID] = session.info.setdefault(_WRITTEN_USERS_KEY, set())
+        for instance in (*session.new, *session.dirty, *session.deleted):
+            owner_id = _owner_id(instance)
+            if owner_id is not None:
+                owners.add(owner_id)
+
+    @event.listens_for(Session, "after_commit")
+    def _pin_owners(session: Session) -> None:
+        for owner_id in session.info.pop(_WRITTEN_USERS_KEY, ()):
+            tracker.mark_write(owner_id)
+
+    @event.listens_for(Session, "after_rollback")
+    def _forget_owners(session: Session) -> None:
+        session.info.pop(_WRITTEN_USERS_KEY, None)
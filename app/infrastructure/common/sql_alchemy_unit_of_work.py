@@ -1,25 +1,155 @@
-
+import json
+from contextlib import ExitStack, contextmanager
+from typing import List, Optional
+from uuid import UUID
 from app.domain.unit_of_work import IUnitOfWork
+from app.infrastructure import database
 from app.infrastructure.repositories.task_repository import TaskRepository
 from app.infrastructure.repositories.user_repository import UserRepository
+from app.infrastructure.repositories.project_repository import ProjectRepository
+from app.infrastructure.common.membership_cache import project_memberships
+from app.infrastructure.exceptions import ReadOnlyUnitOfWork
+from app.infrastructure.realtime.brokers import publish_task_changes
+from app.infrastructure.jobs.runner import Job, get_job_runner
+from app.infrastructure.audit.audit_log import audit_event, record_audit_events
+from app.infrastructure.reminders.scheduler import get_reminder_scheduler
 
 
 class SQLModelUnitOfWork(IUnitOfWork):
-    def __init__(self, session_factory):
+    def __init__(self, session_factory, read_only: bool = False, shard_key: Optional[UUID] = None):
         self._session_factory = session_factory
+        self.read_only = read_only
+        self._shard_key = shard_key
 
     def __enter__(self):
         self._session = self._session_factory()
-        self.tasks = TaskRepository(self._session)
+        # Tasks live on the user's shard when sharding is configured; users
+        # and refresh tokens always stay on the session from the factory.
+        self._task_session = None
+        if self._shard_key is not None:
+            self._task_session = database.get_task_session(self._shard_key)
+        self.tasks = TaskRepository(self._task_session or self._session, autocommit=False)
         self.users = UserRepository(self._session)
+        # Projects live with the users, on the session from the factory.
+        self.projects = ProjectRepository(self._session)
+        self._shard_sessions = []
+        self._jobs = []
+        self._audit_events = []
         return self
 
     def __exit__(self, *args):
         self.rollback()
+        if self._task_session is not None:
+            self._task_session.close()
+        for session in self._shard_sessions:
+            session.close()
         self._session.close()
 
     def commit(self):
+        if self.read_only:
+            raise ReadOnlyUnitOfWork()
+        if self._task_session is not None:
+            self._task_session.commit()
         self._session.commit()
+        changed_members, self.projects.changed_members = self.projects.changed_members, set()
+        if changed_members:
+            project_memberships.invalidate(changed_members)
+        # Some task writes are Core statements the ORM hook never sees: pin
+        # the owner of every committed change to the primary.
+        database.read_your_writes.mark_writes(user_id for user_id, _ in self.tasks.pending_changes)
+        # Only committed changes are pushed to subscribers.
+        publish_task_changes(self.tasks.pending_changes)
+        get_reminder_scheduler().apply_changes(self.tasks.pending_changes)
+        self.tasks.pending_changes = []
+        jobs, self._jobs = self._jobs, []
+        get_job_runner().submit(jobs)
+        events, self._audit_events = self._audit_events, []
+        record_audit_events(events)
 
     def rollback(self):
-        self._session.rollback()
\ No newline at end of file
+        if self._task_session is not None:
+            self._task_session.rollback()
+        self._session.rollback()
+        self.tasks.pending_changes = []
+        self.projects.changed_members = set()
+        self._jobs = []
+        self._audit_events = []
+
+    @contextmanager
+    def savepoint(self):
+        """Undo only what happens inside the block if it raises.
+
+        The database work is rolled back to a savepoint on each session, and
+        the changes, jobs and audit events the block recorded are dropped, so
+        the rest of the transaction can still commit.
+        """
+        sessions = [self._session] + ([self._task_session] if self._task_session is not None else [])
+        changes, members = len(self.tasks.pending_changes), set(self.projects.changed_members)
+        jobs, events = len(self._jobs), len(self._audit_events)
+        for session in sessions:
+            self._begin_sqlite_transaction(session)
+        try:
+            with ExitStack() as stack:
+                for session in sessions:
+                    stack.enter_context(session.begin_nested())
+                yield self
+        except BaseException:
+            del self.tasks.pending_changes[changes:]
+            self.projects.changed_members = members
+            del self._jobs[jobs:]
+            del self._audit_events[events:]
+            raise
+
+    @staticmethod
+    def _begin_sqlite_transaction(session) -> None:
+        """Open the transaction a savepoint must sit in, on SQLite.
+
+        pysqlite only emits BEGIN before a data-changing statement, not
+        before SAVEPOINT, which then starts a transaction of its own that
+        its RELEASE commits. IMMEDIATE takes the write lock up front, so the
+        transaction never has to upgrade a read lock, which fails at once
+        with "database is locked" when another connection holds one.
+        """
+        connection = session.connection()
+        if connection.dialect.name != "sqlite":
+            return
+        if not connection.connection.dbapi_connection.in_transaction:
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def task_repositories(self) -> List[TaskRepository]:
+        """One task repository per database holding tasks, to read across users.
+
+        That is ``tasks`` unless sharding is configured, and then a read on
+        each shard; writes still go through ``tasks`` on the user's shard.
+        """
+        shard_router = database.get_shard_router()
+        if shard_router is None:
+            return [self.tasks]
+        if not self._shard_sessions:
+            self._shard_sessions = [
+                shard_router.session_for_shard(name) for name in shard_router.shard_names
+            ]
+        return [TaskRepository(session) for session in self._shard_sessions]
+
+    def enqueue(self, name: str, **payload):
+        """Run job ``name`` after commit; the same job twice in one UoW runs once.
+
+        Durable jobs get a ``pending_jobs`` row in this transaction, so they
+        are committed, and later retried or recovered, along with it.
+        """
+        # Handlers get the payload as it comes back from the table, whether
+        # or not the job was recovered from it.
+        payload = json.loads(json.dumps(payload, default=str))
+        if any(job.name == name and job.payload == payload for job in self._jobs):
+            return
+        runner = get_job_runner()
+        job = Job(name, payload)
+        if runner.is_durable(name):
+            row = runner.new_row(name, payload)
+            self._session.add(row)
+            job.id = row.id
+        self._jobs.append(job)
+
+    def audit(self, action: str, actor_id: Optional[UUID] = None, subject_id: Optional[UUID] = None, **details):
+        # Stamped now, written only if the transaction commits.
+        self._audit_events.append(audit_event(action, actor_id, subject_id, **details))
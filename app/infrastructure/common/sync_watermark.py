@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.infrastructure.common.paginated_results import CursorPaginationHelper
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC; compare them the same way."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@dataclass(frozen=True)
+class SyncWatermark:
+    """Position in a user's change stream: the last ``(changed_at, id)`` seen.
+
+    Encoded as an opaque token with the same base64 scheme as pagination
+    cursors. Ties on ``changed_at`` are broken by id so no change is skipped.
+    """
+
+    changed_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        return CursorPaginationHelper.encode_cursor(
+            {"t": to_naive_utc(self.changed_at).isoformat(), "id": str(self.id)}
+        )
+
+    @classmethod
+    def decode(cls, token: str) -> "SyncWatermark":
+        value = CursorPaginationHelper.decode_cursor(token)
+        try:
+            return cls(changed_at=datetime.fromisoformat(value["t"]), id=UUID(value["id"]))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid sync token: {e}")
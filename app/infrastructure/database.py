@@ -1,23 +1,125 @@
-
+from functools import lru_cache
+from typing import Optional
+from uuid import UUID
 from sqlmodel import SQLModel, create_engine, Session
 from app.core.config import settings
+from app.infrastructure.common.read_your_writes import ReadYourWritesTracker, register_write_tracking
+
+# Engines are created on first use (normally by the app lifespan) rather than
+# at import, so importing the app, Alembic or a CLI doesn't load the database
+# driver or build connection pools it may never use.
+
+read_your_writes = ReadYourWritesTracker(settings.replica_sticky_seconds)
+
+def _engine_options() -> dict:
+    return {
+        "echo": settings.debug,
+        "pool_pre_ping": True,
+        "pool_recycle": 300,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+    }
+
+@lru_cache(maxsize=None)
+def get_engine():
+    return create_engine(settings.database_url, **_engine_options())
 
+@lru_cache(maxsize=None)
+def get_replica_engine():
+    if not settings.database_replica_url:
+        return None
+    register_write_tracking(read_your_writes)
+    return create_engine(settings.database_replica_url, **_engine_options())
 
-engine = create_engine(
-    settings.database_url,
-    echo=settings.debug,
-    pool_pre_ping=True,
-    pool_recycle=300,
-)
+@lru_cache(maxsize=None)
+def get_shard_router():
+    if not settings.database_shard_urls:
+        return None
+    from app.infrastructure.sharding.shard_router import ShardRouter, parse_shard_urls
+
+    return ShardRouter(
+        parse_shard_urls(settings.database_shard_urls),
+        virtual_nodes=settings.shard_virtual_nodes,
+        **_engine_options(),
+    )
+
+def __getattr__(name: str):
+    # Module attributes kept for existing callers, resolved lazily.
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engine":
+        return get_replica_engine()
+    if name == "shard_router":
+        return get_shard_router()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_db() -> Session: # type: ignore
-   
+
     with get_session() as session:
         yield session
-        
+
+def get_read_db(user_id: Optional[UUID] = None) -> Session: # type: ignore
+
+    with get_read_session(user_id) as session:
+        yield session
+
 def get_session() -> Session:
-    return Session(engine)
-        
+    return Session(get_engine())
+
+def get_read_session(user_id: Optional[UUID] = None) -> Session:
+    replica_engine = get_replica_engine()
+    if replica_engine is None or read_your_writes.is_pinned(user_id):
+        return Session(get_engine())
+    return Session(replica_engine)
+
+def get_task_session(user_id: UUID) -> Optional[Session]:
+    """Session on the shard owning ``user_id``, or None when not sharded."""
+    shard_router = get_shard_router()
+    if shard_router is None:
+        return None
+    return shard_router.session_for(user_id)
+
+def all_engines():
+    """Primary, replica and shard engines that are configured, creating them."""
+    engines = [get_engine()]
+    replica_engine = get_replica_engine()
+    if replica_engine is not None:
+        engines.append(replica_engine)
+    shard_router = get_shard_router()
+    if shard_router is not None:
+        engines.extend(shard_router.engine_by_name(name) for name in shard_router.shard_names)
+    return engines
+
+def pool_saturation() -> float:
+    """Share of the primary pool's connections checked out, 0 until it exists.
+
+    1 means the next ``get_db`` waits for a connection to come back.
+    """
+    if not get_engine.cache_info().currsize:
+        return 0.0
+    pool = get_engine().pool
+    checkedout = getattr(pool, "checkedout", None)
+    capacity = settings.db_pool_size + max(settings.db_max_overflow, 0)
+    if checkedout is None or capacity <= 0:
+        # Not a queue pool (e.g. in-memory SQLite): nothing to wait for
+        return 0.0
+    return checkedout() / capacity
+
+def dispose_engines(close: bool = True):
+    """Drop pooled connections; ``close=False`` is for a freshly forked child.
+
+    Engines that were never created are left alone.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=close)
+    if get_replica_engine.cache_info().currsize and get_replica_engine() is not None:
+        get_replica_engine().dispose(close=close)
+    if get_shard_router.cache_info().currsize and get_shard_router() is not None:
+        get_shard_router().dispose(close=close)
+
 def create_tables():
 
-    SQLModel.metadata.create_all(engine)
+    SQLModel.metadata.create_all(get_engine())
+    shard_router = get_shard_router()
+    if shard_router is not None:
+        shard_router.create_tables()
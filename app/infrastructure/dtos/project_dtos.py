@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from uuid import UUID
+from datetime import datetime
+from app.domain.constants.PROJECT_ROLE import ProjectRole
+
+
+class CreateProjectDto(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    # The creator, who becomes the project's owner
+    user_id: UUID
+
+
+class AddProjectMemberDto(BaseModel):
+    member_id: UUID
+
+
+class ProjectDto(BaseModel):
+    id: UUID
+    name: str
+    owner_id: UUID
+    # The requesting user's role in the project
+    role: ProjectRole
+    created_at: datetime
+
+
+class ProjectMemberDto(BaseModel):
+    user_id: UUID
+    role: ProjectRole
+    created_at: datetime
@@ -1,28 +1,68 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, create_model, field_validator, model_validator
+from typing import FrozenSet, List, Optional, Type
+from enum import Enum
+from functools import lru_cache
 from app.domain.constants.TASK_STATUS import TaskStatus
 from uuid import UUID
 from datetime import datetime
 
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_TASK = 20
+
+
+def normalize_tags(tags: Optional[List[str]]) -> Optional[List[str]]:
+    """Trim, lowercase and dedupe tag names, keeping their first-seen order."""
+    if tags is None:
+        return None
+    names = list(dict.fromkeys(name.strip().lower() for name in tags if name.strip()))
+    if any(len(name) > MAX_TAG_LENGTH for name in names):
+        raise ValueError(f"Tag names are limited to {MAX_TAG_LENGTH} characters")
+    if len(names) > MAX_TAGS_PER_TASK:
+        raise ValueError(f"A task can have at most {MAX_TAGS_PER_TASK} tags")
+    return names
+
+
 class CreateTaskDto(BaseModel):
     title: str
     description: Optional[str] = None
     status: TaskStatus
     user_id: UUID
+    due_at: Optional[datetime] = None
+    remind_at: Optional[datetime] = None
+    tags: Optional[List[str]] = None
+    # Makes the task a subtask of another task of the same user.
+    parent_id: Optional[UUID] = None
+    # Shares the task with a project's members; subtasks default to their parent's.
+    project_id: Optional[UUID] = None
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
 
 class UpdateTaskDto(BaseModel):
     id: UUID
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
+    due_at: Optional[datetime] = None
+    remind_at: Optional[datetime] = None
+    # None keeps the task's tags; a list replaces them.
+    tags: Optional[List[str]] = None
     updated_at: datetime
 
+    _normalize_tags = field_validator("tags")(normalize_tags)
+
 class TaskDto(BaseModel):
     id: UUID
     title: str
     description: Optional[str] = None
     status: TaskStatus
     user_id: UUID
+    due_at: Optional[datetime] = None
+    remind_at: Optional[datetime] = None
+    position: Optional[str] = None
+    tags: List[str] = []
+    parent_id: Optional[UUID] = None
+    child_count: int = 0
+    project_id: Optional[UUID] = None
 
 class TaskResponseDto(BaseModel):
     id: UUID
@@ -30,5 +70,134 @@ class TaskResponseDto(BaseModel):
     description: Optional[str] = None
     status: TaskStatus
     user_id: UUID
+    due_at: Optional[datetime] = None
+    remind_at: Optional[datetime] = None
+    position: Optional[str] = None
+    tags: List[str] = []
+    parent_id: Optional[UUID] = None
+    child_count: int = 0
+    project_id: Optional[UUID] = None
     created_at: datetime
-    updated_at: datetime
\ No newline at end of file
+    updated_at: datetime
+
+def parse_fields(fields: Optional[str], dto: Type[BaseModel]) -> Optional[FrozenSet[str]]:
+    """The names in a ``fields=`` parameter (comma-separated), checked against ``dto``.
+
+    None without the parameter, meaning every field. ``id`` is always added:
+    it is what cursors and clients key on.
+    """
+    if fields is None:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - dto.model_fields.keys()
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return frozenset(names | {"id"})
+
+
+@lru_cache(maxsize=256)
+def sparse_dto(dto: Type[BaseModel], fields: FrozenSet[str]) -> Type[BaseModel]:
+    """``dto`` cut down to ``fields``, built once per combination."""
+    return create_model(
+        f"{dto.__name__}Fields",
+        **{name: (field.annotation, field) for name, field in dto.model_fields.items() if name in fields}
+    )
+
+class TagDto(BaseModel):
+    id: UUID
+    name: str
+
+class MoveTaskDto(BaseModel):
+    # The task to place this one right after; None moves it to the top.
+    after_id: Optional[UUID] = None
+
+class TaskChangeType(str, Enum):
+    UPSERT = "upsert"
+    DELETE = "delete"
+
+class TaskChangeDto(BaseModel):
+    id: UUID
+    change: TaskChangeType
+    changed_at: datetime
+    task: Optional[TaskDto] = None
+
+class TaskChangesDto(BaseModel):
+    changes: List[TaskChangeDto]
+    next_token: Optional[str] = None
+    has_more: bool = False
+
+class BatchMode(str, Enum):
+    # Every operation or none: the first failure rolls the whole batch back.
+    ATOMIC = "atomic"
+    # Each operation applies or fails on its own; the ones that work commit.
+    BEST_EFFORT = "best_effort"
+
+class BatchOperationType(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    COMPLETE = "complete"
+
+class BatchOperationDto(BaseModel):
+    op: BatchOperationType
+    # The task to update, delete or complete: its id, or the ref of a task
+    # created earlier in the batch.
+    task_id: Optional[UUID] = None
+    task_ref: Optional[str] = None
+    # Names the task a create makes, for task_ref and parent_ref further on.
+    ref: Optional[str] = Field(None, min_length=1, max_length=100)
+    # create and update: the task's fields, as in POST /tasks/ and PUT /tasks/{id}
+    title: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[TaskStatus] = None
+    due_at: Optional[datetime] = None
+    remind_at: Optional[datetime] = None
+    tags: Optional[List[str]] = None
+    # create only
+    parent_id: Optional[UUID] = None
+    parent_ref: Optional[str] = None
+    project_id: Optional[UUID] = None
+
+    _normalize_tags = field_validator("tags")(normalize_tags)
+
+    @model_validator(mode="after")
+    def _check_operation(self):
+        if self.op == BatchOperationType.CREATE:
+            if self.title is None or self.status is None:
+                raise ValueError("create needs a title and a status")
+            if self.parent_id is not None and self.parent_ref is not None:
+                raise ValueError("give parent_id or parent_ref, not both")
+        elif (self.task_id is None) == (self.task_ref is None):
+            raise ValueError(f"{self.op.value} needs exactly one of task_id and task_ref")
+        return self
+
+class BatchRequestDto(BaseModel):
+    user_id: UUID
+    mode: BatchMode = BatchMode.ATOMIC
+    operations: List[BatchOperationDto] = Field(min_length=1)
+
+class BatchOperationStatus(str, Enum):
+    OK = "ok"
+    FAILED = "failed"
+    # Atomic batches only: applied, then undone by a later failure.
+    ROLLED_BACK = "rolled_back"
+    # Atomic batches only: not run after an earlier failure.
+    SKIPPED = "skipped"
+
+class BatchOperationResultDto(BaseModel):
+    index: int
+    op: BatchOperationType
+    status: BatchOperationStatus
+    ref: Optional[str] = None
+    # The task as it is after the operation; None for a delete.
+    task: Optional[TaskResponseDto] = None
+    error: Optional[str] = None
+    # The status the single-task endpoint would have answered a failure with.
+    status_code: Optional[int] = None
+
+class BatchResultDto(BaseModel):
+    mode: BatchMode
+    committed: bool
+    succeeded: int
+    failed: int
+    results: List[BatchOperationResultDto]
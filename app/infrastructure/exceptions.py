@@ -30,3 +30,15 @@ class InvalidCredentials(InfrastructureException):
     
     def __init__(self, message: str = "Invalid credentials"):
         super().__init__(message)
+
+
+class ReadOnlyUnitOfWork(InfrastructureException):
+
+    def __init__(self, message: str = "Cannot commit a read-only unit of work"):
+        super().__init__(message)
+
+
+class MemberAlreadyExists(InfrastructureException):
+
+    def __init__(self):
+        super().__init__("Member already exists")
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import delete
+from sqlmodel import Session, select
+
+from app.infrastructure.persistence.entities_configuration import IdempotencyKey
+
+
+class ReservationState(str, Enum):
+    RESERVED = "reserved"        # caller owns the key and must run the request
+    IN_FLIGHT = "in_flight"      # another request with this key is running
+    COMPLETED = "completed"      # a stored response can be replayed
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status_code: int
+    body: Any
+
+
+@dataclass(frozen=True)
+class Reservation:
+    state: ReservationState
+    fingerprint: str
+    response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore(ABC):
+    """Keeps the outcome of requests keyed by ``(scope, key)``."""
+
+    @abstractmethod
+    async def reserve(self, scope: str, key: str, fingerprint: str) -> Reservation:
+        """Claim the key, or report the in-flight/completed request holding it."""
+        pass
+
+    @abstractmethod
+    async def complete(self, scope: str, key: str, response: StoredResponse) -> None:
+        """Store the response for a reserved key and wake up waiters."""
+        pass
+
+    @abstractmethod
+    async def release(self, scope: str, key: str) -> None:
+        """Give a reserved key back after a failure so the client can retry."""
+        pass
+
+    @abstractmethod
+    async def wait(self, scope: str, key: str, timeout: float) -> None:
+        """Return when the in-flight request may have finished, or on timeout."""
+        pass
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process LRU of completed responses plus the requests in flight.
+
+    Concurrent duplicates wait on an ``asyncio.Event`` owned by the first
+    request; completed entries expire after ``ttl_seconds`` and the least
+    recently used ones are dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000):
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._completed: "OrderedDict[Tuple[str, str], Tuple[float, str, StoredResponse]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], Tuple[str, asyncio.Event]] = {}
+        self._lock = threading.Lock()
+
+    async def reserve(self, scope: str, key: str, fingerprint: str) -> Reservation:
+        entry_key = (scope, key)
+        now = time.monotonic()
+        with self._lock:
+            completed = self._completed.get(entry_key)
+            if completed is not None:
+                expires_at, stored_fingerprint, response = completed
+                if expires_at > now:
+                    self._completed.move_to_end(entry_key)
+                    return Reservation(ReservationState.COMPLETED, stored_fingerprint, response)
+                del self._completed[entry_key]
+
+            in_flight = self._in_flight.get(entry_key)
+            if in_flight is not None:
+                return Reservation(ReservationState.IN_FLIGHT, in_flight[0])
+
+            self._in_flight[entry_key] = (fingerprint, asyncio.Event())
+            return Reservation(ReservationState.RESERVED, fingerprint)
+
+    async def complete(self, scope: str, key: str, response: StoredResponse) -> None:
+        entry_key = (scope, key)
+        with self._lock:
+            fingerprint, event = self._in_flight.pop(entry_key)
+            self._completed[entry_key] = (time.monotonic() + self._ttl_seconds, fingerprint, response)
+            while len(self._completed) > self._max_entries:
+                self._completed.popitem(last=False)
+        event.set()
+
+    async def release(self, scope: str, key: str) -> None:
+        with self._lock:
+            in_flight = self._in_flight.pop((scope, key), None)
+        if in_flight is not None:
+            in_flight[1].set()
+
+    async def wait(self, scope: str, key: str, timeout: float) -> None:
+        in_flight = self._in_flight.get((scope, key))
+        if in_flight is None:
+            return
+        try:
+            await asyncio.wait_for(in_flight[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timestamps back without tzinfo; they were written as UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Responses stored in ``idempotency_keys`` so every worker shares them.
+
+    The unique constraint on ``(scope, key)`` arbitrates concurrent requests:
+    the insert that wins owns the key, the others see its row. In-flight rows
+    expire after ``lock_seconds`` so a crashed worker can't hold a key forever.
+    Waiters poll, since there is no cross-process notification.
+    """
+
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        ttl_seconds: float,
+        lock_seconds: float = 60.0,
+        poll_interval: float = 0.05,
+    ):
+        self._session_factory = session_factory
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._lock = timedelta(seconds=lock_seconds)
+        self._poll_interval = poll_interval
+
+    async def reserve(self, scope: str, key: str, fingerprint: str) -> Reservation:
+        return await asyncio.to_thread(self._reserve, scope, key, fingerprint)
+
+    def _reserve(self, scope: str, key: str, fingerprint: str) -> Reservation:
+        with self._session_factory() as session:
+            for _ in range(3):
+                now = datetime.now(timezone.utc)
+                session.add(
+                    IdempotencyKey(
+                        scope=scope,
+                        key=key,
+                        fingerprint=fingerprint,
+                        status=self.IN_PROGRESS,
+                        expires_at=now + self._lock,
+                    )
+                )
+                try:
+                    session.commit()
+                    return Reservation(ReservationState.RESERVED, fingerprint)
+                except IntegrityError:
+                    session.rollback()
+
+                row = session.exec(
+                    select(IdempotencyKey).where(
+                        IdempotencyKey.scope == scope, IdempotencyKey.key == key
+                    )
+                ).first()
+                if row is None:
+                    continue
+                if _as_utc(row.expires_at) <= now:
+                    session.exec(delete(IdempotencyKey).where(
+                        IdempotencyKey.id == row.id, IdempotencyKey.expires_at == row.expires_at
+                    ))
+                    session.commit()
+                    continue
+                if row.status == self.COMPLETED:
+                    response = StoredResponse(row.response_status, json.loads(row.response_body))
+                    return Reservation(ReservationState.COMPLETED, row.fingerprint, response)
+                return Reservation(ReservationState.IN_FLIGHT, row.fingerprint)
+        return Reservation(ReservationState.IN_FLIGHT, fingerprint)
+
+    async def complete(self, scope: str, key: str, response: StoredResponse) -> None:
+        await asyncio.to_thread(self._complete, scope, key, response)
+
+    def _complete(self, scope: str, key: str, response: StoredResponse) -> None:
+        with self._session_factory() as session:
+            row = session.exec(
+                select(IdempotencyKey).where(
+                    IdempotencyKey.scope == scope, IdempotencyKey.key == key
+                )
+            ).first()
+            if row is None:
+                return
+            row.status = self.COMPLETED
+            row.response_status = response.status_code
+            row.response_body = json.dumps(response.body)
+            row.expires_at = datetime.now(timezone.utc) + self._ttl
+            session.add(row)
+            session.commit()
+
+    async def release(self, scope: str, key: str) -> None:
+        await asyncio.to_thread(self._release, scope, key)
+
+    def _release(self, scope: str, key: str) -> None:
+        with self._session_factory() as session:
+            session.exec(delete(IdempotencyKey).where(
+                IdempotencyKey.scope == scope,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == self.IN_PROGRESS,
+            ))
+            session.commit()
+
+    async def wait(self, scope: str, key: str, timeout: float) -> None:
+        await asyncio.sleep(min(self._poll_interval, timeout))
+
+    def purge_expired(self) -> int:
+        """Delete expired rows; returns how many were removed."""
+        with self._session_factory() as session:
+            result = session.exec(delete(IdempotencyKey).where(
+                IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+            ))
+            session.commit()
+            return result.rowcount
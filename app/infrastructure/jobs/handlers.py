@@ -0,0 +1,61 @@
+"""
+Jobs run after commit by the ``JobRunner``.
+
+Each handler opens its own session, and running one twice is harmless: a
+durable job runs again if its process dies before it's marked done.
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import delete, or_
+
+from app.core.config import settings
+from app.infrastructure.database import get_session, get_task_session, read_your_writes
+from app.infrastructure.persistence.entities_configuration import RefreshToken
+from app.infrastructure.realtime.brokers import publish_task_changes
+from app.infrastructure.repositories.task_repository import TaskRepository
+
+PURGE_REFRESH_TOKENS = "auth.purge_refresh_tokens"
+PURGE_TOMBSTONES = "tasks.purge_tombstones"
+REBALANCE_POSITIONS = "tasks.rebalance_positions"
+
+
+def purge_refresh_tokens(user_id: str) -> int:
+    """Delete a user's expired and revoked refresh tokens."""
+    with get_session() as session:
+        result = session.exec(
+            delete(RefreshToken).where(
+                RefreshToken.user_id == UUID(user_id),
+                or_(RefreshToken.is_revoked.is_(True), RefreshToken.expires_at < datetime.now(timezone.utc)),
+            )
+        )
+        session.commit()
+        return result.rowcount
+
+
+def purge_tombstones(user_id: str) -> int:
+    """Delete a user's tombstones older than the sync retention window."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.tombstone_retention_days)
+    with get_task_session(UUID(user_id)) or get_session() as session:
+        return TaskRepository(session).purge_tombstones(cutoff, UUID(user_id))
+
+
+def rebalance_positions(user_id: str) -> int:
+    """Respread a user's task rank keys once moves have made them long."""
+    with get_task_session(UUID(user_id)) or get_session() as session:
+        repository = TaskRepository(session)
+        changed = repository.rebalance_positions(UUID(user_id))
+    # Committed: keep the user's reads on the primary (the UPDATE is a Core
+    # statement, which the ORM hook doesn't see) and tell their clients
+    # about their tasks' new keys.
+    read_your_writes.mark_writes(user_id for user_id, _ in repository.pending_changes)
+    publish_task_changes(repository.pending_changes)
+    return changed
+
+
+def register_default_jobs(runner) -> None:
+    # Idempotent sweeps that the user's next sign-in or delete repeats: a
+    # lost run costs nothing, a pending_jobs row per request would.
+    runner.register(PURGE_REFRESH_TOKENS, purge_refresh_tokens, durable=False)
+    runner.register(PURGE_TOMBSTONES, purge_tombstones, durable=False)
+    runner.register(REBALANCE_POSITIONS, rebalance_positions)
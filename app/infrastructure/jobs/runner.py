@@ -0,0 +1,339 @@
+import asyncio
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, select, update
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.infrastructure.common.sync_watermark import to_naive_utc
+from app.infrastructure.persistence.entities_configuration import PendingJob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    payload: Dict[str, Any]
+    # Row in ``pending_jobs``; None for jobs that aren't persisted.
+    id: Optional[UUID] = None
+    attempts: int = 0
+    ready_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class JobType:
+    handler: Callable[..., Any]
+    durable: bool = True
+    max_attempts: Optional[int] = None
+
+
+class JobRunner:
+    """Runs registered jobs on a pool of asyncio workers fed by a bounded queue.
+
+    Jobs reach the queue after their transaction commits (see
+    ``SQLModelUnitOfWork.enqueue``). Durable jobs also have a ``pending_jobs``
+    row from that transaction, removed once the job succeeds; while it exists
+    the job will eventually run, here or, once the lease has expired, in the
+    next process to start. Delivery is therefore at least once and handlers
+    must be idempotent.
+
+    Sync handlers run in a thread, async ones on the loop. A failing job is
+    retried after an exponential, jittered backoff and marked failed after
+    ``max_attempts``. When the queue is full, durable jobs are left to the
+    recovery sweep and the rest are dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int = 2,
+        queue_size: int = 1000,
+        max_attempts: int = 5,
+        backoff_seconds: float = 1.0,
+        backoff_max_seconds: float = 300.0,
+        lease_seconds: float = 300.0,
+        recovery_interval_seconds: float = 30.0,
+        lag_samples: int = 1000,
+    ):
+        self._session_factory = session_factory
+        self._workers = workers
+        self._queue_size = queue_size
+        self._max_attempts = max_attempts
+        self._backoff_seconds = backoff_seconds
+        self._backoff_max_seconds = backoff_max_seconds
+        self.lease_seconds = lease_seconds
+        self._recovery_interval_seconds = recovery_interval_seconds
+        self._types: Dict[str, JobType] = {}
+        self._queue: Optional["asyncio.Queue[Job]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: List[asyncio.TimerHandle] = []
+        self._lags: Deque[float] = deque(maxlen=lag_samples)
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.dropped = 0
+        self.recovered = 0
+
+    def register(self, name: str, handler: Callable[..., Any], durable: bool = True, max_attempts: Optional[int] = None) -> None:
+        """``handler(**payload)``; payloads must be JSON serializable."""
+        self._types[name] = JobType(handler, durable, max_attempts)
+
+    def is_durable(self, name: str) -> bool:
+        return self._job_type(name).durable
+
+    def _job_type(self, name: str) -> JobType:
+        job_type = self._types.get(name)
+        if job_type is None:
+            raise KeyError(f"Unknown job {name!r}")
+        return job_type
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._queue = asyncio.Queue(self._queue_size)
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self._workers)]
+        self._tasks.append(asyncio.create_task(self._recover_periodically(), name="job-recovery"))
+
+    async def stop(self, drain_seconds: float = 5.0) -> None:
+        """Give queued jobs ``drain_seconds`` to finish, then cancel the rest.
+
+        Durable jobs cut short keep their rows and run after the restart.
+        """
+        if self._queue is None:
+            return
+        queue, self._queue = self._queue, None
+        for handle in self._retries:
+            handle.cancel()
+        self._retries = []
+        try:
+            await asyncio.wait_for(queue.join(), drain_seconds)
+        except asyncio.TimeoutError:
+            logger.warning("Stopping with %d jobs still queued", queue.qsize())
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def new_row(self, name: str, payload: Dict[str, Any]) -> PendingJob:
+        """The ``pending_jobs`` row for a durable job, leased to this process."""
+        now = datetime.now(timezone.utc)
+        return PendingJob(
+            name=name,
+            payload=json.dumps(payload, default=str),
+            run_at=now,
+            claimed_until=now + timedelta(seconds=self.lease_seconds),
+        )
+
+    def submit(self, jobs: List[Job]) -> None:
+        """Queue jobs; callable from any thread. A no-op until started."""
+        loop = self._loop
+        if not jobs or self._queue is None or loop is None or loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._offer_all(jobs)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._offer_all, jobs)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+
+    def _offer_all(self, jobs: List[Job]) -> None:
+        for job in jobs:
+            self._offer(job)
+
+    def _offer(self, job: Job) -> None:
+        if self._queue is None:
+            return
+        job.ready_at = time.monotonic()
+        try:
+            self._queue.put_nowait(job)
+            self.submitted += 1
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if job.id is None:
+                logger.warning("Job queue full, dropping %s", job.name)
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            self._lags.append(time.monotonic() - job.ready_at)
+            self.in_flight += 1
+            try:
+                await self._run(job)
+            except Exception:
+                logger.exception("Job bookkeeping failed for %s", job.name)
+            finally:
+                self.in_flight -= 1
+                queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job_type = self._job_type(job.name)
+        try:
+            if inspect.iscoroutinefunction(job_type.handler):
+                await job_type.handler(**job.payload)
+            else:
+                await asyncio.to_thread(job_type.handler, **job.payload)
+        except Exception as error:
+            await self._failed(job, job_type, error)
+            return
+        self.completed += 1
+        if job.id is not None:
+            await asyncio.to_thread(self._delete_row, job.id)
+
+    async def _failed(self, job: Job, job_type: JobType, error: Exception) -> None:
+        job.attempts += 1
+        max_attempts = job_type.max_attempts or self._max_attempts
+        message = f"{type(error).__name__}: {error}"[:1000]
+        if job.attempts >= max_attempts:
+            self.failed += 1
+            logger.error("Job %s failed after %d attempts: %s", job.name, job.attempts, message)
+            if job.id is not None:
+                await asyncio.to_thread(self._mark_failed, job, message)
+            return
+
+        delay = min(self._backoff_max_seconds, self._backoff_seconds * 2 ** (job.attempts - 1))
+        delay *= 0.5 + random.random() / 2
+        self.retried += 1
+        logger.warning("Job %s failed (attempt %d), retrying in %.1fs: %s", job.name, job.attempts, delay, message)
+        if job.id is not None:
+            await asyncio.to_thread(self._reschedule_row, job, delay, message)
+        if self._loop is not None and self._queue is not None:
+            self._retries.append(self._loop.call_later(delay, self._retry, job))
+
+    def _retry(self, job: Job) -> None:
+        self._retries = [handle for handle in self._retries if not handle.cancelled() and handle.when() > self._loop.time()]
+        self._offer(job)
+
+    def _delete_row(self, job_id: UUID) -> None:
+        with self._session_factory() as session:
+            session.exec(delete(PendingJob).where(PendingJob.id == job_id))
+            session.commit()
+
+    def _mark_failed(self, job: Job, message: str) -> None:
+        with self._session_factory() as session:
+            session.exec(
+                update(PendingJob)
+                .where(PendingJob.id == job.id)
+                .values(attempts=job.attempts, last_error=message, failed_at=datetime.now(timezone.utc))
+            )
+            session.commit()
+
+    def _reschedule_row(self, job: Job, delay: float, message: str) -> None:
+        run_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+        with self._session_factory() as session:
+            session.exec(
+                update(PendingJob)
+                .where(PendingJob.id == job.id)
+                .values(
+                    attempts=job.attempts,
+                    last_error=message,
+                    run_at=run_at,
+                    claimed_until=run_at + timedelta(seconds=self.lease_seconds),
+                )
+            )
+            session.commit()
+
+    async def _recover_periodically(self) -> None:
+        while True:
+            try:
+                jobs = await asyncio.to_thread(self.claim_expired)
+                self.recovered += len(jobs)
+                self._offer_all(jobs)
+            except Exception:
+                logger.exception("Recovering pending jobs failed")
+            await asyncio.sleep(self._recovery_interval_seconds)
+
+    def claim_expired(self, limit: Optional[int] = None) -> List[Job]:
+        """Take over durable jobs whose lease expired, up to the free queue space.
+
+        Each row is claimed with a conditional update, so when several
+        processes sweep at once every row goes to one of them.
+        """
+        free = self._queue_size - (self._queue.qsize() if self._queue is not None else 0)
+        limit = min(limit or free, free)
+        if limit <= 0:
+            return []
+        now = datetime.now(timezone.utc)
+        claimed_until = now + timedelta(seconds=self.lease_seconds)
+        jobs = []
+        with self._session_factory() as session:
+            expired = session.exec(
+                select(PendingJob.id, PendingJob.name, PendingJob.payload, PendingJob.attempts)
+                .where(PendingJob.failed_at.is_(None), PendingJob.claimed_until < to_naive_utc(now))
+                .order_by(PendingJob.claimed_until)
+                .limit(limit)
+            ).all()
+            for row in expired:
+                claimed = session.exec(
+                    update(PendingJob)
+                    .where(PendingJob.id == row.id, PendingJob.claimed_until < to_naive_utc(now))
+                    .values(claimed_until=claimed_until)
+                ).rowcount
+                if claimed and row.name in self._types:
+                    jobs.append(Job(row.name, json.loads(row.payload), row.id, row.attempts))
+            session.commit()
+        return jobs
+
+    def stats(self) -> Dict[str, Any]:
+        lags = sorted(self._lags)
+
+        def lag_ms(fraction: float) -> float:
+            if not lags:
+                return 0.0
+            return round(lags[min(len(lags) - 1, int(fraction * len(lags)))] * 1000, 2)
+
+        return {
+            "running": self.running,
+            "workers": self._workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_capacity": self._queue_size,
+            "in_flight": self.in_flight,
+            "scheduled_retries": len(self._retries),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "recovered": self.recovered,
+            "lag_ms": {"p50": lag_ms(0.5), "p95": lag_ms(0.95), "p99": lag_ms(0.99), "max": lag_ms(1.0)},
+        }
+
+
+@lru_cache(maxsize=None)
+def get_job_runner() -> JobRunner:
+    from app.infrastructure.database import get_session
+    from app.infrastructure.jobs.handlers import register_default_jobs
+
+    runner = JobRunner(
+        get_session,
+        workers=settings.jobs_workers,
+        queue_size=settings.jobs_queue_size,
+        max_attempts=settings.jobs_max_attempts,
+        backoff_seconds=settings.jobs_backoff_seconds,
+        backoff_max_seconds=settings.jobs_backoff_max_seconds,
+        lease_seconds=settings.jobs_lease_seconds,
+        recovery_interval_seconds=settings.jobs_recovery_interval_seconds,
+    )
+    register_default_jobs(runner)
+    return runner
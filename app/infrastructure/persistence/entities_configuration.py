@@ -1,9 +1,12 @@
 
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, Index, String, UniqueConstraint, text
 from typing import Optional, List
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 from app.domain.constants.TASK_STATUS import TaskStatus
+from app.core.config import settings
+from app.infrastructure.persistence.partitioning import hash_partitioned
 
 
 class User(SQLModel, table=True):
@@ -22,21 +25,186 @@ class User(SQLModel, table=True):
     refresh_tokens: List["RefreshToken"] = Relationship(back_populates="user")
 
 
+# Rank keys compare by code point, whatever the database's collation.
+RankKey = String(255).with_variant(String(255, collation="C"), "postgresql")
+# Tag names too, so a prefix is a range of the (user_id, name) index.
+TagName = String(50).with_variant(String(50, collation="C"), "postgresql")
+
+PENDING_REMINDER = "remind_at IS NOT NULL AND reminded_at IS NULL AND status = 'PENDING'"
+
+
 class Task(SQLModel, table=True):
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_user_id_updated_at", "user_id", "updated_at"),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        # Manual order; id breaks ties between equal keys
+        Index("ix_tasks_user_id_position", "user_id", "position", "id"),
+        # Children of a task, the step of the subtree queries
+        Index("ix_tasks_user_id_parent_id", "user_id", "parent_id"),
+        # Project-wide listings, by id across the owners' partitions
+        Index(
+            "ix_tasks_project_id_id",
+            "project_id",
+            "id",
+            postgresql_where=text("project_id IS NOT NULL"),
+            sqlite_where=text("project_id IS NOT NULL"),
+        ),
+        # Only completed tasks, for the archiver to find old ones
+        Index(
+            "ix_tasks_completed_updated_at",
+            "updated_at",
+            postgresql_where=text("status = 'COMPLETED'"),
+            sqlite_where=text("status = 'COMPLETED'"),
+        ),
+        # Reminders still to send, for the scheduler to load the next window
+        Index(
+            "ix_tasks_pending_reminders",
+            "remind_at",
+            postgresql_where=text(PENDING_REMINDER),
+            sqlite_where=text(PENDING_REMINDER),
+        ),
+    )
     
+    # user_id is part of the key because Postgres requires the partition
+    # key in every unique constraint of a partitioned table.
     id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
     title: str = Field(max_length=200)
     description: Optional[str] = Field(max_length=1000, default=None)
     status: TaskStatus = Field(default=TaskStatus.PENDING)
     creation_date: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    user_id: UUID = Field(foreign_key="users.id", index=True)
+    user_id: UUID = Field(foreign_key="users.id", primary_key=True, index=True)
+    due_at: Optional[datetime] = Field(default=None)
+    remind_at: Optional[datetime] = Field(default=None)
+    # Set once the reminder went out; cleared whenever remind_at changes.
+    reminded_at: Optional[datetime] = Field(default=None)
+    # Rank key of the task in the user's manual order (see rank_keys).
+    position: Optional[str] = Field(default=None, sa_column=Column(RankKey))
+    # Subtasks belong to the same user, so they share the parent's partition
+    # and shard. No foreign key, as the primary key may be (id, user_id).
+    parent_id: Optional[UUID] = Field(default=None)
+    # Number of direct subtasks, kept by the repository and the archiver.
+    child_count: int = Field(default=0)
+    # Shared project the task belongs to. No foreign key: projects stay on
+    # the primary database when tasks are sharded.
+    project_id: Optional[UUID] = Field(default=None)
  
     user: User = Relationship(back_populates="tasks")
 
 
+hash_partitioned(Task.__table__, "user_id", settings.task_partitions)
+
+
+class TaskArchive(SQLModel, table=True):
+    """Completed tasks moved out of ``tasks`` by the archiver."""
+
+    __tablename__ = "tasks_archive"
+    __table_args__ = (Index("ix_tasks_archive_user_id_id", "user_id", "id"),)
+
+    id: UUID = Field(primary_key=True)
+    title: str = Field(max_length=200)
+    description: Optional[str] = Field(max_length=1000, default=None)
+    status: TaskStatus = Field(default=TaskStatus.COMPLETED)
+    creation_date: datetime
+    updated_at: datetime
+    user_id: UUID
+    due_at: Optional[datetime] = Field(default=None)
+    remind_at: Optional[datetime] = Field(default=None)
+    reminded_at: Optional[datetime] = Field(default=None)
+    position: Optional[str] = Field(default=None, sa_column=Column(RankKey))
+    parent_id: Optional[UUID] = Field(default=None)
+    child_count: int = Field(default=0)
+    project_id: Optional[UUID] = Field(default=None)
+    archived_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class TaskTombstone(SQLModel, table=True):
+    """Marks a deleted task so delta sync can report the deletion."""
+
+    __tablename__ = "task_tombstones"
+    __table_args__ = (Index("ix_task_tombstones_user_id_deleted_at", "user_id", "deleted_at"),)
+
+    task_id: UUID = Field(primary_key=True)
+    user_id: UUID
+    deleted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class Tag(SQLModel, table=True):
+    """A user's task label. Names are stored lowercased."""
+
+    __tablename__ = "tags"
+    __table_args__ = (
+        # Lookups by name and autocomplete by prefix
+        Index("ux_tags_user_id_name", "user_id", "name", unique=True),
+    )
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    user_id: UUID = Field(foreign_key="users.id")
+    name: str = Field(sa_column=Column(TagName, nullable=False))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class TaskTag(SQLModel, table=True):
+    """Links a task to one of its tags.
+
+    No foreign keys, like the tombstones: ``tasks`` may be partitioned with a
+    composite primary key. The repository removes a task's links with it.
+    """
+
+    __tablename__ = "task_tags"
+    __table_args__ = (
+        # Tag filters: the tasks carrying a tag
+        Index("ix_task_tags_tag_id_task_id", "tag_id", "task_id"),
+    )
+
+    # The primary key loads the tags of a page of tasks
+    task_id: UUID = Field(primary_key=True)
+    tag_id: UUID = Field(primary_key=True)
+
+
+class Project(SQLModel, table=True):
+    """A set of tasks shared by the project's members."""
+
+    __tablename__ = "projects"
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    name: str = Field(max_length=100)
+    owner_id: UUID = Field(foreign_key="users.id")
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class ProjectMember(SQLModel, table=True):
+    """A user's membership of a project, the owner's included."""
+
+    __tablename__ = "project_members"
+    __table_args__ = (
+        # A user's memberships: access checks and the project listing
+        Index("ix_project_members_user_id_project_id", "user_id", "project_id"),
+    )
+
+    # The primary key lists a project's members
+    project_id: UUID = Field(foreign_key="projects.id", primary_key=True)
+    user_id: UUID = Field(foreign_key="users.id", primary_key=True)
+    role: str = Field(max_length=20)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class TaskCount(SQLModel, table=True):
+    """Per-user task count kept up to date by creates and deletes.
+
+    ``version`` changes with every create or delete, i.e. whenever row
+    positions in the user's listing shift.
+    """
+
+    __tablename__ = "task_counts"
+
+    user_id: UUID = Field(primary_key=True)
+    task_count: int = Field(default=0)
+    version: int = Field(default=0)
+
+
 class RefreshToken(SQLModel, table=True):
    
     __tablename__ = "refresh_tokens"
@@ -49,3 +217,58 @@ class RefreshToken(SQLModel, table=True):
     user_id: UUID = Field(foreign_key="users.id", index=True)
     
     user: User = Relationship(back_populates="refresh_tokens")
+
+
+class IdempotencyKey(SQLModel, table=True):
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("scope", "key", name="uq_idempotency_keys_scope_key"),)
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    scope: str = Field(max_length=100)
+    key: str = Field(max_length=255)
+    fingerprint: str = Field(max_length=64)
+    status: str = Field(max_length=20)
+    response_status: Optional[int] = Field(default=None)
+    response_body: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    expires_at: datetime = Field(index=True)
+
+
+class PendingJob(SQLModel, table=True):
+    """A background job that hasn't succeeded yet; deleted once it does.
+
+    Rows are written in the transaction that enqueues the job, so a job
+    exists exactly when its transaction committed. ``claimed_until`` is the
+    lease of the worker process that will run it; rows whose lease expired
+    are picked up again, after a restart or a crash.
+    """
+
+    __tablename__ = "pending_jobs"
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    name: str = Field(max_length=100)
+    payload: str
+    attempts: int = Field(default=0)
+    run_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    claimed_until: datetime = Field(index=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    last_error: Optional[str] = Field(default=None, max_length=1000)
+    failed_at: Optional[datetime] = Field(default=None)
+
+
+class AuditEvent(SQLModel, table=True):
+    """Who did what, and when: task changes, sign-ins and token revocations.
+
+    Written in batches by the ``AuditLog`` writer, never updated.
+    """
+
+    __tablename__ = "audit_events"
+    __table_args__ = (Index("ix_audit_events_actor_id_occurred_at", "actor_id", "occurred_at"),)
+
+    id: Optional[UUID] = Field(default_factory=uuid4, primary_key=True)
+    occurred_at: datetime = Field(index=True)
+    action: str = Field(max_length=50)
+    actor_id: Optional[UUID] = Field(default=None)
+    subject_id: Optional[UUID] = Field(default=None)
+    details: Optional[str] = Field(default=None)
@@ -0,0 +1,45 @@
+from typing import List
+
+from sqlalchemy import Table, event, text
+
+PARTITIONS_INFO_KEY = "hash_partitions"
+
+
+def hash_partition_names(table_name: str, partitions: int) -> List[str]:
+    return [f"{table_name}_p{remainder}" for remainder in range(partitions)]
+
+
+def hash_partition_ddl(table_name: str, partitions: int, parent: str = None) -> List[str]:
+    """``CREATE TABLE ... PARTITION OF`` for every remainder of ``partitions``.
+
+    ``parent`` is the partitioned table when it doesn't have its final name
+    yet (the online migration builds it under a temporary one).
+    """
+    parent = parent or table_name
+    return [
+        f"CREATE TABLE {name} PARTITION OF {parent} "
+        f"FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})"
+        for remainder, name in enumerate(hash_partition_names(table_name, partitions))
+    ]
+
+
+def hash_partitioned(table: Table, column: str, partitions: int) -> Table:
+    """Make ``table`` hash-partitioned by ``column`` when created on Postgres.
+
+    Sets ``PARTITION BY HASH`` on the table and creates its partitions right
+    after it. Other databases get a plain table. With ``partitions`` below 1
+    the table is left alone.
+    """
+    if partitions < 1:
+        return table
+    table.dialect_options["postgresql"]["partition_by"] = f"HASH ({column})"
+    table.info[PARTITIONS_INFO_KEY] = partitions
+
+    @event.listens_for(table, "after_create")
+    def create_partitions(target, connection, **kw):
+        if connection.dialect.name != "postgresql":
+            return
+        for statement in hash_partition_ddl(target.name, partitions):
+            connection.execute(text(statement))
+
+    return table
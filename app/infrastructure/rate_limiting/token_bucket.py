@@ -0,0 +1,141 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class BucketPolicy:
+    """``capacity`` tokens, refilled at ``refill_per_second``."""
+
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def per_minute(cls, capacity: float, per_minute: float) -> "BucketPolicy":
+        return cls(capacity=capacity, refill_per_second=per_minute / 60.0)
+
+    @property
+    def seconds_to_full(self) -> float:
+        return self.capacity / self.refill_per_second
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    retry_after: float = 0.0
+
+
+class RateLimitStore(ABC):
+    """Token bucket storage keyed by an arbitrary string."""
+
+    @abstractmethod
+    async def consume(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> RateLimitDecision:
+        """Take ``cost`` tokens from the bucket for ``key`` if it has them."""
+        pass
+
+
+def refill(state: Optional[Tuple[float, float]], policy: BucketPolicy, now: float) -> float:
+    if state is None:
+        return policy.capacity
+    tokens, updated_at = state
+    return min(policy.capacity, tokens + (now - updated_at) * policy.refill_per_second)
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """Per-process buckets: one ``(tokens, updated_at)`` pair per key.
+
+    Keys are kept in least-recently-used order. A bucket left alone for longer
+    than it takes to refill is indistinguishable from a new one, so idle keys
+    are evicted from the cold end on every call, and ``max_keys`` bounds memory
+    when an attacker rotates through many addresses.
+    """
+
+    def __init__(self, idle_seconds: float, max_keys: int = 100_000):
+        self._idle_seconds = idle_seconds
+        self._max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> RateLimitDecision:
+        now = time.monotonic()
+        with self._lock:
+            tokens = refill(self._buckets.get(key), policy, now)
+            if tokens >= cost:
+                decision = RateLimitDecision(allowed=True)
+                tokens -= cost
+            else:
+                decision = RateLimitDecision(
+                    allowed=False,
+                    retry_after=(cost - tokens) / policy.refill_per_second,
+                )
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            self._evict(now)
+        return decision
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            _, (_, updated_at) = next(iter(buckets.items()))
+            if now - updated_at < self._idle_seconds and len(buckets) <= self._max_keys:
+                return
+            buckets.popitem(last=False)
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+if tokens == nil then
+  tokens = capacity
+else
+  tokens = math.min(capacity, tokens + (now - tonumber(state[2])) * rate)
+end
+local retry_after = 0
+if tokens >= cost then
+  tokens = tokens - cost
+else
+  retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return tostring(retry_after)
+"""
+
+
+class RedisRateLimitStore(RateLimitStore):
+    """Buckets shared by every worker, updated atomically by a Lua script.
+
+    Keys expire once their bucket would be full again, so Redis does the idle
+    eviction. Requires the optional ``redis`` package.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed"
+            ) from e
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = prefix
+
+    async def consume(self, key: str, policy: BucketPolicy, cost: float = 1.0) -> RateLimitDecision:
+        retry_after = float(
+            await self._script(
+                keys=[self._prefix + key],
+                args=[policy.capacity, policy.refill_per_second, cost],
+            )
+        )
+        return RateLimitDecision(allowed=retry_after == 0, retry_after=retry_after)
@@ -0,0 +1,198 @@
+import json
+import logging
+import queue
+import select
+import threading
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.infrastructure.dtos.task_dtos import TaskChangeDto
+from app.infrastructure.realtime.hub import EventHub
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "task_changes"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_PAYLOAD_BYTES = 7999
+
+
+class EventBroker(ABC):
+    """Delivers committed task changes to the hub of every worker."""
+
+    def __init__(self, hub: EventHub):
+        self.hub = hub
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    def publish(self, user_id: UUID, change: TaskChangeDto) -> None:
+        """Send a change; must not block the caller on the network."""
+        pass
+
+
+class LocalEventBroker(EventBroker):
+    """Delivers straight to the local hub(s).
+
+    Enough for a single worker, and the stand-in for the Postgres broker in
+    tests: attach several hubs to see what each worker would receive.
+    """
+
+    def __init__(self, hub: EventHub):
+        super().__init__(hub)
+        self._hubs = [hub]
+
+    def attach(self, hub: EventHub) -> None:
+        self._hubs.append(hub)
+
+    def publish(self, user_id: UUID, change: TaskChangeDto) -> None:
+        for hub in self._hubs:
+            hub.publish(user_id, change)
+
+
+def encode_change(user_id: UUID, change: TaskChangeDto) -> str:
+    """The change as an ASCII JSON payload that fits in a NOTIFY.
+
+    Escaped non-ASCII text takes up to 12 bytes a character, so a task with
+    long titles, descriptions or tags can exceed the limit: it is then sent
+    without ``task``, as its id and change type, and clients fetch it.
+    """
+    payload = json.dumps({"user_id": str(user_id), "change": change.model_dump(mode="json")})
+    if len(payload) > MAX_PAYLOAD_BYTES:
+        payload = json.dumps(
+            {"user_id": str(user_id), "change": change.model_dump(mode="json", exclude={"task"})}
+        )
+    return payload
+
+
+def decode_change(payload: str) -> Tuple[UUID, TaskChangeDto]:
+    message = json.loads(payload)
+    return UUID(message["user_id"]), TaskChangeDto.model_validate(message["change"])
+
+
+class PostgresEventBroker(EventBroker):
+    """Fans changes out across workers with ``NOTIFY``/``LISTEN``.
+
+    Every worker LISTENs on one connection and feeds what it hears into its
+    own hub, including its own notifications, so a change reaches subscribers
+    on every worker exactly once. Publishing only enqueues; a sender thread
+    drains the outbox in batches on a second connection. If the outbox is full
+    the change is dropped: events are hints and clients recover through delta
+    sync. A change too large for a notification goes out without its task
+    (see ``encode_change``), and each is sent on its own, so one that fails
+    doesn't take the rest of its batch with it.
+    """
+
+    def __init__(self, dsn: str, hub: EventHub, outbox_size: int = 10_000, batch_size: int = 100):
+        super().__init__(hub)
+        self._dsn = dsn
+        self._batch_size = batch_size
+        self._outbox: "queue.Queue[Tuple[UUID, TaskChangeDto]]" = queue.Queue(outbox_size)
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._threads = [
+            threading.Thread(target=self._listen, name="task-changes-listen", daemon=True),
+            threading.Thread(target=self._send, name="task-changes-notify", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def publish(self, user_id: UUID, change: TaskChangeDto) -> None:
+        if not self._threads:
+            return
+        try:
+            self._outbox.put_nowait((user_id, change))
+        except queue.Full:
+            logger.warning("Task change outbox full, dropping change for %s", change.id)
+
+    def _connect(self):
+        import psycopg2
+
+        connection = psycopg2.connect(self._dsn)
+        connection.autocommit = True
+        return connection
+
+    def _listen(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                connection = self._connect()
+                try:
+                    connection.cursor().execute(f"LISTEN {CHANNEL}")
+                    while not self._stopping.is_set():
+                        if select.select([connection], [], [], 1.0)[0]:
+                            connection.poll()
+                            while connection.notifies:
+                                notify = connection.notifies.pop(0)
+                                self.hub.publish(*decode_change(notify.payload))
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception("LISTEN %s failed, reconnecting", CHANNEL)
+                self._stopping.wait(1.0)
+
+    def _send(self) -> None:
+        connection = None
+        while not self._stopping.is_set() or not self._outbox.empty():
+            try:
+                batch = [self._outbox.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            for position, (user_id, change) in enumerate(batch):
+                try:
+                    if connection is None or connection.closed:
+                        connection = self._connect()
+                except Exception:
+                    logger.exception("NOTIFY %s failed, dropped %d changes", CHANNEL, len(batch) - position)
+                    connection = None
+                    break
+                try:
+                    connection.cursor().execute(
+                        "SELECT pg_notify(%s, %s)", (CHANNEL, encode_change(user_id, change))
+                    )
+                except Exception:
+                    logger.exception("NOTIFY %s failed, dropped change for %s", CHANNEL, change.id)
+        if connection is not None:
+            connection.close()
+
+
+@lru_cache(maxsize=None)
+def get_event_hub() -> EventHub:
+    return EventHub(settings.realtime_queue_size)
+
+
+@lru_cache(maxsize=None)
+def get_event_broker() -> EventBroker:
+    if settings.realtime_backend == "postgres":
+        from app.infrastructure.database import get_engine
+
+        dsn = get_engine().url.set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresEventBroker(dsn, get_event_hub())
+    return LocalEventBroker(get_event_hub())
+
+
+def publish_task_changes(changes: List[Tuple[UUID, TaskChangeDto]]) -> None:
+    if not changes:
+        return
+    broker = get_event_broker()
+    for user_id, change in changes:
+        broker.publish(user_id, change)
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from typing import Dict, Optional, Set
+from uuid import UUID
+
+from app.infrastructure.dtos.task_dtos import TaskChangeDto
+
+
+class Subscription:
+    """One client's bounded queue of task changes.
+
+    A client that falls ``maxsize`` events behind is dropped: its pending
+    events are discarded and ``get`` returns ``None``, telling the endpoint to
+    ask the client to catch up through ``/tasks/changes`` instead.
+    """
+
+    def __init__(self, user_id: UUID, maxsize: int):
+        self.user_id = user_id
+        self.dropped = False
+        self._queue: "asyncio.Queue[Optional[TaskChangeDto]]" = asyncio.Queue(maxsize)
+
+    def offer(self, change: TaskChangeDto) -> bool:
+        if self.dropped:
+            return False
+        try:
+            self._queue.put_nowait(change)
+            return True
+        except asyncio.QueueFull:
+            self.dropped = True
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait(None)
+            return False
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[TaskChangeDto]:
+        """Next change, or ``None`` once dropped. Raises ``TimeoutError``."""
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+
+class EventHub:
+    """In-process fan-out of task changes to the subscribers of each user.
+
+    Subscribers live on the event loop; ``publish`` may be called from any
+    thread (sync endpoints run in the threadpool) and hands the event over to
+    the loop. With no subscriber connected yet publishing is a no-op.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self._queue_size = queue_size
+        self._subscribers: Dict[UUID, Set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, user_id: UUID) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        subscription = Subscription(user_id, self._queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def subscriber_count(self, user_id: Optional[UUID] = None) -> int:
+        if user_id is not None:
+            return len(self._subscribers.get(user_id, ()))
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id: UUID, change: TaskChangeDto) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            self._dispatch(user_id, change)
+        else:
+            try:
+                loop.call_soon_threadsafe(self._dispatch, user_id, change)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+
+    def _dispatch(self, user_id: UUID, change: TaskChangeDto) -> None:
+        self.published += 1
+        for subscription in list(self._subscribers.get(user_id, ())):
+            if not subscription.offer(change):
+                self.unsubscribe(subscription)
+                self.dropped += 1
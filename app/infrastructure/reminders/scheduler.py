@@ -0,0 +1,326 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.domain.constants.TASK_STATUS import TaskStatus
+from app.infrastructure.common.sync_watermark import to_naive_utc
+from app.infrastructure.dtos.task_dtos import TaskChangeDto, TaskChangeType
+from app.infrastructure.persistence.entities_configuration import Task as TaskEntity
+from app.infrastructure.reminders.sinks import Reminder, ReminderSink, build_sink
+
+logger = logging.getLogger(__name__)
+
+tasks_table = TaskEntity.__table__
+
+# Same predicate as the partial index ix_tasks_pending_reminders.
+pending_reminder = and_(
+    tasks_table.c.remind_at.isnot(None),
+    tasks_table.c.reminded_at.is_(None),
+    tasks_table.c.status == TaskStatus.PENDING,
+)
+
+
+def _aware(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class ReminderQueue:
+    """Min-heap of reminders by time, with at most one live entry per task.
+
+    Rescheduling or cancelling a task only updates the index; its old heap
+    entry is skipped when it surfaces. Both are O(log n) / O(1).
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Reminder]] = []
+        self._live: Dict[UUID, int] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def schedule(self, reminder: Reminder) -> None:
+        sequence = next(self._sequence)
+        self._live[reminder.task_id] = sequence
+        heapq.heappush(self._heap, (reminder.remind_at.timestamp(), sequence, reminder))
+
+    def cancel(self, task_id: UUID) -> None:
+        self._live.pop(task_id, None)
+
+    def next_at(self) -> Optional[float]:
+        """Epoch seconds of the earliest reminder, if any."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int) -> List[Reminder]:
+        due = []
+        while len(due) < limit:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, reminder = heapq.heappop(self._heap)
+            del self._live[reminder.task_id]
+            due.append(reminder)
+        return due
+
+    def _drop_stale(self) -> None:
+        heap = self._heap
+        while heap and self._live.get(heap[0][2].task_id) != heap[0][1]:
+            heapq.heappop(heap)
+        # Compact once stale entries outnumber live ones.
+        if len(heap) > 2 * len(self._live) + 1024:
+            self._heap = [entry for entry in heap if self._live.get(entry[2].task_id) == entry[1]]
+            heapq.heapify(self._heap)
+
+
+class ReminderStore:
+    """Reads and claims pending reminders in every task database."""
+
+    def __init__(self, engines: List[Engine], engine_for: Callable[[UUID], Engine]):
+        self._engines = engines
+        self._engine_for = engine_for
+
+    def due_before(self, until: datetime, limit: int) -> List[Reminder]:
+        """Unsent reminders up to ``until`` (overdue ones included), earliest first.
+
+        A range scan of the partial index in each database.
+        """
+        statement = (
+            select(tasks_table.c.id, tasks_table.c.user_id, tasks_table.c.remind_at,
+                   tasks_table.c.title, tasks_table.c.due_at)
+            .where(pending_reminder, tasks_table.c.remind_at < to_naive_utc(until))
+            .order_by(tasks_table.c.remind_at)
+            .limit(limit)
+        )
+        reminders = []
+        for engine in self._engines:
+            with engine.connect() as connection:
+                reminders += [
+                    Reminder(row.id, row.user_id, _aware(row.remind_at), row.title, _aware(row.due_at))
+                    for row in connection.execute(statement)
+                ]
+        reminders.sort(key=lambda reminder: reminder.remind_at)
+        return reminders[:limit]
+
+    def claim(self, reminders: List[Reminder], now: datetime) -> List[Reminder]:
+        """Mark reminders sent; returns the ones this call won.
+
+        The update re-checks that each reminder is still pending and due, so
+        a task changed since it was loaded, or claimed by another process,
+        is left out.
+        """
+        claimed = []
+        for engine, group in self._by_engine(reminders).items():
+            statement = (
+                update(tasks_table)
+                .where(
+                    self._selected(group),
+                    pending_reminder,
+                    tasks_table.c.remind_at <= to_naive_utc(now),
+                )
+                .values(reminded_at=to_naive_utc(now))
+                .returning(tasks_table.c.id, tasks_table.c.user_id, tasks_table.c.remind_at,
+                           tasks_table.c.title, tasks_table.c.due_at)
+            )
+            with engine.begin() as connection:
+                claimed += [
+                    Reminder(row.id, row.user_id, _aware(row.remind_at), row.title, _aware(row.due_at))
+                    for row in connection.execute(statement)
+                ]
+        return claimed
+
+    def release(self, reminders: List[Reminder]) -> None:
+        """Undo ``claim`` for reminders that couldn't be delivered."""
+        for engine, group in self._by_engine(reminders).items():
+            with engine.begin() as connection:
+                connection.execute(
+                    update(tasks_table)
+                    .where(self._selected(group))
+                    .values(reminded_at=None)
+                )
+
+    @staticmethod
+    def _selected(reminders: List[Reminder]):
+        # Task ids are unique; the user ids let Postgres prune partitions.
+        return and_(
+            tasks_table.c.user_id.in_({reminder.user_id for reminder in reminders}),
+            tasks_table.c.id.in_([reminder.task_id for reminder in reminders]),
+        )
+
+    def _by_engine(self, reminders: List[Reminder]) -> Dict[Engine, List[Reminder]]:
+        groups: Dict[Engine, List[Reminder]] = defaultdict(list)
+        for reminder in reminders:
+            groups[self._engine_for(reminder.user_id)].append(reminder)
+        return groups
+
+
+class ReminderScheduler:
+    """Fires task reminders through a sink without polling the whole table.
+
+    Only reminders due within the next ``window_seconds`` are held in memory,
+    in a ``ReminderQueue``; the window is reloaded from the partial index
+    every ``refresh_seconds``. Between reloads, committed task changes
+    (``apply_changes``) schedule, move or cancel reminders that fall inside
+    the loaded window. Due reminders are claimed in the database before they
+    are sent, so when every worker process runs a scheduler each reminder
+    still goes out once; one whose sink call fails is released and retried
+    at the next reload.
+    """
+
+    def __init__(
+        self,
+        store: ReminderStore,
+        sink: ReminderSink,
+        window_seconds: float = 300.0,
+        refresh_seconds: float = 60.0,
+        load_limit: int = 10_000,
+        batch_size: int = 500,
+    ):
+        self._store = store
+        self._sink = sink
+        self._window = window_seconds
+        self._refresh = min(refresh_seconds, window_seconds)
+        self._load_limit = load_limit
+        self._batch_size = batch_size
+        self._queue = ReminderQueue()
+        self._condition = threading.Condition()
+        # Reminders up to the horizon are in the queue.
+        self._horizon = 0.0
+        self._next_refresh = 0.0
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self.loaded = 0
+        self.sent = 0
+        self.lost_claims = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        self._stopping = False
+        self._next_refresh = 0.0
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            return
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def apply_changes(self, changes: List[Tuple[UUID, TaskChangeDto]]) -> None:
+        """Keep the loaded window in step with committed task changes."""
+        if self._thread is None or not changes:
+            return
+        with self._condition:
+            for user_id, change in changes:
+                task = change.task
+                remind_at = _aware(task.remind_at) if task is not None else None
+                if (
+                    change.change == TaskChangeType.UPSERT
+                    and remind_at is not None
+                    and task.status == TaskStatus.PENDING
+                    and remind_at.timestamp() < self._horizon
+                ):
+                    self._queue.schedule(Reminder(task.id, user_id, remind_at, task.title, _aware(task.due_at)))
+                else:
+                    self._queue.cancel(change.id)
+            self._condition.notify_all()
+
+    def refresh(self) -> None:
+        """Load the reminders of the next window into the queue."""
+        horizon = datetime.now(timezone.utc) + timedelta(seconds=self._window)
+        reminders = self._store.due_before(horizon, self._load_limit)
+        if len(reminders) == self._load_limit:
+            # More than fit: the window ends at the last one loaded.
+            horizon = reminders[-1].remind_at
+        with self._condition:
+            for reminder in reminders:
+                self._queue.schedule(reminder)
+            self._horizon = horizon.timestamp()
+        self.loaded += len(reminders)
+
+    def fire_due(self) -> int:
+        with self._condition:
+            due = self._queue.pop_due(time.time(), self._batch_size)
+        if not due:
+            return 0
+        claimed = self._store.claim(due, datetime.now(timezone.utc))
+        self.lost_claims += len(due) - len(claimed)
+        if claimed:
+            try:
+                self._sink.send(claimed)
+                self.sent += len(claimed)
+            except Exception:
+                self.failed += len(claimed)
+                logger.exception("Sending %d reminders failed, releasing them", len(claimed))
+                self._store.release(claimed)
+        return len(due)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+            try:
+                if time.monotonic() >= self._next_refresh:
+                    self._next_refresh = time.monotonic() + self._refresh
+                    self.refresh()
+                if self.fire_due():
+                    continue
+            except Exception:
+                logger.exception("Reminder scheduler iteration failed")
+            with self._condition:
+                next_at = self._queue.next_at()
+                timeout = self._next_refresh - time.monotonic()
+                if next_at is not None:
+                    timeout = min(timeout, next_at - time.time())
+                if timeout > 0 and not self._stopping:
+                    self._condition.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "scheduled": len(self._queue),
+            "window_seconds": self._window,
+            "loaded": self.loaded,
+            "sent": self.sent,
+            "lost_claims": self.lost_claims,
+            "failed": self.failed,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_reminder_scheduler() -> ReminderScheduler:
+    from app.infrastructure.database import get_engine, get_shard_router
+
+    router = get_shard_router()
+    if router is not None:
+        store = ReminderStore([router.engine_by_name(name) for name in router.shard_names], router.engine_for)
+    else:
+        store = ReminderStore([get_engine()], lambda user_id: get_engine())
+    return ReminderScheduler(
+        store,
+        build_sink(settings.reminder_sink, settings.reminder_webhook_url),
+        window_seconds=settings.reminder_window_seconds,
+        refresh_seconds=settings.reminder_refresh_seconds,
+        load_limit=settings.reminder_load_limit,
+    )
@@ -0,0 +1,64 @@
+import json
+import logging
+import urllib.request
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Reminder:
+    task_id: UUID
+    user_id: UUID
+    # Aware UTC
+    remind_at: datetime
+    title: str = ""
+    due_at: Optional[datetime] = None
+
+
+class ReminderSink(ABC):
+    """Where due reminders are delivered.
+
+    ``send`` raising means none of the batch was delivered; the reminders
+    are released and sent again later.
+    """
+
+    @abstractmethod
+    def send(self, reminders: List[Reminder]) -> None:
+        pass
+
+
+class LoggingReminderSink(ReminderSink):
+    def send(self, reminders: List[Reminder]) -> None:
+        for reminder in reminders:
+            logger.info("Reminder for task %s of user %s: %s", reminder.task_id, reminder.user_id, reminder.title)
+
+
+class WebhookReminderSink(ReminderSink):
+    """POSTs each batch as a JSON array to ``url``."""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self._url = url
+        self._timeout = timeout
+
+    def send(self, reminders: List[Reminder]) -> None:
+        body = json.dumps([asdict(reminder) for reminder in reminders], default=str).encode()
+        request = urllib.request.Request(
+            self._url, data=body, method="POST", headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            response.read()
+
+
+def build_sink(kind: str, webhook_url: str = "") -> ReminderSink:
+    if kind == "log":
+        return LoggingReminderSink()
+    if kind == "webhook":
+        if not webhook_url:
+            raise ValueError("REMINDER_WEBHOOK_URL is required with REMINDER_SINK=webhook")
+        return WebhookReminderSink(webhook_url)
+    raise ValueError(f"Unknown reminder sink {kind!r}")
@@ -0,0 +1,136 @@
+from sqlmodel import Session, select
+from sqlalchemy.exc import IntegrityError
+from uuid import UUID
+from typing import Dict, Optional, Set
+from app.domain.constants.PROJECT_ROLE import ProjectRole
+from app.domain.entities.projects import Project
+from app.domain.repositories.iproject_repository import IProjectRepository
+from app.infrastructure.persistence.entities_configuration import Project as ProjectEntity, ProjectMember
+from app.infrastructure.dtos.project_dtos import ProjectDto, ProjectMemberDto
+from app.infrastructure.common.membership_cache import project_memberships
+from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult, CursorPaginationHelper
+from app.infrastructure.exceptions import MemberAlreadyExists
+
+
+class ProjectRepository(IProjectRepository):
+    def __init__(self, session: Session):
+        self._session = session
+        # Users whose memberships changed, dropped from the membership cache
+        # by the unit of work once its commit succeeds.
+        self.changed_members: Set[UUID] = set()
+
+    def create(self, project: Project) -> Project:
+        project_entity = ProjectEntity(
+            id=project.id,
+            name=project.name,
+            owner_id=project.owner_id,
+            created_at=project.created_at
+        )
+        self._session.add(project_entity)
+        self._session.add(ProjectMember(
+            project_id=project.id, user_id=project.owner_id, role=ProjectRole.OWNER.value
+        ))
+        self._session.flush()
+        self.changed_members.add(project.owner_id)
+        return project
+
+    def get_by_id(self, id: UUID) -> Optional[Project]:
+        project_entity = self._session.get(ProjectEntity, id)
+        return self._entity_to_domain(project_entity) if project_entity else None
+
+    def get_memberships(self, user_id: UUID) -> Dict[UUID, ProjectRole]:
+        memberships, generation = project_memberships.get(user_id)
+        if memberships is None:
+            # One index range on (user_id, project_id), then set lookups for
+            # every check until the entry expires or is invalidated.
+            rows = self._session.exec(
+                select(ProjectMember.project_id, ProjectMember.role).where(ProjectMember.user_id == user_id)
+            ).all()
+            memberships = {row.project_id: ProjectRole(row.role) for row in rows}
+            project_memberships.set(user_id, generation, memberships)
+        return memberships
+
+    def get_user_projects_paginated(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectDto]:
+        # Keyset on the membership's project_id, so the page is a range of
+        # (user_id, project_id) joined to the projects on it.
+        statement = (
+            select(ProjectEntity, ProjectMember.role)
+            .join(ProjectMember, ProjectMember.project_id == ProjectEntity.id)
+            .where(ProjectMember.user_id == user_id)
+        )
+        statement = CursorPaginationHelper.build_cursor_query(
+            statement,
+            ProjectMember,
+            key_selector="project_id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+        project_dtos = [
+            ProjectDto(
+                id=project_entity.id,
+                name=project_entity.name,
+                owner_id=project_entity.owner_id,
+                role=ProjectRole(role),
+                created_at=project_entity.created_at
+            )
+            for project_entity, role in self._session.exec(statement).all()
+        ]
+        return CursorPaginationHelper.apply_cursor_pagination_to_query_result(
+            items=project_dtos,
+            key_selector="id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+
+    def get_members_paginated(self, project_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[ProjectMemberDto]:
+        statement = select(ProjectMember).where(ProjectMember.project_id == project_id)
+        statement = CursorPaginationHelper.build_cursor_query(
+            statement,
+            ProjectMember,
+            key_selector="user_id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+        member_dtos = [self._member_to_dto(member) for member in self._session.exec(statement).all()]
+        return CursorPaginationHelper.apply_cursor_pagination_to_query_result(
+            items=member_dtos,
+            key_selector="user_id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+
+    def add_member(self, project_id: UUID, user_id: UUID, role: ProjectRole) -> ProjectMemberDto:
+        member = ProjectMember(project_id=project_id, user_id=user_id, role=role.value)
+        # The primary key decides duplicates, with no lookup first.
+        try:
+            with self._session.begin_nested():
+                self._session.add(member)
+        except IntegrityError:
+            raise MemberAlreadyExists()
+        self.changed_members.add(user_id)
+        return self._member_to_dto(member)
+
+    def remove_member(self, project_id: UUID, user_id: UUID) -> bool:
+        # Deleted through the session, so the removed user's reads are
+        # pinned to the primary like any other write of theirs.
+        member = self._session.get(ProjectMember, (project_id, user_id))
+        if member is None:
+            return False
+        self._session.delete(member)
+        self._session.flush()
+        self.changed_members.add(user_id)
+        return True
+
+    def _entity_to_domain(self, project_entity: ProjectEntity) -> Project:
+        project = Project(name=project_entity.name, owner_id=project_entity.owner_id)
+        project.id = project_entity.id
+        project.created_at = project_entity.created_at
+        return project
+
+    @staticmethod
+    def _member_to_dto(member: ProjectMember) -> ProjectMemberDto:
+        return ProjectMemberDto(user_id=member.user_id, role=ProjectRole(member.role), created_at=member.created_at)
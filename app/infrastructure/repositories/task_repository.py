@@ -1,25 +1,53 @@
 from sqlmodel import Session, select
+from sqlalchemy import and_, bindparam, delete, exists, func, literal, or_, update
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime, timezone
+from app.core.config import settings
+from app.domain.constants.TASK_STATUS import TaskStatus
 from app.domain.repositories.itask_repository import ITaskRepository
 from app.domain.entities.tasks import Task
-from app.infrastructure.persistence.entities_configuration import Task as TaskEntity
+from app.infrastructure.persistence.entities_configuration import Tag, Task as TaskEntity, TaskArchive, TaskCount, TaskTag, TaskTombstone
 from uuid import UUID
-from typing import Optional, List
-from app.infrastructure.dtos.task_dtos import TaskDto
-from app.infrastructure.common.paginated_results import CursorPaginationRequest, CursorPagedResult, CursorPaginationHelper
+from typing import Dict, FrozenSet, Iterable, Optional, List, Tuple, Type
+from functools import lru_cache
+from pydantic import BaseModel
+from app.infrastructure.dtos.task_dtos import TagDto, TaskDto, TaskChangeDto, TaskChangesDto, TaskChangeType, TaskResponseDto, sparse_dto
+from app.infrastructure.common.sync_watermark import SyncWatermark, to_naive_utc
+from app.infrastructure.common.paginated_results import (
+    CursorPaginationRequest, CursorPagedResult, CursorPaginationHelper, PaginationDirection, PaginationRequest, PagedResult
+)
+from app.infrastructure.common.rank_keys import key_between, n_keys_between
+from app.infrastructure.common.keyset_anchors import task_anchors, task_count_estimates
 from app.infrastructure.exceptions import TaskNotFound
 
+# DTO fields whose column has another name
+_FIELD_COLUMNS = {"created_at": TaskEntity.creation_date}
+
 
 class TaskRepository(ITaskRepository):
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, autocommit: bool = True):
         self._session = session
+        # Off inside a unit of work: writes are only flushed, and the unit of
+        # work commits them together with everything else it did.
+        self._autocommit = autocommit
+        # Changes written through this repository, published by the unit of
+        # work once its commit succeeds.
+        self.pending_changes: List[Tuple[UUID, TaskChangeDto]] = []
 
     def get_all(self, user_id: UUID) -> List[Task]:
         statement = select(TaskEntity).where(TaskEntity.user_id == user_id)
         task_entities = self._session.exec(statement).all()
-        return [self._entity_to_domain(task_entity) for task_entity in task_entities]
+        tags = self._tags_by_task(task_entity.id for task_entity in task_entities)
+        return [self._entity_to_domain(task_entity, tags.get(task_entity.id)) for task_entity in task_entities]
    
-    def get_all_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
-        statement = select(TaskEntity).where(TaskEntity.user_id == user_id)
+    def get_all_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest, tags: Optional[List[str]] = None, fields: Optional[FrozenSet[str]] = None) -> CursorPagedResult[TaskDto]:
+        statement = (select(TaskEntity) if fields is None else self._projection(fields)).where(TaskEntity.user_id == user_id)
+        for name in tags or []:
+            # A semi-join per tag: the planner can probe the (task_id, tag_id)
+            # primary key per task or drive from the tag's (tag_id, task_id)
+            # range, whichever is more selective. The tag id is looked up once.
+            tag_id = select(Tag.id).where(Tag.user_id == user_id, Tag.name == name).scalar_subquery()
+            statement = statement.where(exists().where(TaskTag.task_id == TaskEntity.id, TaskTag.tag_id == tag_id))
         
         statement = CursorPaginationHelper.build_cursor_query(
             statement,
@@ -30,8 +58,10 @@ class TaskRepository(ITaskRepository):
             direction=pagination_request.direction
         )
         
-        task_entities = self._session.exec(statement).all()
-        task_dtos = [self._entity_to_dto(task_entity) for task_entity in task_entities]
+        if fields is None:
+            task_dtos = self._entities_to_dtos(self._session.exec(statement).all())
+        else:
+            task_dtos = self._rows_to_sparse_dtos(self._session.execute(statement).all(), TaskDto, fields)
         
         return CursorPaginationHelper.apply_cursor_pagination_to_query_result(
             items=task_dtos,
@@ -41,71 +71,668 @@ class TaskRepository(ITaskRepository):
             direction=pagination_request.direction
         )
 
+    def get_all_paginated(self, user_id: UUID, pagination_request: PaginationRequest, fields: Optional[FrozenSet[str]] = None) -> PagedResult[TaskDto]:
+        page_size = pagination_request.page_size
+        offset = (pagination_request.page_number - 1) * page_size
+        counter = self._session.get(TaskCount, user_id)
+        version = counter.version if counter else None
+        total_count = counter.task_count if counter else self._estimate_count(user_id)
+
+        # Seek past the closest known anchor on (user_id, id) and only skip
+        # the rows between it and the page, reading one row early so the
+        # page's own start becomes an anchor as well.
+        anchor_offset, anchor_key = task_anchors.nearest(user_id, version, offset)
+        statement = (select(TaskEntity) if fields is None else self._projection(fields)).where(TaskEntity.user_id == user_id)
+        if anchor_key is not None:
+            statement = statement.where(TaskEntity.id > anchor_key)
+        lead = 1 if offset > anchor_offset else 0
+        statement = statement.order_by(TaskEntity.id).offset(offset - anchor_offset - lead).limit(page_size + lead)
+        if fields is None:
+            task_entities = self._session.exec(statement).all()
+        else:
+            task_entities = self._session.execute(statement).all()
+
+        found_lead = bool(lead and task_entities)
+        if found_lead:
+            task_anchors.remember(user_id, version, offset, task_entities[0].id)
+            task_entities = task_entities[1:]
+        if task_entities:
+            task_anchors.remember(user_id, version, offset + len(task_entities), task_entities[-1].id)
+        if len(task_entities) < page_size and (offset == 0 or found_lead):
+            # A short page is the last one, which pins down the exact total.
+            total_count = offset + len(task_entities)
+
+        if fields is None:
+            page_type, items = PagedResult[TaskDto], self._entities_to_dtos(task_entities)
+        else:
+            page_type, items = PagedResult[sparse_dto(TaskDto, fields)], self._rows_to_sparse_dtos(task_entities, TaskDto, fields)
+        return page_type(
+            items=items,
+            total_count=total_count,
+            page_number=pagination_request.page_number,
+            page_size=page_size
+        )
+
+    def get_project_tasks_paginated(self, project_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        # Not pruned to one partition: a project's tasks are spread over
+        # their owners'. Each partition's (project_id, id) index is read in
+        # order and merged, stopping after page_size + 1 rows.
+        statement = select(TaskEntity).where(TaskEntity.project_id == project_id)
+        statement = CursorPaginationHelper.build_cursor_query(
+            statement,
+            TaskEntity,
+            key_selector="id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+
+        task_entities = self._session.exec(statement).all()
+        return CursorPaginationHelper.apply_cursor_pagination_to_query_result(
+            items=self._entities_to_dtos(task_entities),
+            key_selector="id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+
     def get_by_id(self, id: UUID, user_id: UUID) -> Optional[Task]:
         statement = select(TaskEntity).where(
             TaskEntity.id == id, 
             TaskEntity.user_id == user_id
         )
         task_entity = self._session.exec(statement).first()
-        return self._entity_to_domain(task_entity) if task_entity else None
+        return self._entity_to_domain(task_entity, self._tags_by_task([id]).get(id)) if task_entity else None
+
+    def get_fields_by_id(self, id: UUID, user_id: UUID, fields: FrozenSet[str]) -> Optional[BaseModel]:
+        """Only ``fields`` of a task, as ``sparse_dto(TaskResponseDto, fields)``."""
+        statement = self._projection(fields).where(TaskEntity.id == id, TaskEntity.user_id == user_id)
+        row = self._session.execute(statement).first()
+        return self._rows_to_sparse_dtos([row], TaskResponseDto, fields)[0] if row else None
+
+    def get_archived_paginated_by_cursor(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        statement = select(TaskArchive).where(TaskArchive.user_id == user_id)
+        
+        statement = CursorPaginationHelper.build_cursor_query(
+            statement,
+            TaskArchive,
+            key_selector="id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+        
+        # Archiving keeps a task's tag links, under the same id.
+        archived_entities = self._session.exec(statement).all()
+        task_dtos = self._entities_to_dtos(archived_entities)
+        
+        return CursorPaginationHelper.apply_cursor_pagination_to_query_result(
+            items=task_dtos,
+            key_selector="id",
+            cursor=pagination_request.cursor,
+            page_size=pagination_request.page_size,
+            direction=pagination_request.direction
+        )
+
+    def get_archived_by_id(self, id: UUID, user_id: UUID) -> Optional[Task]:
+        statement = select(TaskArchive).where(
+            TaskArchive.id == id,
+            TaskArchive.user_id == user_id
+        )
+        archived_entity = self._session.exec(statement).first()
+        return self._entity_to_domain(archived_entity, self._tags_by_task([id]).get(id)) if archived_entity else None
 
     def create(self, task: Task) -> Task:
         task_entity = TaskEntity(
             title=task.title,
             description=task.description,
             status=task.status,
-            user_id=task.user_id
+            user_id=task.user_id,
+            due_at=self._naive(task.due_at),
+            remind_at=self._naive(task.remind_at),
+            # New tasks go last. Concurrent creates may get equal keys; ties
+            # are ordered by id and split by the next move.
+            position=key_between(self._last_position(task.user_id), None),
+            parent_id=task.parent_id,
+            project_id=task.project_id
         )
         self._session.add(task_entity)
-        self._session.commit()
+        tags = self._set_tags(task_entity.id, task.user_id, task.tags) if task.tags else []
+        if task.parent_id is not None:
+            self._adjust_child_count(task.user_id, task.parent_id, 1)
+        self._adjust_count(task.user_id, 1)
+        self._commit()
         self._session.refresh(task_entity)
-        return self._entity_to_domain(task_entity)
+        self._record_upsert(task_entity, tags)
+        return self._entity_to_domain(task_entity, tags)
 
     def update(self, task: Task) -> Task:
-        statement = select(TaskEntity).where(TaskEntity.id == task.id)
+        statement = select(TaskEntity).where(
+            TaskEntity.id == task.id, TaskEntity.user_id == task.user_id
+        )
         task_entity = self._session.exec(statement).first()
         
         if task_entity:
             task_entity.title = task.title
             task_entity.description = task.description
             task_entity.status = task.status
+            task_entity.due_at = self._naive(task.due_at)
+            remind_at = self._naive(task.remind_at)
+            if remind_at != task_entity.remind_at:
+                # A new reminder time is a new reminder, to be sent again.
+                task_entity.remind_at = remind_at
+                task_entity.reminded_at = None
             task_entity.updated_at = task.updated_at
             self._session.add(task_entity)
-            self._session.commit()
+            tags = self._set_tags(task_entity.id, task.user_id, task.tags)
+            self._commit()
             self._session.refresh(task_entity)
-            return self._entity_to_domain(task_entity)
+            self._record_upsert(task_entity, tags)
+            return self._entity_to_domain(task_entity, tags)
         else:
             raise TaskNotFound()
     
 
-    def delete(self, id: UUID) -> None:
-        statement = select(TaskEntity).where(TaskEntity.id == id)
+    def delete(self, id: UUID, user_id: UUID) -> None:
+        """Delete a task together with all of its subtasks."""
+        statement = select(TaskEntity).where(TaskEntity.id == id, TaskEntity.user_id == user_id)
         task_entity = self._session.exec(statement).first()
         if task_entity:
-            self._session.delete(task_entity)
-            self._session.commit()
+            ids = [id]
+            if task_entity.child_count:
+                ids = list(self._session.exec(select(self._subtree(id, user_id).c.id)).all())
+            deleted_at = datetime.now(timezone.utc)
+            self._session.exec(delete(TaskEntity).where(TaskEntity.user_id == user_id, TaskEntity.id.in_(ids)))
+            self._session.exec(delete(TaskTag).where(TaskTag.task_id.in_(ids)))
+            self._session.add_all(TaskTombstone(task_id=task_id, user_id=user_id, deleted_at=deleted_at) for task_id in ids)
+            if task_entity.parent_id is not None:
+                self._adjust_child_count(user_id, task_entity.parent_id, -1)
+            self._adjust_count(user_id, -len(ids))
+            self._commit()
+            self.pending_changes.extend(
+                (user_id, TaskChangeDto(id=task_id, change=TaskChangeType.DELETE, changed_at=deleted_at))
+                for task_id in ids
+            )
         else:
             raise TaskNotFound()
 
-    def _entity_to_domain(self, task_entity: TaskEntity) -> Task:
+    def get_subtree(self, id: UUID, user_id: UUID) -> List[TaskDto]:
+        subtree = self._subtree(id, user_id)
+        statement = (
+            select(TaskEntity)
+            .join(subtree, TaskEntity.id == subtree.c.id)
+            .where(TaskEntity.user_id == user_id)
+            .order_by(subtree.c.depth, TaskEntity.position, TaskEntity.id)
+        )
+        return self._entities_to_dtos(self._session.exec(statement).all())
+
+    def get_ancestors(self, id: UUID, user_id: UUID) -> List[TaskDto]:
+        ancestors = self._ancestors(id, user_id)
+        statement = (
+            select(TaskEntity)
+            .join(ancestors, TaskEntity.id == ancestors.c.id)
+            .where(TaskEntity.user_id == user_id)
+            .order_by(ancestors.c.depth.desc())
+        )
+        return self._entities_to_dtos(self._session.exec(statement).all())
+
+    def complete(self, id: UUID, user_id: UUID, include_subtasks: bool = True) -> int:
+        tasks_table = TaskEntity.__table__
+        selected = select(self._subtree(id, user_id).c.id) if include_subtasks else [id]
+        # One set-based UPDATE for the whole subtree. The returned rows
+        # feed the change events, so nothing is read back one by one.
+        statement = (
+            update(tasks_table)
+            .where(
+                tasks_table.c.user_id == user_id,
+                tasks_table.c.id.in_(selected),
+                tasks_table.c.status != TaskStatus.COMPLETED
+            )
+            .values(status=TaskStatus.COMPLETED, updated_at=datetime.now(timezone.utc))
+            .returning(*tasks_table.c)
+        )
+        rows = self._session.execute(statement).all()
+        tags = self._tags_by_task(row.id for row in rows)
+        self._commit()
+        for row in rows:
+            self._record_upsert(row, tags.get(row.id, []))
+        return len(rows)
+
+    def get_all_paginated_by_position(self, user_id: UUID, pagination_request: CursorPaginationRequest) -> CursorPagedResult[TaskDto]:
+        # Keyset pagination over (position, id), a range scan of
+        # ix_tasks_user_id_position in either direction.
+        forward = pagination_request.direction == PaginationDirection.FORWARD
+        statement = select(TaskEntity).where(TaskEntity.user_id == user_id)
+        if pagination_request.cursor:
+            try:
+                cursor = CursorPaginationHelper.decode_cursor(pagination_request.cursor)
+                position, after_id = cursor["p"], UUID(cursor["id"])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            # The redundant bound on position alone is what the index can
+            # seek to; the OR only breaks ties.
+            if forward:
+                statement = statement.where(TaskEntity.position >= position, or_(
+                    TaskEntity.position > position,
+                    and_(TaskEntity.position == position, TaskEntity.id > after_id)
+                ))
+            else:
+                statement = statement.where(TaskEntity.position <= position, or_(
+                    TaskEntity.position < position,
+                    and_(TaskEntity.position == position, TaskEntity.id < after_id)
+                ))
+        if forward:
+            statement = statement.order_by(TaskEntity.position, TaskEntity.id)
+        else:
+            statement = statement.order_by(TaskEntity.position.desc(), TaskEntity.id.desc())
+        page_size = pagination_request.page_size
+        task_entities = self._session.exec(statement.limit(page_size + 1)).all()
+
+        items = self._entities_to_dtos(task_entities[:page_size])
+        has_next_page = len(task_entities) > page_size
+        encode = lambda dto: CursorPaginationHelper.encode_cursor({"p": dto.position, "id": str(dto.id)})
+        return CursorPagedResult[TaskDto](
+            items=items,
+            next_cursor=encode(items[-1]) if items and has_next_page else None,
+            previous_cursor=encode(items[0]) if items and pagination_request.cursor else None,
+            has_next_page=has_next_page,
+            has_previous_page=bool(pagination_request.cursor),
+            page_size=page_size
+        )
+
+    def move(self, id: UUID, user_id: UUID, after_id: Optional[UUID]) -> Task:
+        self._lock_order(user_id)
+        task_entity = self._session.exec(
+            select(TaskEntity).where(TaskEntity.id == id, TaskEntity.user_id == user_id)
+        ).first()
+        if not task_entity or after_id == id:
+            raise TaskNotFound()
+
+        before, after = self._neighbours(id, user_id, after_id)
+        if (before is not None and after is not None and before >= after) or (after_id and before is None):
+            # Equal keys (or tasks from before ordering existed) leave no
+            # room in between: respread the user's keys first.
+            self.rebalance_positions(user_id, commit=False)
+            before, after = self._neighbours(id, user_id, after_id)
+
+        # The only row written: every other task keeps its key.
+        task_entity.position = key_between(before, after)
+        task_entity.updated_at = datetime.now(timezone.utc)
+        self._session.add(task_entity)
+        self._commit()
+        self._session.refresh(task_entity)
+        tags = self._tags_by_task([id]).get(id, [])
+        self._record_upsert(task_entity, tags)
+        return self._entity_to_domain(task_entity, tags)
+
+    def rebalance_positions(self, user_id: UUID, commit: bool = True) -> int:
+        """Give the user's tasks short, evenly spread keys in their current order.
+
+        Tasks without a key yet go last. Every task whose key changes is
+        recorded as an upsert, so synced and subscribed clients get the new
+        keys. Returns the number of rows changed.
+        """
+        self._lock_order(user_id)
+        rows = self._session.exec(
+            select(TaskEntity.id, TaskEntity.position)
+            .where(TaskEntity.user_id == user_id)
+            .order_by(TaskEntity.position.is_(None), TaskEntity.position, TaskEntity.id)
+        ).all()
+        keys = n_keys_between(None, None, len(rows))
+        changed = [
+            {"task_id": row.id, "new_position": key}
+            for row, key in zip(rows, keys) if row.position != key
+        ]
+        if not changed:
+            return 0
+        tasks_table = TaskEntity.__table__
+        self._session.connection().execute(
+            update(tasks_table)
+            .where(tasks_table.c.user_id == user_id, tasks_table.c.id == bindparam("task_id"))
+            .values(position=bindparam("new_position"), updated_at=datetime.now(timezone.utc)),
+            changed
+        )
+        ids = [change["task_id"] for change in changed]
+        # The UPDATE bypassed the session: reload any task it already holds.
+        entities = self._session.exec(
+            select(TaskEntity)
+            .where(TaskEntity.user_id == user_id, TaskEntity.id.in_(ids))
+            .execution_options(populate_existing=True)
+        ).all()
+        tags = self._tags_by_task(ids)
+        if commit:
+            self._session.commit()
+        for task_entity in entities:
+            self._record_upsert(task_entity, tags.get(task_entity.id, []))
+        return len(changed)
+
+    def _subtree(self, id: UUID, user_id: UUID):
+        """Recursive CTE of a task and its descendants, with their depth below it.
+
+        Each step is a seek on (user_id, parent_id); the depth bound keeps
+        a corrupt cycle from recursing forever. The CTE nests inside the
+        subquery using it, so an UPDATE still starts with UPDATE: the
+        sqlite3 driver opens no transaction for a statement starting with
+        WITH, and it would commit on its own.
+        """
+        tasks_table = TaskEntity.__table__
+        subtree = (
+            select(tasks_table.c.id, literal(0).label("depth"))
+            .where(tasks_table.c.user_id == user_id, tasks_table.c.id == id)
+            .cte("subtree", recursive=True, nesting=True)
+        )
+        children = tasks_table.alias("children")
+        return subtree.union_all(
+            select(children.c.id, subtree.c.depth + 1)
+            .where(
+                children.c.user_id == user_id,
+                children.c.parent_id == subtree.c.id,
+                subtree.c.depth < settings.task_max_depth
+            )
+        )
+
+    def _ancestors(self, id: UUID, user_id: UUID):
+        """Recursive CTE of a task's ancestors; depth 1 is its parent."""
+        tasks_table = TaskEntity.__table__
+        ancestors = (
+            select(tasks_table.c.parent_id.label("id"), literal(1).label("depth"))
+            .where(tasks_table.c.user_id == user_id, tasks_table.c.id == id)
+            .cte("ancestors", recursive=True, nesting=True)
+        )
+        parents = tasks_table.alias("parents")
+        return ancestors.union_all(
+            select(parents.c.parent_id, ancestors.c.depth + 1)
+            .where(
+                parents.c.user_id == user_id,
+                parents.c.id == ancestors.c.id,
+                ancestors.c.depth < settings.task_max_depth
+            )
+        )
+
+    def _adjust_child_count(self, user_id: UUID, parent_id: UUID, delta: int) -> None:
+        # The parent's DTO changes with its count, so it's a change to sync.
+        tasks_table = TaskEntity.__table__
+        parent = self._session.execute(
+            update(tasks_table)
+            .where(tasks_table.c.user_id == user_id, tasks_table.c.id == parent_id)
+            .values(child_count=tasks_table.c.child_count + delta, updated_at=datetime.now(timezone.utc))
+            .returning(*tasks_table.c)
+        ).first()
+        if parent is None:
+            raise TaskNotFound()
+        self._record_upsert(parent, self._tags_by_task([parent_id]).get(parent_id, []))
+
+    def _last_position(self, user_id: UUID) -> Optional[str]:
+        return self._session.exec(
+            select(TaskEntity.position)
+            .where(TaskEntity.user_id == user_id, TaskEntity.position.isnot(None))
+            .order_by(TaskEntity.position.desc(), TaskEntity.id.desc())
+            .limit(1)
+        ).first()
+
+    def _neighbours(self, id: UUID, user_id: UUID, after_id: Optional[UUID]) -> Tuple[Optional[str], Optional[str]]:
+        """Keys of the task to follow and of the one currently after it."""
+        following = select(TaskEntity.position).where(TaskEntity.user_id == user_id, TaskEntity.id != id)
+        before = None
+        if after_id is not None:
+            anchor = self._session.exec(
+                select(TaskEntity.id, TaskEntity.position)
+                .where(TaskEntity.id == after_id, TaskEntity.user_id == user_id)
+            ).first()
+            if anchor is None:
+                raise TaskNotFound()
+            if anchor.position is None:
+                return None, None
+            before = anchor.position
+            following = following.where(TaskEntity.position >= before, or_(
+                TaskEntity.position > before,
+                and_(TaskEntity.position == before, TaskEntity.id > after_id)
+            ))
+        after = self._session.exec(
+            following.where(TaskEntity.position.isnot(None))
+            .order_by(TaskEntity.position, TaskEntity.id)
+            .limit(1)
+        ).first()
+        return before, after
+
+    def _lock_order(self, user_id: UUID) -> None:
+        # Moves and rebalancing of one user run one at a time on Postgres,
+        # so a move never computes its key from keys being rewritten. The
+        # user's counter row serves as the lock; SQLite serializes writers.
+        if self._session.get_bind().dialect.name == "postgresql":
+            self._session.exec(select(TaskCount.user_id).where(TaskCount.user_id == user_id).with_for_update())
+
+    def search_tags(self, user_id: UUID, prefix: str, limit: int) -> List[TagDto]:
+        statement = select(Tag).where(Tag.user_id == user_id)
+        if prefix:
+            # A range rather than LIKE: it is a seek on (user_id, name) on
+            # every database, whatever its LIKE and collation rules.
+            upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            statement = statement.where(Tag.name >= prefix, Tag.name < upper)
+        tags = self._session.exec(statement.order_by(Tag.name).limit(limit)).all()
+        return [TagDto(id=tag.id, name=tag.name) for tag in tags]
+
+    def get_changes_since(self, user_id: UUID, since: Optional[SyncWatermark], until: datetime, limit: int) -> TaskChangesDto:
+        # Both queries are range scans on their (user_id, timestamp) index,
+        # so the cost follows the number of changes, not the number of tasks.
+        until = to_naive_utc(until)
+        statement = select(TaskEntity).where(
+            TaskEntity.user_id == user_id,
+            TaskEntity.updated_at <= until
+        )
+        if since:
+            statement = statement.where(self._after(TaskEntity.updated_at, TaskEntity.id, since))
+        statement = statement.order_by(TaskEntity.updated_at, TaskEntity.id).limit(limit + 1)
+        task_entities = self._session.exec(statement).all()
+        changes = [
+            TaskChangeDto(
+                id=task_entity.id,
+                change=TaskChangeType.UPSERT,
+                changed_at=task_entity.updated_at,
+                task=task_dto
+            )
+            for task_entity, task_dto in zip(task_entities, self._entities_to_dtos(task_entities))
+        ]
+
+        # A client syncing from scratch has nothing to delete.
+        if since:
+            statement = select(TaskTombstone).where(
+                TaskTombstone.user_id == user_id,
+                TaskTombstone.deleted_at <= until,
+                self._after(TaskTombstone.deleted_at, TaskTombstone.task_id, since)
+            ).order_by(TaskTombstone.deleted_at, TaskTombstone.task_id).limit(limit + 1)
+            changes.extend(
+                TaskChangeDto(
+                    id=tombstone.task_id,
+                    change=TaskChangeType.DELETE,
+                    changed_at=tombstone.deleted_at
+                )
+                for tombstone in self._session.exec(statement).all()
+            )
+            changes.sort(key=lambda change: (to_naive_utc(change.changed_at), change.id))
+
+        page = changes[:limit]
+        next_token = None
+        if page:
+            next_token = SyncWatermark(page[-1].changed_at, page[-1].id).encode()
+        return TaskChangesDto(changes=page, next_token=next_token, has_more=len(changes) > limit)
+
+    def purge_tombstones(self, before: datetime, user_id: Optional[UUID] = None) -> int:
+        statement = delete(TaskTombstone).where(TaskTombstone.deleted_at < to_naive_utc(before))
+        if user_id is not None:
+            statement = statement.where(TaskTombstone.user_id == user_id)
+        result = self._session.exec(statement)
+        self._session.commit()
+        return result.rowcount
+
+    def _commit(self) -> None:
+        if self._autocommit:
+            self._session.commit()
+        else:
+            self._session.flush()
+
+    def _adjust_count(self, user_id: UUID, delta: int) -> None:
+        # Runs in the transaction of the insert or delete being counted.
+        self._session.flush()
+        statement = update(TaskCount).where(TaskCount.user_id == user_id).values(
+            task_count=TaskCount.task_count + delta,
+            version=TaskCount.version + 1
+        )
+        if self._session.exec(statement).rowcount:
+            return
+        # First write for this user since counting began: seed the counter
+        # from the table, which already reflects this change. If a concurrent
+        # writer seeds it first, its count didn't see this change, so apply it.
+        try:
+            with self._session.begin_nested():
+                self._session.add(TaskCount(user_id=user_id, task_count=self._count(user_id), version=1))
+        except IntegrityError:
+            self._session.exec(statement)
+
+    def _count(self, user_id: UUID) -> int:
+        statement = select(func.count()).select_from(TaskEntity).where(TaskEntity.user_id == user_id)
+        return self._session.exec(statement).one()
+
+    def _estimate_count(self, user_id: UUID) -> int:
+        count = task_count_estimates.get(user_id)
+        if count is None:
+            count = self._count(user_id)
+            task_count_estimates.set(user_id, count)
+        return count
+
+    def _record_upsert(self, task_entity: TaskEntity, tags: List[str]) -> None:
+        self.pending_changes.append((task_entity.user_id, TaskChangeDto(
+            id=task_entity.id,
+            change=TaskChangeType.UPSERT,
+            changed_at=task_entity.updated_at,
+            task=self._entity_to_dto(task_entity, tags)
+        )))
+
+    def _set_tags(self, task_id: UUID, user_id: UUID, names: Optional[List[str]]) -> List[str]:
+        """Make a task's tags exactly ``names`` (already normalized), in its transaction."""
+        current = {
+            row.name: row.tag_id
+            for row in self._session.exec(
+                select(TaskTag.tag_id, Tag.name).join(Tag, Tag.id == TaskTag.tag_id).where(TaskTag.task_id == task_id)
+            ).all()
+        }
+        if names is None:
+            return sorted(current)
+        removed = [tag_id for name, tag_id in current.items() if name not in names]
+        if removed:
+            self._session.exec(delete(TaskTag).where(TaskTag.task_id == task_id, TaskTag.tag_id.in_(removed)))
+        added = [name for name in names if name not in current]
+        if added:
+            tag_ids = self._tag_ids(user_id, added)
+            self._session.add_all(TaskTag(task_id=task_id, tag_id=tag_ids[name]) for name in added)
+        return sorted(names)
+
+    def _tag_ids(self, user_id: UUID, names: List[str]) -> Dict[str, UUID]:
+        """Ids of the user's tags by name, creating the missing ones."""
+        tag_ids = dict(self._session.exec(
+            select(Tag.name, Tag.id).where(Tag.user_id == user_id, Tag.name.in_(names))
+        ).all())
+        for name in names:
+            if name in tag_ids:
+                continue
+            tag = Tag(user_id=user_id, name=name)
+            try:
+                with self._session.begin_nested():
+                    self._session.add(tag)
+                tag_ids[name] = tag.id
+            except IntegrityError:
+                # Created by a concurrent writer since the lookup.
+                tag_ids[name] = self._session.exec(
+                    select(Tag.id).where(Tag.user_id == user_id, Tag.name == name)
+                ).one()
+        return tag_ids
+
+    def _tags_by_task(self, task_ids: Iterable[UUID]) -> Dict[UUID, List[str]]:
+        """Tag names of many tasks in one query, by task id."""
+        task_ids = list(task_ids)
+        tags: Dict[UUID, List[str]] = {}
+        if not task_ids:
+            return tags
+        statement = (
+            select(TaskTag.task_id, Tag.name)
+            .join(Tag, Tag.id == TaskTag.tag_id)
+            .where(TaskTag.task_id.in_(task_ids))
+            .order_by(Tag.name)
+        )
+        for row in self._session.exec(statement).all():
+            tags.setdefault(row.task_id, []).append(row.name)
+        return tags
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _projection(fields: FrozenSet[str]):
+        """SELECT of only the columns behind ``fields``, built once per combination.
+
+        Labelled with the DTO field names; ``tags`` aren't a column and are
+        read with ``_tags_by_task`` when asked for.
+        """
+        columns = [
+            (_FIELD_COLUMNS[name] if name in _FIELD_COLUMNS else getattr(TaskEntity, name)).label(name)
+            for name in sorted(fields) if name != "tags"
+        ]
+        return select(*columns)
+
+    def _rows_to_sparse_dtos(self, rows, dto: Type[BaseModel], fields: FrozenSet[str]) -> List[BaseModel]:
+        model = sparse_dto(dto, fields)
+        if "tags" not in fields:
+            return [model(**row._mapping) for row in rows]
+        tags = self._tags_by_task(row.id for row in rows)
+        return [model(**row._mapping, tags=tags.get(row.id, [])) for row in rows]
+
+    def _entities_to_dtos(self, task_entities) -> List[TaskDto]:
+        tags = self._tags_by_task(task_entity.id for task_entity in task_entities)
+        return [self._entity_to_dto(task_entity, tags.get(task_entity.id)) for task_entity in task_entities]
+
+    @staticmethod
+    def _naive(value: Optional[datetime]) -> Optional[datetime]:
+        return to_naive_utc(value) if value is not None else None
+
+    @staticmethod
+    def _after(timestamp_column, id_column, watermark: SyncWatermark):
+        changed_at = to_naive_utc(watermark.changed_at)
+        return or_(
+            timestamp_column > changed_at,
+            and_(timestamp_column == changed_at, id_column > watermark.id)
+        )
+
+    def _entity_to_domain(self, task_entity: TaskEntity, tags: Optional[List[str]] = None) -> Task:
         task = Task(
             title=task_entity.title,
             description=task_entity.description,
             status=task_entity.status,
-            user_id=task_entity.user_id
+            user_id=task_entity.user_id,
+            due_at=task_entity.due_at,
+            remind_at=task_entity.remind_at,
+            tags=tags,
+            parent_id=task_entity.parent_id,
+            project_id=task_entity.project_id
         )
         task.id = task_entity.id
+        task.position = task_entity.position
+        task.child_count = task_entity.child_count
         task.creation_date = task_entity.creation_date
         task.updated_at = task_entity.updated_at
         return task
 
-    def _entity_to_dto(self, task_entity: TaskEntity) -> TaskDto:
+    def _entity_to_dto(self, task_entity: TaskEntity, tags: Optional[List[str]] = None) -> TaskDto:
         return TaskDto(
             id=task_entity.id,
             title=task_entity.title,
             description=task_entity.description,
             status=task_entity.status,
             user_id=task_entity.user_id,
+            due_at=task_entity.due_at,
+            remind_at=task_entity.remind_at,
+            position=task_entity.position,
+            tags=tags or [],
+            parent_id=task_entity.parent_id,
+            child_count=task_entity.child_count,
+            project_id=task_entity.project_id,
             creation_date=task_entity.creation_date,
             updated_at=task_entity.updated_at
         )
\ No newline at end of file
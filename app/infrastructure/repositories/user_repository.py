@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlalchemy.dialects import postgresql, sqlite
 from app.domain.repositories.iuser_repository import IUserRepository
 from app.domain.entities.users import User
 from app.infrastructure.persistence.entities_configuration import User as UserEntity
@@ -33,20 +34,27 @@ class UserRepository(IUserRepository):
         return self._entity_to_domain(user_entity) if user_entity else None
 
     def sign_up(self, name: str, email: str, password: str) -> User:
-        existing_user = self.get_by_email(email)
-        if existing_user:
-            raise UserAlreadyExists()
-        
-        
+        # The unique index on email decides conflicts in the same statement
+        # that inserts, so there is no lookup first and no race between the
+        # two. Nothing is committed: the refresh token issued with the user
+        # goes into the same transaction.
         user_entity = UserEntity(
             name=name,
             email=email,
             password=self._hash_password(password)
         )
-        self._session.add(user_entity)
-        self._session.commit()
-        self._session.refresh(user_entity)
-        return self._entity_to_domain(user_entity)
+        dialect = self._session.get_bind().dialect.name
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        statement = (
+            insert(UserEntity)
+            .values(**user_entity.model_dump())
+            .on_conflict_do_nothing(index_elements=[UserEntity.email])
+            .returning(*UserEntity.__table__.columns)
+        )
+        row = self._session.execute(statement).first()
+        if row is None:
+            raise UserAlreadyExists()
+        return self._entity_to_domain(row)
 
     def sign_in(self, email: str, password: str) -> Optional[User]:
         user_entity = self.get_by_email(email)
@@ -0,0 +1,52 @@
+import bisect
+import hashlib
+from typing import Dict, Iterable, List, Tuple
+
+
+class ConsistentHashRing:
+    """Maps keys to node names so that adding a node only moves ~1/N keys.
+
+    Every node is placed on the ring ``virtual_nodes`` times to even out the
+    share of keys each one receives.
+    """
+
+    def __init__(self, nodes: Iterable[str], virtual_nodes: int = 64):
+        self._virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: Dict[int, str] = {}
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted(set(self._owners.values()))
+
+    def add_node(self, node: str) -> None:
+        for replica in range(self._virtual_nodes):
+            point = self._hash(f"{node}#{replica}")
+            if point in self._owners:
+                continue
+            bisect.insort(self._points, point)
+            self._owners[point] = node
+
+    def remove_node(self, node: str) -> None:
+        points = [point for point, owner in self._owners.items() if owner == node]
+        for point in points:
+            del self._owners[point]
+            self._points.pop(bisect.bisect_left(self._points, point))
+
+    def get_node(self, key: str) -> str:
+        if not self._points:
+            raise LookupError("Hash ring has no nodes")
+        index = bisect.bisect(self._points, self._hash(key)) % len(self._points)
+        return self._owners[self._points[index]]
+
+    def distribution(self, keys: Iterable[str]) -> List[Tuple[str, int]]:
+        counts: Dict[str, int] = {node: 0 for node in self.nodes}
+        for key in keys:
+            counts[self.get_node(key)] += 1
+        return sorted(counts.items())
@@ -0,0 +1,179 @@
+"""
+Move users' tasks, archived tasks, tombstones, tags and tag links to the
+shard that owns them under a new shard list.
+
+Usage::
+
+    python -m app.infrastructure.sharding.rebalance \\
+        --to "shard0=postgresql://...,shard1=postgresql://...,shard2=postgresql://..." \\
+        [--from "..."] [--dry-run] [--batch-size 500]
+
+``--from`` defaults to ``DATABASE_SHARD_URLS``. Rows are copied to the new
+shard before they are deleted from the old one, and the copy skips ids that
+already exist, so the command can be re-run safely. ``task_tags`` has no
+``user_id``: a user's links are found through the ids of their tasks, and
+moved first, while those tasks are still on the old shard. Run it once, switch
+``DATABASE_SHARD_URLS`` to the new list, then run it again to pick up tasks
+written to old shards in between.
+"""
+import argparse
+import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import Table, delete, select, tuple_, union
+from sqlalchemy.engine import Engine
+
+from app.infrastructure.persistence.entities_configuration import (
+    Tag, Task as TaskEntity, TaskArchive, TaskCount, TaskTag, TaskTombstone
+)
+from app.infrastructure.sharding.shard_router import ShardRouter, parse_shard_urls
+
+moved_tables = (TaskEntity.__table__, TaskArchive.__table__, TaskTombstone.__table__, Tag.__table__)
+links_table = TaskTag.__table__
+counts_table = TaskCount.__table__
+
+MovePlan = Dict[Tuple[str, str], List[UUID]]
+
+
+def plan_moves(source: ShardRouter, target: ShardRouter) -> MovePlan:
+    """Group users whose owning shard differs between the two routers."""
+    plan: MovePlan = defaultdict(list)
+    for shard_name in source.shard_names:
+        with source.engine_by_name(shard_name).connect() as connection:
+            user_ids = connection.execute(
+                union(*[select(table.c.user_id) for table in moved_tables])
+            ).scalars()
+            for user_id in user_ids:
+                destination = target.shard_for(user_id)
+                if destination != shard_name:
+                    plan[(shard_name, destination)].append(user_id)
+    return dict(plan)
+
+
+def move_user(user_id: UUID, source: Engine, destination: Engine, batch_size: int = 500) -> int:
+    """Copy one user's rows in batches, deleting each batch once it is committed."""
+    moved = _move_links(user_id, source, destination, batch_size)
+    for table in moved_tables:
+        moved += _move_rows(table, user_id, source, destination, batch_size)
+    # Both counters are stale now; the destination rebuilds its own.
+    for engine in (source, destination):
+        with engine.begin() as connection:
+            connection.execute(delete(counts_table).where(counts_table.c.user_id == user_id))
+    return moved
+
+
+def _move_rows(table: Table, user_id: UUID, source: Engine, destination: Engine, batch_size: int) -> int:
+    key = table.primary_key.columns.values()[0]
+    moved = 0
+    while True:
+        with source.connect() as src:
+            rows = src.execute(
+                select(table)
+                .where(table.c.user_id == user_id)
+                .order_by(key)
+                .limit(batch_size)
+            ).mappings().all()
+        if not rows:
+            return moved
+
+        ids = [row[key.name] for row in rows]
+        with destination.begin() as dst:
+            existing = set(
+                dst.execute(select(key).where(table.c.user_id == user_id, key.in_(ids))).scalars()
+            )
+            missing = [dict(row) for row in rows if row[key.name] not in existing]
+            if missing:
+                dst.execute(table.insert(), missing)
+
+        with source.begin() as src:
+            src.execute(delete(table).where(table.c.user_id == user_id, key.in_(ids)))
+        moved += len(ids)
+
+
+def _move_links(user_id: UUID, source: Engine, destination: Engine, batch_size: int) -> int:
+    """Move the ``task_tags`` rows of the user's tasks, archived ones included."""
+    tasks, archive = TaskEntity.__table__, TaskArchive.__table__
+    with source.connect() as src:
+        task_ids = src.execute(
+            union(
+                select(tasks.c.id).where(tasks.c.user_id == user_id),
+                select(archive.c.id).where(archive.c.user_id == user_id),
+            )
+        ).scalars().all()
+    key = tuple_(links_table.c.task_id, links_table.c.tag_id)
+    moved = 0
+    for start in range(0, len(task_ids), batch_size):
+        batch = task_ids[start:start + batch_size]
+        with source.connect() as src:
+            rows = src.execute(select(links_table).where(links_table.c.task_id.in_(batch))).mappings().all()
+        if not rows:
+            continue
+
+        pairs = [(row["task_id"], row["tag_id"]) for row in rows]
+        with destination.begin() as dst:
+            existing = set(
+                tuple(pair) for pair in dst.execute(
+                    select(links_table.c.task_id, links_table.c.tag_id).where(links_table.c.task_id.in_(batch))
+                )
+            )
+            missing = [dict(row) for row, pair in zip(rows, pairs) if pair not in existing]
+            if missing:
+                dst.execute(links_table.insert(), missing)
+
+        with source.begin() as src:
+            src.execute(delete(links_table).where(key.in_(pairs)))
+        moved += len(pairs)
+    return moved
+
+
+def rebalance(source: ShardRouter, target: ShardRouter, batch_size: int = 500, dry_run: bool = False) -> MovePlan:
+    plan = plan_moves(source, target)
+    if dry_run:
+        return plan
+
+    target.create_tables()
+    for (source_name, destination_name), user_ids in plan.items():
+        for user_id in user_ids:
+            move_user(
+                user_id,
+                source.engine_by_name(source_name),
+                target.engine_by_name(destination_name),
+                batch_size,
+            )
+    return plan
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rebalance task shards")
+    parser.add_argument("--from", dest="source", help="Current shard list")
+    parser.add_argument("--to", dest="target", required=True, help="New shard list")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    from app.core.config import settings
+
+    source_urls = args.source or settings.database_shard_urls
+    if not source_urls:
+        parser.error("--from is required when DATABASE_SHARD_URLS is not set")
+
+    source = ShardRouter(parse_shard_urls(source_urls), settings.shard_virtual_nodes)
+    target = ShardRouter(parse_shard_urls(args.target), settings.shard_virtual_nodes)
+    try:
+        plan = rebalance(source, target, args.batch_size, args.dry_run)
+    finally:
+        source.dispose()
+        target.dispose()
+
+    verb = "would move" if args.dry_run else "moved"
+    for (source_name, destination_name), user_ids in sorted(plan.items()):
+        print(f"{source_name} -> {destination_name}: {verb} {len(user_ids)} users")
+    if not plan:
+        print("shards already balanced")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
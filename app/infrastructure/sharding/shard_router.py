@@ -0,0 +1,108 @@
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import Column, Index, MetaData, Table
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, create_engine
+
+from app.infrastructure.persistence.entities_configuration import (
+    Tag, Task as TaskEntity, TaskArchive, TaskCount, TaskTag, TaskTombstone
+)
+from app.infrastructure.persistence.partitioning import PARTITIONS_INFO_KEY, hash_partitioned
+from app.infrastructure.sharding.hash_ring import ConsistentHashRing
+
+
+SHARDED_TABLES = (
+    TaskEntity.__table__, TaskArchive.__table__, TaskTombstone.__table__, TaskCount.__table__,
+    Tag.__table__, TaskTag.__table__
+)
+
+
+def parse_shard_urls(raw: str) -> List[Tuple[str, str]]:
+    """Parse ``"name=url,name=url"`` (names optional) into ``(name, url)`` pairs.
+
+    Unnamed shards are called ``shard<index>``. Names, not URLs, are placed on
+    the hash ring, so a shard can move host without remapping its users.
+    """
+    shards = []
+    for index, entry in enumerate(part.strip() for part in raw.split(",")):
+        if not entry:
+            continue
+        name, separator, url = entry.partition("=")
+        if not separator or "://" in name:
+            name, url = f"shard{index}", entry
+        shards.append((name.strip(), url.strip()))
+    return shards
+
+
+def build_shard_metadata() -> MetaData:
+    """Metadata for the tables that live on each shard.
+
+    Users stay on the primary database, so the shard copies of the task
+    tables keep their columns and indexes but drop foreign keys to ``users``.
+    """
+    metadata = MetaData()
+    for source in SHARDED_TABLES:
+        table = Table(
+            source.name,
+            metadata,
+            *[
+                Column(
+                    column.name,
+                    column.type,
+                    primary_key=column.primary_key,
+                    nullable=column.nullable,
+                )
+                for column in source.columns
+            ],
+        )
+        for index in source.indexes:
+            Index(
+                index.name,
+                *[table.c[column.name] for column in index.columns],
+                unique=index.unique,
+                **index.dialect_kwargs,
+            )
+        if PARTITIONS_INFO_KEY in source.info:
+            hash_partitioned(table, "user_id", source.info[PARTITIONS_INFO_KEY])
+    return metadata
+
+
+class ShardRouter:
+    """Routes a user's task sessions to the shard that owns the user."""
+
+    def __init__(self, shards: List[Tuple[str, str]], virtual_nodes: int = 64, **engine_options):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self._engines: Dict[str, Engine] = {
+            name: create_engine(url, **engine_options) for name, url in shards
+        }
+        self.ring = ConsistentHashRing(self._engines, virtual_nodes)
+
+    @property
+    def shard_names(self) -> List[str]:
+        return list(self._engines)
+
+    def shard_for(self, user_id: UUID) -> str:
+        return self.ring.get_node(str(user_id))
+
+    def engine_for(self, user_id: UUID) -> Engine:
+        return self._engines[self.shard_for(user_id)]
+
+    def engine_by_name(self, name: str) -> Engine:
+        return self._engines[name]
+
+    def session_for(self, user_id: UUID) -> Session:
+        return Session(self.engine_for(user_id))
+
+    def session_for_shard(self, name: str) -> Session:
+        return Session(self._engines[name])
+
+    def create_tables(self) -> None:
+        metadata = build_shard_metadata()
+        for engine in self._engines.values():
+            metadata.create_all(engine)
+
+    def dispose(self, close: bool = True) -> None:
+        for engine in self._engines.values():
+            engine.dispose(close=close)
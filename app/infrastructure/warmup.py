@@ -0,0 +1,90 @@
+"""
+Worker warmup: open pooled connections and compile the hot statements before
+the worker starts serving, so the first requests don't pay for either.
+"""
+import logging
+from uuid import uuid4
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from app.infrastructure import database
+from app.infrastructure.common.auth_service import AuthService
+from app.infrastructure.common.paginated_results import (
+    CursorPaginationHelper,
+    CursorPaginationRequest,
+    PaginationDirection,
+)
+from app.infrastructure.repositories.task_repository import TaskRepository
+from app.infrastructure.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+
+def open_pool_connections(engine: Engine, count: int) -> None:
+    """Check out ``count`` connections at once so the pool holds that many."""
+    held = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connection.exec_driver_sql("SELECT 1")
+            held.append(connection)
+    finally:
+        for connection in held:
+            connection.close()
+
+
+def prime_task_statements(session: Session) -> None:
+    """Run every TaskRepository query shape against a user with no rows.
+
+    SQLAlchemy caches compiled SQL per engine, keyed by statement structure,
+    so running each shape once is enough for later requests to hit the cache.
+    """
+    user_id = uuid4()
+    tasks = TaskRepository(session)
+    tasks.get_by_id(uuid4(), user_id)
+    tasks.get_all(user_id)
+    cursor = CursorPaginationHelper.encode_cursor(str(uuid4()))
+    for direction in PaginationDirection:
+        tasks.get_all_paginated_by_cursor(user_id, CursorPaginationRequest(direction=direction))
+        tasks.get_all_paginated_by_cursor(
+            user_id, CursorPaginationRequest(cursor=cursor, direction=direction)
+        )
+    tasks.get_all_paginated_by_cursor(user_id, CursorPaginationRequest(), tags=["warmup"])
+    tasks.search_tags(user_id, "warmup", 10)
+
+
+def prime_auth_statements(session: Session) -> None:
+    UserRepository(session).get_by_email("warmup@invalid")
+    AuthService(session).verify_refresh_token("warmup")
+
+
+def warm_up(connections: int) -> None:
+    for engine in database.all_engines():
+        open_pool_connections(engine, connections)
+
+    with database.get_session() as session:
+        prime_auth_statements(session)
+        prime_task_statements(session)
+        session.rollback()
+
+    replica_engine = database.get_replica_engine()
+    if replica_engine is not None:
+        with Session(replica_engine) as session:
+            prime_task_statements(session)
+
+    shard_router = database.get_shard_router()
+    if shard_router is not None:
+        for name in shard_router.shard_names:
+            with Session(shard_router.engine_by_name(name)) as session:
+                prime_task_statements(session)
+
+
+def try_warm_up(connections: int) -> bool:
+    """Warm up, logging instead of failing so a slow database can't block boot."""
+    try:
+        warm_up(connections)
+        return True
+    except Exception:
+        logger.exception("Database warmup failed; continuing with a cold pool")
+        return False
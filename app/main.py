@@ -1,19 +1,94 @@
 """
 Main FastAPI application.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
-from app.presentation.routers import auth_router, task_router
+from app.infrastructure.common.jwt_keys import get_key_ring
+from app.infrastructure.audit.audit_log import get_audit_log
+from app.infrastructure.database import all_engines, dispose_engines
+from app.infrastructure.jobs.runner import get_job_runner
+from app.infrastructure.realtime.brokers import get_event_broker
+from app.infrastructure.reminders.scheduler import get_reminder_scheduler
+from app.presentation.middleware.admission import AdmissionMiddleware, get_admission_controller
+from app.presentation.middleware.compression import CompressionMiddleware
+from app.presentation.routers import auth_router, batch_router, jwks_router, project_router, task_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the engines (and optionally warm them) before serving.
+
+    Doing this here instead of at import keeps ``import app.main`` cheap and
+    still keeps engine creation off the first request.
+    """
+    await run_in_threadpool(all_engines)
+    # Parse the token keys now: a bad key file fails startup, not a sign-in.
+    get_key_ring()
+    if settings.warmup_on_startup:
+        from app.infrastructure.warmup import try_warm_up
+
+        await run_in_threadpool(try_warm_up, settings.db_pool_size)
+    broker = get_event_broker()
+    broker.start()
+    job_runner = get_job_runner()
+    await job_runner.start()
+    audit_log = get_audit_log()
+    if settings.audit_enabled:
+        audit_log.start()
+    reminders = get_reminder_scheduler()
+    if settings.reminders_enabled:
+        reminders.start()
+    yield
+    await run_in_threadpool(reminders.stop)
+    # Let queued jobs finish and flush the audit buffer while the engines
+    # are still up.
+    await job_runner.stop(settings.jobs_drain_seconds)
+    await run_in_threadpool(audit_log.stop)
+    broker.stop()
+    dispose_engines()
+
 
 app = FastAPI(
     title=settings.app_name,
     debug=settings.debug,
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        codecs=[codec.strip() for codec in settings.compression_codecs.split(",") if codec.strip()],
+        levels={
+            "gzip": settings.compression_gzip_level,
+            "br": settings.compression_brotli_level,
+            "zstd": settings.compression_zstd_level,
+        },
+    )
+
+def _paths(value: str):
+    return [path.strip() for path in value.split(",") if path.strip()]
+
+
+if settings.admission_enabled:
+    # Added last, so it runs first: a shed request costs nothing further.
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=get_admission_controller(),
+        critical_paths=_paths(settings.admission_critical_paths),
+        low_priority_paths=_paths(settings.admission_low_priority_paths),
+        retry_after=settings.admission_retry_after_seconds,
+    )
+
 # Include routers here
 app.include_router(auth_router.router, prefix="/api/v1")
 app.include_router(task_router.router)
+app.include_router(project_router.router)
+app.include_router(batch_router.router)
+app.include_router(jwks_router.router)
 
 
 @app.get("/")
@@ -27,3 +102,26 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+
+@app.get("/health/jobs")
+async def job_health():
+    """Background job queue depth, outcomes and queueing lag."""
+    return get_job_runner().stats()
+
+
+@app.get("/health/audit")
+async def audit_health():
+    """Audit events buffered, written and dropped."""
+    return get_audit_log().stats()
+
+
+@app.get("/health/reminders")
+async def reminder_health():
+    """Reminders loaded in the current window, sent and failed."""
+    return get_reminder_scheduler().stats()
+
+
+@app.get("/health/admission")
+async def admission_health():
+    """In-flight limit, queue and shed counts of this worker."""
+    return get_admission_controller().stats()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import hashlib
+import inspect
+import time
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+from fastapi import Header, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.infrastructure.idempotency.stores import (
+    DatabaseIdempotencyStore,
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    ReservationState,
+    StoredResponse,
+)
+from app.presentation.exceptions.exceptions import (
+    RequestInProgressException,
+    UnprocessableEntityException,
+)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@lru_cache(maxsize=None)
+def get_idempotency_store() -> IdempotencyStore:
+    if settings.idempotency_backend == "database":
+        from app.infrastructure.database import get_session
+
+        return DatabaseIdempotencyStore(get_session, settings.idempotency_ttl_seconds)
+    return InMemoryIdempotencyStore(
+        settings.idempotency_ttl_seconds, settings.idempotency_max_entries
+    )
+
+
+class IdempotencyGuard:
+    """Runs a handler at most once per ``Idempotency-Key`` and scope.
+
+    The first request runs the handler and stores its JSON response. Requests
+    that arrive while it is running wait for it; later ones get the stored
+    response back without running the handler. Failed requests are not
+    stored, so the client can retry them with the same key.
+    """
+
+    def __init__(self, store: IdempotencyStore, key: Optional[str], fingerprint: str):
+        self._store = store
+        self.key = key
+        self._fingerprint = fingerprint
+
+    async def run(self, scope: str, handler: Callable[[], Any], status_code: int = 200) -> Any:
+        if not self.key:
+            return await self._call(handler)
+
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        while True:
+            reservation = await self._store.reserve(scope, self.key, self._fingerprint)
+            if reservation.fingerprint != self._fingerprint:
+                raise UnprocessableEntityException(
+                    "Idempotency-Key was already used with a different request body"
+                )
+            if reservation.state == ReservationState.COMPLETED:
+                return JSONResponse(
+                    status_code=reservation.response.status_code,
+                    content=reservation.response.body,
+                    headers={REPLAYED_HEADER: "true"},
+                )
+            if reservation.state == ReservationState.RESERVED:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RequestInProgressException()
+            await self._store.wait(scope, self.key, remaining)
+
+        try:
+            result = await self._call(handler)
+        except BaseException:
+            await self._store.release(scope, self.key)
+            raise
+        await self._store.complete(
+            scope, self.key, StoredResponse(status_code, jsonable_encoder(result))
+        )
+        return result
+
+    @staticmethod
+    async def _call(handler: Callable[[], Any]) -> Any:
+        result = handler()
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+
+async def idempotency_guard(
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+) -> IdempotencyGuard:
+    fingerprint = hashlib.sha256(await request.body()).hexdigest() if idempotency_key else ""
+    return IdempotencyGuard(get_idempotency_store(), idempotency_key, fingerprint)
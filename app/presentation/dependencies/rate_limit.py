@@ -0,0 +1,80 @@
+import math
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import Depends, Request
+
+from app.core.config import settings
+from app.infrastructure.rate_limiting.token_bucket import (
+    BucketPolicy,
+    InMemoryRateLimitStore,
+    RateLimitStore,
+    RedisRateLimitStore,
+)
+from app.presentation.exceptions.exceptions import TooManyRequestsException
+
+
+def ip_policy() -> BucketPolicy:
+    return BucketPolicy.per_minute(settings.rate_limit_ip_capacity, settings.rate_limit_ip_per_minute)
+
+
+def account_policy() -> BucketPolicy:
+    return BucketPolicy.per_minute(
+        settings.rate_limit_account_capacity, settings.rate_limit_account_per_minute
+    )
+
+
+@lru_cache(maxsize=None)
+def get_rate_limit_store() -> RateLimitStore:
+    if settings.rate_limit_redis_url:
+        return RedisRateLimitStore(settings.rate_limit_redis_url)
+    idle_seconds = max(ip_policy().seconds_to_full, account_policy().seconds_to_full)
+    return InMemoryRateLimitStore(idle_seconds, settings.rate_limit_max_keys)
+
+
+def client_ip(request: Request) -> str:
+    if settings.trust_forwarded_for:
+        forwarded_for = request.headers.get("x-forwarded-for")
+        if forwarded_for:
+            # Clients can send the header with made-up entries; only the
+            # last ``trusted_proxy_hops`` were appended by our own proxies.
+            entries = [entry.strip() for entry in forwarded_for.split(",")]
+            return entries[-min(max(settings.trusted_proxy_hops, 1), len(entries))]
+    return request.client.host if request.client else "unknown"
+
+
+async def _account_key(request: Request, field: str) -> Optional[str]:
+    # FastAPI has already read the body for the endpoint, so this is cached.
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    value = body.get(field) if isinstance(body, dict) else None
+    return str(value).strip().lower() if value else None
+
+
+def rate_limit(scope: str, account_field: Optional[str] = None):
+    """Dependency that spends one token per request from the caller's buckets.
+
+    Every request draws from a per-IP bucket; when ``account_field`` names a
+    body field (e.g. ``email``) it also draws from that account's bucket, so a
+    distributed attack on one account is throttled too. Rejected requests get
+    429 with ``Retry-After`` before any database work happens.
+    """
+
+    async def dependency(request: Request) -> None:
+        if not settings.rate_limit_enabled:
+            return
+        store = get_rate_limit_store()
+        checks = [(f"{scope}:ip:{client_ip(request)}", ip_policy())]
+        if account_field:
+            account = await _account_key(request, account_field)
+            if account:
+                checks.append((f"{scope}:account:{account}", account_policy()))
+
+        for key, policy in checks:
+            decision = await store.consume(key, policy)
+            if not decision.allowed:
+                raise TooManyRequestsException(max(1, math.ceil(decision.retry_after)))
+
+    return Depends(dependency)
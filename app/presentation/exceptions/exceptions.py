@@ -60,7 +60,55 @@ class ConflictResourceException(BaseAPIException):
             status_code=status.HTTP_409_CONFLICT,
             detail=f"{resource} already exists"
         )
-            
 
 
+class TooManyRequestsException(BaseAPIException):
+    
+    
+    def __init__(self, retry_after: int, detail: str = "Too many requests"):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
+class UnprocessableEntityException(BaseAPIException):
+    
+    
+    def __init__(self, detail: str = "Unprocessable entity"):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail
+        )
+
+
+class RequestInProgressException(BaseAPIException):
+    
+    
+    def __init__(self, detail: str = "A request with this Idempotency-Key is still in progress"):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
+        )
 
+
+class GoneException(BaseAPIException):
+    
+    
+    def __init__(self, detail: str = "Resource is no longer available"):
+        super().__init__(
+            status_code=status.HTTP_410_GONE,
+            detail=detail
+        )
+
+
+class BatchFailedException(BaseAPIException):
+    
+    
+    def __init__(self, detail):
+        # ``detail`` is the batch result, so the client sees which operation failed.
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=detail
+        )
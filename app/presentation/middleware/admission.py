@@ -0,0 +1,272 @@
+"""
+Admission control: an adaptive cap on the requests a worker runs at once.
+
+When the database slows down, requests pile up waiting for a pool
+connection and every one of them gets slow. This middleware lets at most
+``limit`` requests in; the rest wait in a bounded queue, and once that is
+full they are turned away at once with 503 and ``Retry-After``, for the
+client or the load balancer to retry later or elsewhere.
+
+The limit adapts, gradient-style: it follows the ratio of the long-run
+latency to the latest one, growing by about ``sqrt(limit)`` while latency
+stays near its baseline and shrinking as latency climbs above it. A
+saturated connection pool cuts it multiplicatively straight away, since
+latency only rises once the queue for connections has already formed.
+
+Requests fall in three priority classes. Waiting requests are let in
+highest class first, and a full queue makes room for a request by shedding
+the oldest waiter of a lower class, so auth refreshes and health checks
+are the last to go.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from enum import IntEnum
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+from app.infrastructure.database import pool_saturation
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    CRITICAL = 2
+
+
+class GradientLimit:
+    """A concurrency limit that follows latency.
+
+    Each sample moves the limit towards ``limit * gradient + sqrt(limit)``,
+    where ``gradient = tolerance * long_rtt / rtt`` clamped to [0.5, 1]:
+    latency up to ``tolerance`` times its long-run average lets the limit
+    grow, more than that shrinks it, at most by half per sample.
+    """
+
+    # Samples the long-run latency averages over
+    LONG_WINDOW = 600
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        backoff: float = 0.9,
+    ):
+        self.limit = float(initial)
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._tolerance = tolerance
+        self._smoothing = smoothing
+        self._backoff = backoff
+        self.long_rtt: Optional[float] = None
+
+    def update(self, rtt: float, in_flight: int, saturated: bool) -> float:
+        rtt = max(rtt, 1e-6)
+        if self.long_rtt is None:
+            self.long_rtt = rtt
+        else:
+            self.long_rtt += (rtt - self.long_rtt) / self.LONG_WINDOW
+            if self.long_rtt / rtt > 2:
+                # Latency has recovered: let the baseline catch up faster
+                # than the window would, or the limit grows unchecked.
+                self.long_rtt *= 0.95
+
+        if saturated:
+            new_limit = self.limit * self._backoff
+        else:
+            gradient = max(0.5, min(1.0, self._tolerance * self.long_rtt / rtt))
+            new_limit = self.limit * gradient + math.sqrt(self.limit)
+            new_limit = self.limit * (1 - self._smoothing) + new_limit * self._smoothing
+            if new_limit > self.limit and in_flight < self.limit / 2:
+                # Far from the limit, latency says nothing about raising it.
+                new_limit = self.limit
+        self.limit = max(float(self._min_limit), min(float(self._max_limit), new_limit))
+        return self.limit
+
+
+class AdmissionController:
+    """Lets requests in up to the limit and queues or sheds the others.
+
+    Runs on the event loop only, so it needs no locks.
+    """
+
+    def __init__(
+        self,
+        limit: GradientLimit,
+        max_queue: int,
+        queue_timeout: float,
+        saturation: Callable[[], float] = lambda: 0.0,
+    ):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._saturation = saturation
+        self.in_flight = 0
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {priority: deque() for priority in Priority}
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {priority: 0 for priority in Priority}
+        self.timed_out = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def acquire(self, priority: Priority) -> bool:
+        """Wait for a slot; False means the request is shed.
+
+        Call ``release`` once an admitted request is done.
+        """
+        waiting_ahead = any(self._queues[other] for other in Priority if other >= priority)
+        if self.in_flight < self.limit.limit and not waiting_ahead:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if self.queue_depth >= self.max_queue and not self._shed_below(priority):
+            self.shed[priority] += 1
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append(future)
+        self.queued += 1
+        try:
+            admitted = await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            admitted = False
+        finally:
+            if future in self._queues[priority]:
+                self._queues[priority].remove(future)
+        if not admitted:
+            self.shed[priority] += 1
+        return admitted
+
+    def release(self, rtt: float) -> None:
+        """An admitted request finished after ``rtt`` seconds."""
+        self.limit.update(rtt, self.in_flight, self._saturation() >= 1.0)
+        self.in_flight -= 1
+        self._admit_waiters()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": round(self.limit.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "queue_capacity": self.max_queue,
+            "long_rtt_ms": round(self.limit.long_rtt * 1000, 2) if self.limit.long_rtt is not None else None,
+            "pool_saturation": round(self._saturation(), 2),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "timed_out": self.timed_out,
+            "shed": {priority.name.lower(): count for priority, count in self.shed.items()},
+        }
+
+    def _admit_waiters(self) -> None:
+        for priority in sorted(Priority, reverse=True):
+            queue = self._queues[priority]
+            while queue and self.in_flight < self.limit.limit:
+                future = queue.popleft()
+                if future.done():
+                    # Timed out or cancelled meanwhile
+                    continue
+                self.in_flight += 1
+                self.admitted += 1
+                future.set_result(True)
+            if queue:
+                return
+
+    def _shed_below(self, priority: Priority) -> bool:
+        """Turn away the oldest waiter of a class below ``priority``, if any."""
+        for lower in Priority:
+            if lower >= priority:
+                return False
+            queue = self._queues[lower]
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_result(False)
+                    return True
+        return False
+
+
+class AdmissionMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        critical_paths: Iterable[str] = (),
+        low_priority_paths: Iterable[str] = (),
+        retry_after: int = 1,
+    ):
+        self.app = app
+        self.controller = controller
+        self.critical_paths = tuple(path.rstrip("/") for path in critical_paths)
+        self.low_priority_paths = tuple(path.rstrip("/") for path in low_priority_paths)
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        controller = self.controller
+        if not await controller.acquire(self._priority(scope["path"])):
+            response = JSONResponse(
+                {"detail": "Server is busy, retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.monotonic()
+        released = False
+
+        async def send_and_release(message) -> None:
+            nonlocal released
+            # The slot is given back at the response's start: streamed
+            # bodies (the SSE feed) would otherwise hold it for their life.
+            if message["type"] == "http.response.start" and not released:
+                released = True
+                controller.release(time.monotonic() - started)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            if not released:
+                controller.release(time.monotonic() - started)
+
+    def _priority(self, path: str) -> Priority:
+        if self._matches(path, self.critical_paths):
+            return Priority.CRITICAL
+        if self._matches(path, self.low_priority_paths):
+            return Priority.LOW
+        return Priority.NORMAL
+
+    @staticmethod
+    def _matches(path: str, prefixes) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in prefixes)
+
+
+@lru_cache(maxsize=None)
+def get_admission_controller() -> AdmissionController:
+    return AdmissionController(
+        GradientLimit(
+            settings.admission_initial_limit,
+            settings.admission_min_limit,
+            settings.admission_max_limit,
+            tolerance=settings.admission_latency_tolerance,
+        ),
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_seconds,
+        saturation=pool_saturation,
+    )
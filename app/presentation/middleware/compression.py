@@ -0,0 +1,258 @@
+"""
+Response compression negotiated from ``Accept-Encoding``: zstd, brotli or gzip.
+
+A plain ASGI middleware rather than ``BaseHTTPMiddleware``, so bodies pass
+through without an extra task and queue per request. Complete bodies
+smaller than ``minimum_size`` go out as they are: for a short JSON object
+the CPU costs more than the few bytes saved. Streamed bodies (no
+``Content-Length`` known up front, e.g. ``StreamingResponse`` and the SSE
+feed) are compressed chunk by chunk, each chunk flushed, so a client sees
+every event as soon as it is sent, while the compression context still
+spans the whole stream.
+
+``brotli`` and ``zstandard`` are optional packages; without them those
+codecs aren't offered and gzip is used.
+"""
+import importlib.util
+import zlib
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Bodies at least this big are compressed off the event loop (the codecs
+# release the GIL), so an export doesn't stall every other request.
+THREADPOOL_THRESHOLD = 64 * 1024
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "application/x-ndjson",
+    "+json",
+    "+xml",
+)
+
+
+class Compressor(ABC):
+    """One response's compression stream."""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def flush(self) -> bytes:
+        """Everything compressed so far, decodable by the client right away."""
+        pass
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        pass
+
+
+class GzipCompressor(Compressor):
+
+    def __init__(self, level: int):
+        # wbits 31: a gzip header and trailer around the deflate stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+
+    def __init__(self, level: int):
+        import brotli
+
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor(Compressor):
+
+    def __init__(self, level: int):
+        import zstandard
+
+        self._flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Content-Encoding token -> (compressor factory, module it needs)
+CODECS: Dict[str, Tuple[Callable[[int], Compressor], Optional[str]]] = {
+    "zstd": (ZstdCompressor, "zstandard"),
+    "br": (BrotliCompressor, "brotli"),
+    "gzip": (GzipCompressor, None),
+}
+
+
+def available_codecs(names: Iterable[str]) -> List[str]:
+    """The codecs among ``names`` whose package is installed, in the same order."""
+    available = []
+    for name in names:
+        if name not in CODECS:
+            raise ValueError(f"Unknown compression codec: {name!r}")
+        module = CODECS[name][1]
+        # Found, not imported: the import waits for the first response.
+        if module is None or importlib.util.find_spec(module) is not None:
+            available.append(name)
+    return available
+
+
+def negotiate(accept_encoding: str, codecs: List[str]) -> Optional[str]:
+    """The codec to use for ``Accept-Encoding``, or None for no compression.
+
+    The client's q-values decide; among equal ones the order of ``codecs``,
+    the server's preference. ``*`` stands for any codec not listed.
+    """
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[token.strip()] = weight
+    best, best_weight = None, 0.0
+    for codec in codecs:
+        weight = weights.get(codec, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+class CompressionMiddleware:
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        codecs: Iterable[str] = ("zstd", "br", "gzip"),
+        levels: Optional[Dict[str, int]] = None,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.codecs = available_codecs(codecs)
+        self.levels = {"zstd": 3, "br": 4, "gzip": 6, **(levels or {})}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(send, codec, self.levels[codec], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+
+    def __init__(self, send: Send, codec: str, level: int, minimum_size: int):
+        self._send = send
+        self._codec = codec
+        self._level = level
+        self._minimum_size = minimum_size
+        self._start: Optional[Message] = None
+        self._compressor: Optional[Compressor] = None
+        self._passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows how to send it.
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        if self._passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._compressor is None:
+            start, self._start = self._start, None
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._compressible(start["status"], headers):
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body and len(body) < self._minimum_size:
+                self._passthrough = True
+                await self._send(start)
+                await self._send(message)
+                return
+            self._compressor = CODECS[self._codec][0](self._level)
+            headers["Content-Encoding"] = self._codec
+            if not more_body:
+                # The whole body at once: compress it and say how big it is.
+                body = await self._compress_all(body)
+                headers["Content-Length"] = str(len(body))
+                await self._send(start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            # A stream: its length isn't known until it ends.
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self._send(start)
+
+        compressor = self._compressor
+        if more_body:
+            chunk = compressor.compress(body) + compressor.flush() if body else b""
+        else:
+            chunk = compressor.compress(body) + compressor.finish()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _compress_all(self, body: bytes) -> bytes:
+        compressor = self._compressor
+        if len(body) >= THREADPOOL_THRESHOLD:
+            return await run_in_threadpool(lambda: compressor.compress(body) + compressor.finish())
+        return compressor.compress(body) + compressor.finish()
+
+    @staticmethod
+    def _compressible(status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return any(
+            content_type.endswith(kind) if kind.startswith("+") else content_type.startswith(kind)
+            for kind in COMPRESSIBLE_TYPES
+        )
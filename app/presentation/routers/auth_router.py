@@ -9,6 +9,7 @@ from app.infrastructure.dtos.user_dtos import (
 )
 from app.presentation.exceptions.exceptions import AuthenticationException, ValidationException, ConflictResourceException
 from app.infrastructure.common.sql_alchemy_unit_of_work import SQLModelUnitOfWork
+from app.presentation.dependencies.rate_limit import rate_limit
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
@@ -28,7 +29,7 @@ def get_current_user(
         raise AuthenticationException
     return payload
 
-@router.post("/signup", response_model=TokenDto)
+@router.post("/signup", response_model=TokenDto, dependencies=[rate_limit("signup", account_field="email")])
 def sign_up(
     sign_up_dto: SignUpDto,
     auth_service: AuthService = Depends(get_auth_service)
@@ -42,7 +43,7 @@ def sign_up(
             raise ConflictResourceException("User")
         raise ValidationException(f"Sign up failed: {str(e)}")
 
-@router.post("/signin", response_model=TokenDto)
+@router.post("/signin", response_model=TokenDto, dependencies=[rate_limit("signin", account_field="email")])
 def sign_in(
     sign_in_dto: SignInDto,
     auth_service: AuthService = Depends(get_auth_service)
@@ -55,7 +56,7 @@ def sign_in(
             raise AuthenticationException("Invalid email or password")
         raise ValidationException(f"Sign in failed: {str(e)}")
 
-@router.post("/refresh", response_model=RefreshTokenResponseDto)
+@router.post("/refresh", response_model=RefreshTokenResponseDto, dependencies=[rate_limit("refresh")])
 def refresh_token(
     refresh_dto: RefreshTokenDto,
     auth_service: AuthService = Depends(get_auth_service)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from fastapi.encoders import jsonable_encoder
+from sqlmodel import Session
+from app.infrastructure.database import get_db
+from app.application.services.task_service import TaskService
+from app.application.exceptions import ServiceException
+from app.infrastructure.dtos.task_dtos import BatchRequestDto, BatchResultDto
+from app.infrastructure.common.sql_alchemy_unit_of_work import SQLModelUnitOfWork
+from app.presentation.exceptions.exceptions import BatchFailedException, ValidationException
+from app.presentation.dependencies.idempotency import IdempotencyGuard, idempotency_guard
+
+router = APIRouter(prefix="/api/v1/batch", tags=["batch"])
+
+
+@router.post("", response_model=BatchResultDto)
+async def run_batch(
+    batch_dto: BatchRequestDto,
+    db: Session = Depends(get_db),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
+):
+    """Run task operations in order, in one transaction and one commit.
+
+    ``atomic`` batches apply all of their operations or, answering 409 with
+    the results, none of them. ``best_effort`` batches commit the operations
+    that succeed and report the others as failed.
+    """
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=batch_dto.user_id)
+    service = TaskService(uow)
+
+    def run() -> BatchResultDto:
+        result = service.run_batch(batch_dto)
+        for operation_result in result.results:
+            if operation_result.error is not None:
+                operation_result.status_code = 404 if "Task not found" in operation_result.error else 400
+        if not result.committed:
+            # Raised rather than returned, so the Idempotency-Key isn't used up.
+            raise BatchFailedException(jsonable_encoder(result))
+        return result
+
+    try:
+        return await idempotency.run(f"tasks.batch:{batch_dto.user_id}", run)
+    except ServiceException as e:
+        # Too many operations
+        raise ValidationException(str(e))
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request, Response
+from app.core.config import settings
+from app.infrastructure.common.jwt_keys import get_key_ring
+
+router = APIRouter(tags=["authentication"])
+
+@router.get("/.well-known/jwks.json")
+async def jwks(request: Request):
+    """Public keys that verify access tokens, for services checking them locally.
+
+    The document only changes on a restart with new keys, so it is serialized
+    once and clients may cache it for ``JWKS_MAX_AGE_SECONDS``.
+    """
+    key_ring = get_key_ring()
+    headers = {
+        "Cache-Control": f"public, max-age={settings.jwks_max_age_seconds}",
+        "ETag": key_ring.jwks_etag,
+    }
+    if request.headers.get("if-none-match") == key_ring.jwks_etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=key_ring.jwks, media_type="application/jwk-set+json", headers=headers)
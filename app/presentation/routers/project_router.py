@@ -0,0 +1,147 @@
+from fastapi import APIRouter, Depends, Query
+from sqlmodel import Session
+from typing import Optional
+from uuid import UUID
+from app.infrastructure.database import get_db, get_read_db
+from app.infrastructure.common.paginated_results import CursorPagedResult, CursorPaginationRequest, PaginationDirection
+from app.application.services.project_service import ProjectService
+from app.infrastructure.dtos.project_dtos import AddProjectMemberDto, CreateProjectDto, ProjectDto, ProjectMemberDto
+from app.infrastructure.dtos.task_dtos import TaskDto
+from app.infrastructure.common.sql_alchemy_unit_of_work import SQLModelUnitOfWork
+from app.presentation.exceptions.exceptions import (
+    AuthorizationException, ConflictResourceException, NotFoundException, ValidationException
+)
+
+router = APIRouter(prefix="/api/v1/projects", tags=["projects"])
+
+
+def _raise_for(e: Exception, action: str):
+    if "Project not found" in str(e):
+        raise NotFoundException("Project")
+    if "User not found" in str(e):
+        raise NotFoundException("User")
+    if "Only the project owner" in str(e):
+        raise AuthorizationException(str(e))
+    if "Member already exists" in str(e):
+        raise ConflictResourceException("Member")
+    raise ValidationException(f"Failed to {action}: {str(e)}")
+
+
+@router.post("/", response_model=ProjectDto)
+async def create_project(
+    project_dto: CreateProjectDto,
+    db: Session = Depends(get_db)
+):
+    uow = SQLModelUnitOfWork(lambda: db)
+    service = ProjectService(uow)
+    try:
+        return service.create_project(project_dto)
+    except Exception as e:
+        _raise_for(e, "create project")
+
+
+@router.get("/", response_model=CursorPagedResult[ProjectDto])
+async def get_projects(
+    user_id: UUID,
+    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
+    db: Session = Depends(get_read_db)
+):
+    """Projects the user is a member of, with their role in each."""
+    try:
+        pagination_request = CursorPaginationRequest(cursor=cursor, page_size=page_size, direction=direction)
+
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True)
+        service = ProjectService(uow)
+        return service.get_user_projects(user_id, pagination_request)
+    except Exception as e:
+        if "User ID is required" in str(e):
+            raise ValidationException("User ID is required")
+        raise ValidationException(f"Failed to get projects: {str(e)}")
+
+
+@router.get("/{project_id}", response_model=ProjectDto)
+async def get_project(
+    project_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_read_db)
+):
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True)
+    service = ProjectService(uow)
+    try:
+        return service.get_project(project_id, user_id)
+    except Exception as e:
+        _raise_for(e, "get project")
+
+
+@router.get("/{project_id}/tasks", response_model=CursorPagedResult[TaskDto])
+async def get_project_tasks(
+    project_id: UUID,
+    user_id: UUID,
+    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
+    db: Session = Depends(get_read_db)
+):
+    """Every member's tasks in the project, paginated like ``GET /tasks/``."""
+    try:
+        pagination_request = CursorPaginationRequest(cursor=cursor, page_size=page_size, direction=direction)
+
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True)
+        service = ProjectService(uow)
+        return service.get_project_tasks(project_id, user_id, pagination_request)
+    except Exception as e:
+        _raise_for(e, "get project tasks")
+
+
+@router.get("/{project_id}/members", response_model=CursorPagedResult[ProjectMemberDto])
+async def get_project_members(
+    project_id: UUID,
+    user_id: UUID,
+    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        pagination_request = CursorPaginationRequest(cursor=cursor, page_size=page_size, direction=direction)
+
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True)
+        service = ProjectService(uow)
+        return service.get_members(project_id, user_id, pagination_request)
+    except Exception as e:
+        _raise_for(e, "get project members")
+
+
+@router.post("/{project_id}/members", response_model=ProjectMemberDto)
+async def add_project_member(
+    project_id: UUID,
+    member_dto: AddProjectMemberDto,
+    user_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Add a member; only the project's owner can."""
+    uow = SQLModelUnitOfWork(lambda: db)
+    service = ProjectService(uow)
+    try:
+        return service.add_member(project_id, user_id, member_dto.member_id)
+    except Exception as e:
+        _raise_for(e, "add project member")
+
+
+@router.delete("/{project_id}/members/{member_id}")
+async def remove_project_member(
+    project_id: UUID,
+    member_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """The owner removes a member, or a member removes themselves."""
+    uow = SQLModelUnitOfWork(lambda: db)
+    service = ProjectService(uow)
+    try:
+        service.remove_member(project_id, user_id, member_id)
+        return {"message": "Member removed successfully"}
+    except Exception as e:
+        _raise_for(e, "remove project member")
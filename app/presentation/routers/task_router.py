@@ -1,29 +1,49 @@
 
-from fastapi import APIRouter, Depends, Query
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, WebSocket, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlmodel import Session
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
-from app.infrastructure.database import get_db
+from app.core.config import settings
+from app.infrastructure.database import get_db, get_read_db
 from app.infrastructure.common.paginated_results import (
     CursorPagedResult, 
     CursorPaginationRequest, 
-    PaginationDirection
+    PagedResult,
+    PaginationDirection,
+    PaginationRequest
 )
 from app.application.services.task_service import TaskService
-from app.infrastructure.dtos.task_dtos import TaskDto, CreateTaskDto, UpdateTaskDto, TaskResponseDto
+from app.application.exceptions import ServiceException
+from app.infrastructure.dtos.task_dtos import TagDto, TaskDto, CreateTaskDto, UpdateTaskDto, MoveTaskDto, TaskResponseDto, TaskChangesDto, parse_fields
 from app.infrastructure.common.sql_alchemy_unit_of_work import SQLModelUnitOfWork
-from app.presentation.exceptions.exceptions import NotFoundException, ValidationException
+from app.infrastructure.common.auth_service import AuthService as InfrastructureAuthService
+from app.infrastructure.common.sync_watermark import SyncWatermark
+from app.infrastructure.dtos.task_dtos import TaskChangeDto
+from app.infrastructure.realtime.brokers import get_event_hub
+from app.infrastructure.realtime.hub import Subscription
+from app.presentation.exceptions.exceptions import NotFoundException, ValidationException, GoneException, AuthenticationException
+from app.presentation.dependencies.idempotency import IdempotencyGuard, idempotency_guard
 
 router = APIRouter(prefix="/api/v1/tasks", tags=["tasks"])
 
 
+def _sparse_response(result: BaseModel) -> Response:
+    # Returned as is: response_model would ask for the fields left out.
+    return Response(result.model_dump_json(), media_type="application/json")
+
+
 @router.get("/", response_model=CursorPagedResult[TaskDto])
 async def get_tasks_with_cursor_pagination(
     user_id: UUID,
     cursor: Optional[str] = Query(None, description="Cursor for pagination"),
     page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
     direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
-    db: Session = Depends(get_db)
+    tag: Optional[List[str]] = Query(None, description="Only tasks with this tag; repeat for tasks with all of them"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status; id is always included"),
+    db: Session = Depends(get_read_db)
 ):
     try:
         pagination_request = CursorPaginationRequest(
@@ -31,39 +51,278 @@ async def get_tasks_with_cursor_pagination(
             page_size=page_size,
             direction=direction
         )
+        selected_fields = parse_fields(fields, TaskDto)
         
-        uow = SQLModelUnitOfWork(lambda: db)
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
         service = TaskService(uow)
-        result = service.get_all_tasks_paginated_by_cursor(user_id, pagination_request)
+        result = service.get_all_tasks_paginated_by_cursor(user_id, pagination_request, tag, selected_fields)
+        
+        return result if selected_fields is None else _sparse_response(result)
+    except Exception as e:
+        if "User ID is required" in str(e):
+            raise ValidationException("User ID is required")
+        raise ValidationException(f"Failed to get tasks: {str(e)}")
+
+
+@router.get("/pages", response_model=PagedResult[TaskDto])
+async def get_tasks_with_offset_pagination(
+    user_id: UUID,
+    page_number: int = Query(1, ge=1, description="Page number, starting at 1"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status; id is always included"),
+    db: Session = Depends(get_read_db)
+):
+    """Numbered pages. ``total_count`` is exact on the last page and may
+    otherwise trail concurrent writes slightly."""
+    try:
+        pagination_request = PaginationRequest(page_number=page_number, page_size=page_size)
+        selected_fields = parse_fields(fields, TaskDto)
         
-        return result
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+        service = TaskService(uow)
+        result = service.get_all_tasks_paginated(user_id, pagination_request, selected_fields)
+        return result if selected_fields is None else _sparse_response(result)
+    except Exception as e:
+        if "User ID is required" in str(e):
+            raise ValidationException("User ID is required")
+        raise ValidationException(f"Failed to get tasks: {str(e)}")
+
+
+@router.get("/ordered", response_model=CursorPagedResult[TaskDto])
+async def get_tasks_in_order(
+    user_id: UUID,
+    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
+    db: Session = Depends(get_read_db)
+):
+    """Tasks in the user's manual order (see ``PUT /{task_id}/position``)."""
+    try:
+        pagination_request = CursorPaginationRequest(
+            cursor=cursor,
+            page_size=page_size,
+            direction=direction
+        )
+
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+        service = TaskService(uow)
+        return service.get_tasks_by_position(user_id, pagination_request)
     except Exception as e:
         if "User ID is required" in str(e):
             raise ValidationException("User ID is required")
         raise ValidationException(f"Failed to get tasks: {str(e)}")
 
 
+@router.get("/tags", response_model=List[TagDto])
+async def search_tags(
+    user_id: UUID,
+    prefix: str = Query("", max_length=50, description="Start of the tag name, case-insensitive"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of tags to return"),
+    db: Session = Depends(get_read_db)
+):
+    """Tag autocomplete: the user's tags starting with ``prefix``, by name."""
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.search_tags(user_id, prefix, limit)
+    except Exception as e:
+        raise ValidationException(f"Failed to get tags: {str(e)}")
+
+
 @router.post("/", response_model=TaskResponseDto)
 async def create_task(
     task_dto: CreateTaskDto,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    idempotency: IdempotencyGuard = Depends(idempotency_guard)
 ):
    
-    uow = SQLModelUnitOfWork(lambda: db)
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=task_dto.user_id)
     service = TaskService(uow)
-    return service.create_task(task_dto)
+    try:
+        return await idempotency.run(
+            f"tasks.create:{task_dto.user_id}",
+            lambda: service.create_task(task_dto)
+        )
+    except ServiceException as e:
+        # An unknown parent or project, or too deep a subtask
+        raise ValidationException(str(e))
+
+
+@router.get("/archive", response_model=CursorPagedResult[TaskDto])
+async def get_archived_tasks(
+    user_id: UUID,
+    cursor: Optional[str] = Query(None, description="Cursor for pagination"),
+    page_size: int = Query(10, ge=1, le=50, description="Number of items per page"),
+    direction: PaginationDirection = Query(PaginationDirection.FORWARD, description="Pagination direction"),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        pagination_request = CursorPaginationRequest(
+            cursor=cursor,
+            page_size=page_size,
+            direction=direction
+        )
+        
+        uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+        service = TaskService(uow)
+        return service.get_archived_tasks_paginated_by_cursor(user_id, pagination_request)
+    except Exception as e:
+        if "User ID is required" in str(e):
+            raise ValidationException("User ID is required")
+        raise ValidationException(f"Failed to get archived tasks: {str(e)}")
+
+
+@router.get("/archive/{task_id}", response_model=TaskResponseDto)
+async def get_archived_task(
+    task_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_read_db)
+):
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.get_archived_task_by_id(task_id, user_id)
+    except Exception as e:
+        if "Task not found" in str(e):
+            raise NotFoundException("Task")
+        raise ValidationException(f"Failed to get archived task: {str(e)}")
+
+
+@router.get("/changes", response_model=TaskChangesDto)
+async def get_task_changes(
+    user_id: UUID,
+    since: Optional[str] = Query(None, description="next_token from the previous sync; omit for a full sync"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of changes to return"),
+    db: Session = Depends(get_read_db)
+):
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.get_task_changes(user_id, since, limit)
+    except Exception as e:
+        if "Sync token expired" in str(e):
+            raise GoneException(str(e))
+        if "Invalid sync token" in str(e):
+            raise ValidationException("Invalid sync token")
+        raise ValidationException(f"Failed to get task changes: {str(e)}")
+
+
+def _user_id_from_access_token(token: Optional[str]) -> Optional[UUID]:
+    if not token:
+        return None
+    payload = InfrastructureAuthService(None).verify_access_token(token)
+    try:
+        return UUID(payload["sub"]) if payload else None
+    except (KeyError, ValueError):
+        return None
+
+
+def _change_message(change: Optional[TaskChangeDto]) -> dict:
+    # ``None`` means the subscriber fell behind and was dropped.
+    if change is None:
+        return {"event": "resync"}
+    return {
+        "event": change.change.value,
+        "token": SyncWatermark(change.changed_at, change.id).encode(),
+        "data": change.model_dump(mode="json")
+    }
+
+
+async def _event_stream(request: Request, subscription: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                change = await subscription.get(settings.realtime_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            if change is None:
+                yield "event: resync\ndata: {}\n\n"
+                break
+            message = _change_message(change)
+            yield f"id: {message['token']}\nevent: {message['event']}\ndata: {change.model_dump_json()}\n\n"
+    finally:
+        get_event_hub().unsubscribe(subscription)
+
+
+@router.get("/events")
+async def stream_task_changes(
+    request: Request,
+    access_token: Optional[str] = Query(None, description="Access token, for clients that can't send headers"),
+    authorization: Optional[str] = Header(None)
+):
+    """Server-Sent Events stream of the caller's task changes.
+
+    Each event id is a delta sync token: after a disconnect or a ``resync``
+    event, catch up with ``/tasks/changes?since=<last id>``.
+    """
+    if authorization and authorization.lower().startswith("bearer "):
+        access_token = authorization[7:]
+    user_id = _user_id_from_access_token(access_token)
+    if user_id is None:
+        raise AuthenticationException()
+
+    subscription = get_event_hub().subscribe(user_id)
+    return StreamingResponse(
+        _event_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/ws")
+async def task_changes_websocket(websocket: WebSocket, access_token: Optional[str] = Query(None)):
+    """WebSocket variant of ``/events``; messages are ``_change_message`` dicts."""
+    user_id = _user_id_from_access_token(access_token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    hub = get_event_hub()
+    subscription = hub.subscribe(user_id)
+    # Sending runs in its own task so a client that goes away is noticed
+    # right away by the receive loop instead of at the next heartbeat.
+    sender = asyncio.create_task(_send_changes(websocket, subscription))
+    try:
+        while not sender.done():
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+    finally:
+        sender.cancel()
+        hub.unsubscribe(subscription)
+
+
+async def _send_changes(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        try:
+            change = await subscription.get(settings.realtime_heartbeat_seconds)
+        except asyncio.TimeoutError:
+            await websocket.send_json({"event": "ping"})
+            continue
+        await websocket.send_json(_change_message(change))
+        if change is None:
+            await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+            return
 
 
 @router.get("/{task_id}", response_model=TaskResponseDto)
 async def get_task(
     task_id: UUID,
     user_id: UUID,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,status; id is always included"),
+    db: Session = Depends(get_read_db)
 ):
-    uow = SQLModelUnitOfWork(lambda: db)
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
     service = TaskService(uow)
     try:
-        return service.get_task_by_id(task_id, user_id)
+        selected_fields = parse_fields(fields, TaskResponseDto)
+        result = service.get_task_by_id(task_id, user_id, selected_fields)
+        return result if selected_fields is None else _sparse_response(result)
     except Exception as e:
         if "Task not found" in str(e):
             raise NotFoundException("Task")
@@ -77,7 +336,7 @@ async def update_task(
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
-    uow = SQLModelUnitOfWork(lambda: db)
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=user_id)
     service = TaskService(uow)
     try:
         return service.update_task(task_update_dto, user_id)
@@ -87,13 +346,82 @@ async def update_task(
         raise ValidationException(f"Failed to update task: {str(e)}")
 
 
+@router.get("/{task_id}/subtasks", response_model=List[TaskDto])
+async def get_subtasks(
+    task_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_read_db)
+):
+    """The task and all of its descendants, shallowest first; ``parent_id`` links them."""
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.get_subtasks(task_id, user_id)
+    except Exception as e:
+        if "Task not found" in str(e):
+            raise NotFoundException("Task")
+        raise ValidationException(f"Failed to get subtasks: {str(e)}")
+
+
+@router.get("/{task_id}/ancestors", response_model=List[TaskDto])
+async def get_task_ancestors(
+    task_id: UUID,
+    user_id: UUID,
+    db: Session = Depends(get_read_db)
+):
+    """The task's ancestors, from its root task down to its parent."""
+    uow = SQLModelUnitOfWork(lambda: db, read_only=True, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.get_task_ancestors(task_id, user_id)
+    except Exception as e:
+        if "Task not found" in str(e):
+            raise NotFoundException("Task")
+        raise ValidationException(f"Failed to get ancestors: {str(e)}")
+
+
+@router.post("/{task_id}/complete", response_model=TaskResponseDto)
+async def complete_task(
+    task_id: UUID,
+    user_id: UUID,
+    include_subtasks: bool = Query(True, description="Also complete every descendant"),
+    db: Session = Depends(get_db)
+):
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.complete_task(task_id, user_id, include_subtasks)
+    except Exception as e:
+        if "Task not found" in str(e):
+            raise NotFoundException("Task")
+        raise ValidationException(f"Failed to complete task: {str(e)}")
+
+
+@router.put("/{task_id}/position", response_model=TaskResponseDto)
+async def move_task(
+    task_id: UUID,
+    move_dto: MoveTaskDto,
+    user_id: UUID,
+    db: Session = Depends(get_db)
+):
+    """Place the task right after ``after_id``, or first without one."""
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=user_id)
+    service = TaskService(uow)
+    try:
+        return service.move_task(task_id, user_id, move_dto.after_id)
+    except Exception as e:
+        if "Task not found" in str(e):
+            raise NotFoundException("Task")
+        raise ValidationException(f"Failed to move task: {str(e)}")
+
+
 @router.delete("/{task_id}")
 async def delete_task(
     task_id: UUID,
     user_id: UUID,
     db: Session = Depends(get_db)
 ):
-    uow = SQLModelUnitOfWork(lambda: db)
+    uow = SQLModelUnitOfWork(lambda: db, shard_key=user_id)
     service = TaskService(uow)
     try:
         service.delete_task(task_id, user_id)
@@ -0,0 +1,7 @@
+"""
+Offline benchmark suite for the TodoList API.
+
+The benchmarks drive the real ``app.main:app`` in-process through an ASGI
+transport, against a throwaway SQLite file or any database URL passed on the
+command line (for example a locally spawned Postgres).
+"""
@@ -0,0 +1,152 @@
+"""
+Admission control through a database slowdown, simulated.
+
+Usage::
+
+    python -m benchmarks.admission
+    python -m benchmarks.admission --rate 800 --slow-query-ms 60
+
+Drives ``AdmissionMiddleware`` with open-loop traffic (``--rate`` requests
+a second, arriving regardless of how the server copes) against a fake
+endpoint that holds one of ``--pool-size`` connections for the length of a
+query, as ``get_db`` does. Queries take ``--query-ms``, except during the
+middle phase of the run, when they take ``--slow-query-ms`` and the offered
+load is more than the pool can serve. 5% of the requests are auth refreshes
+(critical), 10% batches (low priority), the rest normal.
+
+The same traffic runs once with the middleware and once without it, and
+for each phase and priority class reports the requests served, shed with
+503 and their latency percentiles. Without admission control every request
+waits for a connection and latency keeps growing with the backlog; with it,
+the backlog stays bounded and critical requests still go through.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.harness import configure_environment
+
+PATHS = (("/api/v1/auth/refresh", 0.05), ("/api/v1/batch", 0.10), ("/api/v1/tasks/", 0.85))
+PHASES = ("before", "slowdown", "after")
+
+
+class FakePool:
+    """Connections held for a query's length; waiters queue, like a QueuePool."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._semaphore = asyncio.Semaphore(size)
+        self.in_use = 0
+        self.waiting = 0
+
+    def saturation(self) -> float:
+        return (self.in_use + self.waiting) / self.size
+
+    async def query(self, seconds: float) -> None:
+        self.waiting += 1
+        async with self._semaphore:
+            self.waiting -= 1
+            self.in_use += 1
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                self.in_use -= 1
+
+
+async def run(args, admission: bool) -> Dict[Tuple[str, str], Tuple[List[float], int]]:
+    from app.presentation.middleware.admission import (
+        AdmissionController, AdmissionMiddleware, GradientLimit
+    )
+
+    pool = FakePool(args.pool_size)
+    slow = {"on": False}
+
+    async def endpoint(scope, receive, send):
+        await pool.query((args.slow_query_ms if slow["on"] else args.query_ms) / 1000)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    app = endpoint
+    if admission:
+        controller = AdmissionController(
+            GradientLimit(20, 4, 200), max_queue=args.max_queue, queue_timeout=2, saturation=pool.saturation
+        )
+        app = AdmissionMiddleware(
+            endpoint, controller,
+            critical_paths=["/health", "/api/v1/auth/refresh"], low_priority_paths=["/api/v1/batch"],
+        )
+
+    results: Dict[Tuple[str, str], Tuple[List[float], int]] = {}
+
+    async def request(path: str, phase: str) -> None:
+        status = {}
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+
+        began = time.perf_counter()
+        await app({"type": "http", "method": "GET", "path": path, "headers": []}, receive, send)
+        latencies, shed = results.setdefault((phase, path), ([], 0))
+        if status["code"] == 503:
+            results[(phase, path)] = (latencies, shed + 1)
+        else:
+            latencies.append((time.perf_counter() - began) * 1000)
+
+    rng = random.Random(7)
+    paths, weights = zip(*PATHS)
+    tasks = []
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for phase in PHASES:
+        slow["on"] = phase == "slowdown"
+        phase_end = loop.time() + args.phase_seconds
+        while loop.time() < phase_end:
+            tasks.append(asyncio.create_task(request(rng.choices(paths, weights)[0], phase)))
+            await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    print(f"  ran {len(tasks)} requests in {loop.time() - started:.1f}s")
+    return results
+
+
+def percentile(values: List[float], share: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Admission control through a simulated database slowdown")
+    parser.add_argument("--rate", type=float, default=600, help="Requests arriving per second")
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--query-ms", type=float, default=5)
+    parser.add_argument("--slow-query-ms", type=float, default=40)
+    parser.add_argument("--phase-seconds", type=float, default=3)
+    parser.add_argument("--max-queue", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    configure_environment()
+    print(f"{args.rate:g} req/s; pool of {args.pool_size} serves "
+          f"{args.pool_size * 1000 / args.query_ms:.0f} req/s, "
+          f"{args.pool_size * 1000 / args.slow_query_ms:.0f} req/s during the slowdown")
+    for admission in (False, True):
+        print(f"\nadmission control {'on' if admission else 'off'}:")
+        results = asyncio.run(run(args, admission))
+        print(f"  {'phase':<9} {'path':<22} {'served':>7} {'503':>6} {'p50':>9} {'p99':>9}")
+        for phase in PHASES:
+            for path, _ in PATHS:
+                latencies, shed = results.get((phase, path), ([], 0))
+                print(f"  {phase:<9} {path:<22} {len(latencies):>7} {shed:>6}"
+                      f" {percentile(latencies, 0.5):>7.1f}ms {percentile(latencies, 0.99):>7.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+CPU versus bytes for each response compression codec and level.
+
+Usage::
+
+    python -m benchmarks.compression
+    python -m benchmarks.compression --samples 50 --bandwidth-mbps 2
+
+Builds the JSON bodies the API actually sends (a health check, 10- and
+50-item ``CursorPagedResult[TaskDto]`` pages, and a 5,000-task export),
+and compresses each with every available codec at several levels, through
+the compressors ``CompressionMiddleware`` uses. For each it reports the
+compressed size, the median time to compress and to decompress, and the
+time to deliver the body over a ``--bandwidth-mbps`` link: compression
+plus transfer, which is what the client waits for. ``*`` marks the default
+level of each codec. zstd and br are skipped unless ``zstandard`` and
+``brotli`` are installed.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from benchmarks.harness import configure_environment
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 10, 19)}
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}
+WORDS = (
+    "review write deploy fix plan call email draft update check merge test release "
+    "budget report meeting design customer invoice backlog sprint notes onboarding"
+).split()
+
+
+def payloads() -> List[Tuple[str, bytes]]:
+    from app.domain.constants.TASK_STATUS import TaskStatus
+    from app.infrastructure.common.paginated_results import CursorPagedResult, CursorPaginationHelper
+    from app.infrastructure.dtos.task_dtos import TaskDto
+
+    random.seed(7)
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+
+    def task() -> TaskDto:
+        return TaskDto(
+            id=uuid.uuid4(),
+            title=" ".join(random.choices(WORDS, k=random.randint(2, 6))).capitalize(),
+            description=" ".join(random.choices(WORDS, k=random.randint(0, 30))) or None,
+            status=random.choice(list(TaskStatus)),
+            user_id=user_id,
+            due_at=now + timedelta(days=random.randint(1, 30)) if random.random() < 0.4 else None,
+            position=f"a{random.randint(0, 9999):04d}",
+            tags=random.sample(WORDS, k=random.randint(0, 3)),
+        )
+
+    def page(size: int) -> bytes:
+        items = [task() for _ in range(size)]
+        return CursorPagedResult[TaskDto](
+            items=items,
+            next_cursor=CursorPaginationHelper.encode_cursor(items[-1].id),
+            has_next_page=True,
+            page_size=size,
+        ).model_dump_json().encode()
+
+    export = b"[" + b",".join(task().model_dump_json().encode() for _ in range(5000)) + b"]"
+    return [
+        ("health check", b'{"status":"healthy"}'),
+        ("page of 10", page(10)),
+        ("page of 50", page(50)),
+        ("export of 5000", export),
+    ]
+
+
+def decompressors() -> Dict[str, Callable[[bytes], bytes]]:
+    found: Dict[str, Callable[[bytes], bytes]] = {"gzip": lambda data: zlib.decompress(data, 31)}
+    try:
+        import brotli
+
+        found["br"] = brotli.decompress
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        found["zstd"] = lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    except ImportError:
+        pass
+    return found
+
+
+def median_ms(samples: int, run: Callable[[], bytes]) -> Tuple[float, bytes]:
+    timings, result = [], b""
+    for _ in range(samples):
+        began = time.perf_counter()
+        result = run()
+        timings.append((time.perf_counter() - began) * 1000)
+    return statistics.median(timings), result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Response compression codecs: CPU versus bytes")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0,
+                        help="Link speed for the delivery time column")
+    args = parser.parse_args(argv)
+
+    configure_environment()
+    from app.presentation.middleware.compression import CODECS
+
+    bytes_per_ms = args.bandwidth_mbps * 1_000_000 / 8 / 1000
+    available = decompressors()
+    print(f"codecs: {', '.join(available)}; delivery at {args.bandwidth_mbps:g} Mbit/s")
+    for name, body in payloads():
+        plain_ms = len(body) / bytes_per_ms
+        print(f"\n{name}: {len(body):,} bytes, {plain_ms:.2f} ms uncompressed")
+        print(f"  {'codec':<9} {'bytes':>9} {'ratio':>6} {'compress':>9} {'MB/s':>7} {'decomp.':>8} {'delivery':>9}")
+        for codec, levels in LEVELS.items():
+            if codec not in available:
+                continue
+            for level in levels:
+                def compress() -> bytes:
+                    compressor = CODECS[codec][0](level)
+                    return compressor.compress(body) + compressor.finish()
+
+                compress_ms, compressed = median_ms(args.samples, compress)
+                decompress_ms, restored = median_ms(args.samples, lambda: available[codec](compressed))
+                assert restored == body, (codec, level)
+                label = f"{codec} {level}{'*' if DEFAULT_LEVELS[codec] == level else ''}"
+                throughput = len(body) / 1000 / compress_ms if compress_ms else float("inf")
+                print(f"  {label:<9} {len(compressed):>9,} {len(body) / len(compressed):>5.1f}x"
+                      f" {compress_ms:>7.3f}ms {throughput:>7.0f} {decompress_ms:>6.3f}ms"
+                      f" {compress_ms + len(compressed) / bytes_per_ms:>7.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Shared helpers for the benchmark suite: environment setup, latency recording,
+result persistence and baseline comparison.
+"""
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCHMARKS_DIR / "results"
+BASELINES_DIR = BENCHMARKS_DIR / "baselines"
+
+
+def configure_environment(database_url: Optional[str] = None, shards: int = 0) -> str:
+    """Point the application settings at a benchmark database.
+
+    With ``shards`` > 0 tasks are spread over that many SQLite files, next to
+    the primary database, through ``DATABASE_SHARD_URLS``.
+
+    Must run before anything under ``app`` is imported, because settings are
+    read from the environment when ``app.core.config`` is first imported.
+    """
+    db_dir = tempfile.mkdtemp(prefix="todolist-bench-")
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DATABASE_SHARD_URLS"] = ",".join(
+        f"shard{i}=sqlite:///{os.path.join(db_dir, f'shard{i}.db')}" for i in range(shards)
+    )
+    os.environ["DEBUG"] = "false"
+    # Every benchmark request comes from one client address.
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    return database_url
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    wall_time_s: float = 0.0
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "p50_ms": round(percentile(ordered, 50), 3),
+            "p95_ms": round(percentile(ordered, 95), 3),
+            "p99_ms": round(percentile(ordered, 99), 3),
+            "mean_ms": round(sum(ordered) / count, 3) if count else 0.0,
+            "max_ms": round(ordered[-1], 3) if count else 0.0,
+            "rps": round(count / self.wall_time_s, 2) if self.wall_time_s else 0.0,
+            **self.meta,
+        }
+
+
+async def run_concurrently(
+    result: ScenarioResult,
+    operations: List[Callable[[], Awaitable[bool]]],
+    concurrency: int,
+) -> ScenarioResult:
+    """Run ``operations`` with at most ``concurrency`` in flight.
+
+    Each operation returns whether it succeeded; its latency and outcome are
+    recorded on ``result`` and the wall time of the whole batch is used to
+    compute requests per second.
+    """
+    queue: "asyncio.Queue[Callable[[], Awaitable[bool]]]" = asyncio.Queue()
+    for operation in operations:
+        queue.put_nowait(operation)
+
+    async def worker() -> None:
+        while True:
+            try:
+                operation = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                ok = await operation()
+            except Exception:
+                ok = False
+            result.record((time.perf_counter() - started) * 1000, ok)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.wall_time_s += time.perf_counter() - started
+    return result
+
+
+def build_report(results: List[ScenarioResult], params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": params,
+        },
+        "scenarios": {result.name: result.summary() for result in results},
+    }
+
+
+def save_report(report: Dict[str, Any], path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+    return path
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(Path(path).read_text())
+
+
+def compare_reports(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float = 0.2,
+) -> List[str]:
+    """Return a list of human readable regressions.
+
+    A scenario regresses when its p95 or p99 latency grows, or its throughput
+    drops, by more than ``threshold`` (a fraction) relative to the baseline.
+    """
+    regressions = []
+    for name, base in baseline.get("scenarios", {}).items():
+        now = current.get("scenarios", {}).get(name)
+        if now is None:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            if base[metric] and now[metric] > base[metric] * (1 + threshold):
+                regressions.append(
+                    f"{name}: {metric} {base[metric]:.3f} -> {now[metric]:.3f}"
+                )
+        if base["rps"] and now["rps"] < base["rps"] * (1 - threshold):
+            regressions.append(f"{name}: rps {base['rps']:.2f} -> {now['rps']:.2f}")
+        if now["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {now['errors']}")
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    header = f"{'scenario':<28}{'count':>7}{'err':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'rps':>10}"
+    lines = [header, "-" * len(header)]
+    for name, row in report["scenarios"].items():
+        lines.append(
+            f"{name:<28}{row['count']:>7}{row['errors']:>5}"
+            f"{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            f"{row['rps']:>10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,528 @@
+"""
+End-to-end HTTP benchmarks for the TodoList API.
+
+Usage::
+
+    python -m benchmarks.http_suite
+    python -m benchmarks.http_suite --save-baseline local
+    python -m benchmarks.http_suite --compare benchmarks/baselines/local.json
+    python -m benchmarks.http_suite --database-url postgresql://user:pw@localhost/bench
+    python -m benchmarks.http_suite --shards 4
+
+Every run writes its report to ``benchmarks/results/latest.json``.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from benchmarks.harness import (
+    BASELINES_DIR,
+    RESULTS_DIR,
+    ScenarioResult,
+    build_report,
+    compare_reports,
+    configure_environment,
+    format_report,
+    load_report,
+    run_concurrently,
+    save_report,
+)
+
+API = "/api/v1"
+SCENARIOS = ("auth", "tasks", "pagination", "mixed", "sync")
+
+
+class BenchmarkContext:
+    """State shared between scenarios: the client and the seeded fixtures."""
+
+    def __init__(self, client, params: Dict[str, Any]):
+        self.client = client
+        self.params = params
+        self.rng = random.Random(params["seed"])
+        self.users: List[Dict[str, Any]] = []
+        self.task_ids: Dict[str, List[str]] = {}
+
+    def random_user(self) -> Dict[str, Any]:
+        return self.rng.choice(self.users)
+
+
+def _user_id_from_token(access_token: str) -> str:
+    import jwt
+
+    return jwt.decode(access_token, options={"verify_signature": False})["sub"]
+
+
+async def scenario_auth(ctx: BenchmarkContext) -> List[ScenarioResult]:
+    client = ctx.client
+    count = ctx.params["users"]
+    concurrency = ctx.params["concurrency"]
+    run_id = uuid4().hex[:8]
+
+    signup = ScenarioResult("auth.signup")
+
+    def make_signup(index: int):
+        async def op() -> bool:
+            user = {
+                "name": f"bench user {index}",
+                "email": f"bench-{run_id}-{index}@example.com",
+                "password": "bench-password",
+            }
+            response = await client.post(f"{API}/auth/signup", json=user)
+            if response.status_code != 200:
+                return False
+            tokens = response.json()
+            user["id"] = _user_id_from_token(tokens["access_token"])
+            user["refresh_token"] = tokens["refresh_token"]
+            ctx.users.append(user)
+            return True
+
+        return op
+
+    await run_concurrently(signup, [make_signup(i) for i in range(count)], concurrency)
+
+    signin = ScenarioResult("auth.signin")
+
+    def make_signin(user: Dict[str, Any]):
+        async def op() -> bool:
+            response = await client.post(
+                f"{API}/auth/signin",
+                json={"email": user["email"], "password": user["password"]},
+            )
+            if response.status_code != 200:
+                return False
+            user["refresh_token"] = response.json()["refresh_token"]
+            return True
+
+        return op
+
+    await run_concurrently(signin, [make_signin(u) for u in ctx.users], concurrency)
+
+    refresh = ScenarioResult("auth.refresh")
+
+    def make_refresh(user: Dict[str, Any]):
+        async def op() -> bool:
+            response = await client.post(
+                f"{API}/auth/refresh", json={"refresh_token": user["refresh_token"]}
+            )
+            return response.status_code == 200
+
+        return op
+
+    await run_concurrently(refresh, [make_refresh(u) for u in ctx.users], concurrency)
+    return [signup, signin, refresh]
+
+
+async def scenario_tasks(ctx: BenchmarkContext) -> List[ScenarioResult]:
+    client = ctx.client
+    per_user = ctx.params["tasks"]
+    concurrency = ctx.params["concurrency"]
+    created: List[Dict[str, str]] = []
+
+    create = ScenarioResult("tasks.create")
+
+    def make_create(user: Dict[str, Any], index: int):
+        async def op() -> bool:
+            response = await client.post(
+                f"{API}/tasks/",
+                json={
+                    "title": f"task {index}",
+                    "description": "benchmark task " * 8,
+                    "status": "PENDING",
+                    "user_id": user["id"],
+                },
+            )
+            if response.status_code != 200:
+                return False
+            task_id = response.json()["id"]
+            created.append({"id": task_id, "user_id": user["id"]})
+            ctx.task_ids.setdefault(user["id"], []).append(task_id)
+            return True
+
+        return op
+
+    await run_concurrently(
+        create,
+        [make_create(u, i) for u in ctx.users for i in range(per_user)],
+        concurrency,
+    )
+
+    get = ScenarioResult("tasks.get")
+
+    def make_get(task: Dict[str, str]):
+        async def op() -> bool:
+            response = await client.get(
+                f"{API}/tasks/{task['id']}", params={"user_id": task["user_id"]}
+            )
+            return response.status_code == 200
+
+        return op
+
+    await run_concurrently(get, [make_get(t) for t in created], concurrency)
+
+    update = ScenarioResult("tasks.update")
+
+    def make_update(task: Dict[str, str]):
+        async def op() -> bool:
+            response = await client.put(
+                f"{API}/tasks/{task['id']}",
+                params={"user_id": task["user_id"]},
+                json={
+                    "id": task["id"],
+                    "title": "updated",
+                    "description": "updated description",
+                    "status": "COMPLETED",
+                    "updated_at": "2024-01-01T00:00:00",
+                },
+            )
+            return response.status_code == 200
+
+        return op
+
+    await run_concurrently(update, [make_update(t) for t in created], concurrency)
+
+    delete = ScenarioResult("tasks.delete")
+    doomed = created[: len(created) // 4]
+
+    def make_delete(task: Dict[str, str]):
+        async def op() -> bool:
+            response = await client.delete(
+                f"{API}/tasks/{task['id']}", params={"user_id": task["user_id"]}
+            )
+            if response.status_code == 200:
+                ctx.task_ids[task["user_id"]].remove(task["id"])
+                return True
+            return False
+
+        return op
+
+    await run_concurrently(delete, [make_delete(t) for t in doomed], concurrency)
+    return [create, get, update, delete]
+
+
+def seed_tasks(user_id: UUID, count: int) -> None:
+    """Insert ``count`` tasks for one user directly, bypassing HTTP."""
+    from app.domain.constants.TASK_STATUS import TaskStatus
+    from app.infrastructure.database import get_session, get_task_session
+    from app.infrastructure.persistence.entities_configuration import Task as TaskEntity
+
+    with get_task_session(user_id) or get_session() as session:
+        for start in range(0, count, 1000):
+            session.add_all(
+                TaskEntity(
+                    title=f"seeded {i}",
+                    description="seeded benchmark task",
+                    status=TaskStatus.PENDING,
+                    user_id=user_id,
+                )
+                for i in range(start, min(start + 1000, count))
+            )
+            session.commit()
+
+
+async def scenario_pagination(ctx: BenchmarkContext) -> List[ScenarioResult]:
+    """Walk every cursor page of one large task list, then every numbered page."""
+    client = ctx.client
+    page_size = ctx.params["page_size"]
+    deep_tasks = ctx.params["deep_tasks"]
+    user_id = uuid4()
+    seed_tasks(user_id, deep_tasks)
+
+    async def walk_pages(walk: ScenarioResult, **extra_params: str) -> Optional[float]:
+        """Follow next_cursor to the end; returns the last page's latency."""
+        cursor: Optional[str] = None
+        pages = 0
+        started = time.perf_counter()
+        while True:
+            params = {"user_id": str(user_id), "page_size": page_size, **extra_params}
+            if cursor:
+                params["cursor"] = cursor
+            page_started = time.perf_counter()
+            response = await client.get(f"{API}/tasks/", params=params)
+            elapsed_ms = (time.perf_counter() - page_started) * 1000
+            ok = response.status_code == 200
+            walk.record(elapsed_ms, ok)
+            pages += 1
+            if not ok:
+                return None
+            body = response.json()
+            cursor = body.get("next_cursor")
+            if not body.get("has_next_page") or not cursor:
+                walk.wall_time_s = time.perf_counter() - started
+                walk.meta = {"pages": pages, "rows": deep_tasks, **extra_params}
+                return elapsed_ms
+
+    walk = ScenarioResult("tasks.paginate_deep")
+    last_page = ScenarioResult("tasks.paginate_last_page")
+    last_page_ms = await walk_pages(walk)
+    if last_page_ms is not None:
+        last_page.record(last_page_ms, True)
+    last_page.wall_time_s = last_page.latencies_ms[0] / 1000 if last_page.latencies_ms else 0.0
+
+    # The same walk reading only what a list view shows.
+    sparse_walk = ScenarioResult("tasks.paginate_deep_sparse")
+    await walk_pages(sparse_walk, fields="id,title,status")
+
+    # Numbered pages in random order: early jumps seek from few anchors,
+    # later ones find an anchor at or next to the page they ask for.
+    numbered = ScenarioResult("tasks.page_number_random")
+    page_numbers = list(range(1, max(1, -(-deep_tasks // page_size)) + 1))
+    ctx.rng.shuffle(page_numbers)
+    started = time.perf_counter()
+    for page_number in page_numbers:
+        page_started = time.perf_counter()
+        response = await client.get(
+            f"{API}/tasks/pages",
+            params={"user_id": str(user_id), "page_number": page_number, "page_size": page_size},
+        )
+        numbered.record((time.perf_counter() - page_started) * 1000, response.status_code == 200)
+    numbered.wall_time_s = time.perf_counter() - started
+    numbered.meta = {"pages": len(page_numbers), "rows": deep_tasks}
+    return [walk, last_page, sparse_walk, numbered]
+
+
+async def scenario_mixed(ctx: BenchmarkContext) -> List[ScenarioResult]:
+    """Weighted mix of reads and writes issued with full concurrency."""
+    client = ctx.client
+    rng = ctx.rng
+    mixed = ScenarioResult("mixed")
+
+    async def list_first_page() -> bool:
+        user = ctx.random_user()
+        response = await client.get(f"{API}/tasks/", params={"user_id": user["id"]})
+        return response.status_code == 200
+
+    async def get_task() -> bool:
+        user = ctx.random_user()
+        ids = ctx.task_ids.get(user["id"])
+        if not ids:
+            return await list_first_page()
+        response = await client.get(
+            f"{API}/tasks/{rng.choice(ids)}", params={"user_id": user["id"]}
+        )
+        return response.status_code == 200
+
+    async def create_task() -> bool:
+        user = ctx.random_user()
+        response = await client.post(
+            f"{API}/tasks/",
+            json={"title": "mixed", "status": "PENDING", "user_id": user["id"]},
+        )
+        return response.status_code == 200
+
+    async def update_task() -> bool:
+        user = ctx.random_user()
+        ids = ctx.task_ids.get(user["id"])
+        if not ids:
+            return await create_task()
+        task_id = rng.choice(ids)
+        response = await client.put(
+            f"{API}/tasks/{task_id}",
+            params={"user_id": user["id"]},
+            json={
+                "id": task_id,
+                "title": "mixed update",
+                "status": "PENDING",
+                "updated_at": "2024-01-01T00:00:00",
+            },
+        )
+        return response.status_code == 200
+
+    async def sign_in() -> bool:
+        user = ctx.random_user()
+        response = await client.post(
+            f"{API}/auth/signin",
+            json={"email": user["email"], "password": user["password"]},
+        )
+        return response.status_code == 200
+
+    weighted = [
+        (list_first_page, 50),
+        (get_task, 20),
+        (create_task, 15),
+        (update_task, 10),
+        (sign_in, 5),
+    ]
+    population = [op for op, _ in weighted]
+    weights = [weight for _, weight in weighted]
+    operations = rng.choices(population, weights=weights, k=ctx.params["mixed_ops"])
+
+    await run_concurrently(mixed, operations, ctx.params["mixed_concurrency"])
+    mixed.meta = {"concurrency": ctx.params["mixed_concurrency"]}
+    return [mixed]
+
+
+async def scenario_sync(ctx: BenchmarkContext) -> List[ScenarioResult]:
+    """An offline client's edits replayed call by call, then as one batch.
+
+    Each replay creates tasks, updates half of them and deletes a quarter;
+    its latency is the whole replay's. The batch variants name their creates
+    with refs, so the updates and deletes need no ids back from the server.
+    """
+    client = ctx.client
+    creates = max(2, ctx.params["sync_ops"] // 2)
+    operations = [{"op": "create", "ref": f"t{i}", "title": f"offline {i}", "status": "PENDING"} for i in range(creates)]
+    operations += [
+        {"op": "update", "task_ref": f"t{i}", "title": f"offline {i} edited", "status": "COMPLETED"}
+        for i in range(0, creates, 2)
+    ]
+    operations += [{"op": "delete", "task_ref": f"t{i}"} for i in range(1, creates, 4)]
+
+    individual = ScenarioResult("sync.individual")
+
+    def make_replay(user: Dict[str, Any]):
+        async def op() -> bool:
+            ids: Dict[str, str] = {}
+            for operation in operations:
+                if operation["op"] == "create":
+                    response = await client.post(f"{API}/tasks/", json={
+                        "title": operation["title"], "status": operation["status"], "user_id": user["id"],
+                    })
+                    if response.status_code == 200:
+                        ids[operation["ref"]] = response.json()["id"]
+                elif operation["op"] == "update":
+                    task_id = ids[operation["task_ref"]]
+                    response = await client.put(
+                        f"{API}/tasks/{task_id}",
+                        params={"user_id": user["id"]},
+                        json={"id": task_id, "title": operation["title"], "status": operation["status"],
+                              "updated_at": "2024-01-01T00:00:00"},
+                    )
+                else:
+                    response = await client.delete(
+                        f"{API}/tasks/{ids[operation['task_ref']]}", params={"user_id": user["id"]}
+                    )
+                if response.status_code != 200:
+                    return False
+            return True
+
+        return op
+
+    await run_concurrently(individual, [make_replay(u) for u in ctx.users], ctx.params["concurrency"])
+    results = [individual]
+
+    for mode in ("atomic", "best_effort"):
+        batch = ScenarioResult(f"sync.batch_{mode}")
+
+        def make_batch(user: Dict[str, Any]):
+            async def op() -> bool:
+                response = await client.post(
+                    f"{API}/batch", json={"user_id": user["id"], "mode": mode, "operations": operations}
+                )
+                return response.status_code == 200 and response.json()["failed"] == 0
+
+            return op
+
+        await run_concurrently(batch, [make_batch(u) for u in ctx.users], ctx.params["concurrency"])
+        results.append(batch)
+
+    for result in results:
+        result.meta = {"operations_per_replay": len(operations)}
+    return results
+
+
+SCENARIO_FUNCTIONS = {
+    "auth": scenario_auth,
+    "tasks": scenario_tasks,
+    "pagination": scenario_pagination,
+    "mixed": scenario_mixed,
+    "sync": scenario_sync,
+}
+
+
+async def run_suite(params: Dict[str, Any]) -> List[ScenarioResult]:
+    import httpx
+
+    from app.infrastructure.database import create_tables
+    from app.main import app
+
+    create_tables()
+    results: List[ScenarioResult] = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            ctx = BenchmarkContext(client, params)
+            selected = params["scenarios"]
+            # Task, mixed and sync scenarios need the users created by "auth".
+            if "auth" not in selected and {"tasks", "mixed", "sync"} & set(selected):
+                selected = ["auth", *selected]
+            for name in SCENARIOS:
+                if name in selected:
+                    results.extend(await SCENARIO_FUNCTIONS[name](ctx))
+    return results
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument(
+        "--shards", type=int, default=0, help="Spread tasks over N SQLite shard files"
+    )
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=10, help="Tasks per user")
+    parser.add_argument("--deep-tasks", type=int, default=5000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mixed-ops", type=int, default=1000)
+    parser.add_argument("--mixed-concurrency", type=int, default=32)
+    parser.add_argument("--sync-ops", type=int, default=40, help="Operations per offline replay")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", default=str(RESULTS_DIR / "latest.json"))
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed regression fraction"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    database_url = configure_environment(args.database_url, args.shards)
+    params = {
+        "database": database_url.split(":", 1)[0],
+        "shards": args.shards,
+        "users": args.users,
+        "tasks": args.tasks,
+        "deep_tasks": args.deep_tasks,
+        "page_size": args.page_size,
+        "concurrency": args.concurrency,
+        "mixed_ops": args.mixed_ops,
+        "mixed_concurrency": args.mixed_concurrency,
+        "sync_ops": args.sync_ops,
+        "seed": args.seed,
+        "scenarios": args.scenarios,
+    }
+
+    results = asyncio.run(run_suite(params))
+    report = build_report(results, params)
+    print(format_report(report))
+    print(f"\nreport written to {save_report(report, Path(args.output))}")
+
+    if args.save_baseline:
+        path = save_report(report, BASELINES_DIR / f"{args.save_baseline}.json")
+        print(f"baseline written to {path}")
+
+    if args.compare:
+        regressions = compare_reports(report, load_report(args.compare), args.threshold)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nno regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Cold-start benchmark: how long a fresh interpreter takes to import the app and
+to answer its first request.
+
+Usage::
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 20 --save-baseline startup
+    python -m benchmarks.startup --compare benchmarks/baselines/startup.json
+
+Each run is a new subprocess. ``startup.import_app_main`` is the cumulative
+``python -X importtime`` figure for ``app.main``; ``startup.first_response``
+is the wall time from spawning the interpreter until the app, with its
+lifespan started, has answered ``GET /health`` through an ASGI transport.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.harness import (
+    BASELINES_DIR,
+    BENCHMARKS_DIR,
+    RESULTS_DIR,
+    ScenarioResult,
+    build_report,
+    compare_reports,
+    configure_environment,
+    format_report,
+    load_report,
+    save_report,
+)
+
+PROJECT_ROOT = BENCHMARKS_DIR.parent
+
+FIRST_RESPONSE_SCRIPT = """
+import asyncio, httpx
+from app.main import app
+
+async def main():
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/health")
+            assert response.status_code == 200, response.status_code
+    print("ready", flush=True)
+
+asyncio.run(main())
+"""
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Map module name to (self, cumulative) import time in microseconds."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        head, cumulative_us, name = line.split("|")
+        self_us = head.split(":", 1)[1]
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(env: Dict[str, str]) -> Dict[str, Tuple[int, int]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def measure_first_response(env: Dict[str, str]) -> float:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", FIRST_RESPONSE_SCRIPT],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if "ready" not in completed.stdout:
+        raise RuntimeError(completed.stderr)
+    return elapsed_ms
+
+
+def top_modules(samples: List[Dict[str, Tuple[int, int]]], limit: int) -> List[Dict[str, float]]:
+    """Heaviest first-party and third-party top-level imports by median cumulative time."""
+    cumulative: Dict[str, List[int]] = defaultdict(list)
+    for sample in samples:
+        for name, (_, cumulative_us) in sample.items():
+            cumulative[name].append(cumulative_us)
+
+    def median(values: List[int]) -> float:
+        ordered = sorted(values)
+        return ordered[len(ordered) // 2]
+
+    rows = [
+        {"module": name, "cumulative_ms": round(median(values) / 1000, 2)}
+        for name, values in cumulative.items()
+        if name != "app.main" and ("." not in name or name.startswith("app."))
+    ]
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--output", default=str(RESULTS_DIR / "startup.json"))
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="BASELINE_JSON")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    configure_environment()
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT)}
+
+    import_result = ScenarioResult("startup.import_app_main")
+    response_result = ScenarioResult("startup.first_response")
+    samples = []
+    for _ in range(args.runs):
+        sample = measure_import(env)
+        samples.append(sample)
+        import_result.record(sample["app.main"][1] / 1000, True)
+        response_result.record(measure_first_response(env), True)
+
+    report = build_report([import_result, response_result], {"runs": args.runs})
+    report["top_imports"] = top_modules(samples, args.top)
+
+    print(format_report(report))
+    print("\nheaviest imports (median cumulative ms):")
+    for row in report["top_imports"]:
+        print(f"  {row['cumulative_ms']:>9.2f}  {row['module']}")
+    print(f"\nreport written to {save_report(report, Path(args.output))}")
+
+    if args.save_baseline:
+        path = save_report(report, BASELINES_DIR / f"{args.save_baseline}.json")
+        print(f"baseline written to {path}")
+
+    if args.compare:
+        regressions = compare_reports(report, load_report(args.compare), args.threshold)
+        if regressions:
+            print("\nREGRESSIONS:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nno regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
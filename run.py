@@ -1,13 +1,15 @@
 """
 Application startup script.
+
+    python run.py                # development server (reload when DEBUG=true)
+    python run.py --production   # multi-worker server, also used when ENVIRONMENT=production
 """
-import uvicorn
+import sys
 from app.core.config import settings
+from app.core.server import run_development, run_production
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug,
-    )
+    if "--production" in sys.argv[1:] or settings.environment == "production":
+        run_production()
+    else:
+        run_development()
@@ -0,0 +1,27 @@
+"""
+Test settings: a throwaway SQLite primary database, no replica, no shards and
+no rate limiting.
+
+Settings are read from the environment when ``app.core.config`` is first
+imported, so this runs before any test module imports ``app``.
+"""
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix="todolist-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'primary.db')}"
+os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["DATABASE_SHARD_URLS"] = ""
+os.environ["DEBUG"] = "false"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def primary_database():
+    from app.infrastructure.database import create_tables, dispose_engines
+
+    create_tables()
+    yield
+    dispose_engines()
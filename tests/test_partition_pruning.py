@@ -0,0 +1,45 @@
+"""Per-user task queries on a hash-partitioned Postgres ``tasks`` read one partition.
+
+Needs ``TEST_DATABASE_URL``: a throwaway Postgres database, whose tables are
+dropped and created again.
+"""
+import os
+
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlmodel import SQLModel, create_engine
+
+from app.core.config import settings
+from benchmarks.partition_pruning import explain_task_queries
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+pytestmark = [
+    pytest.mark.skipif(
+        not TEST_DATABASE_URL.startswith("postgresql"), reason="TEST_DATABASE_URL is not a Postgres database"
+    ),
+    pytest.mark.skipif(settings.task_partitions < 1, reason="TASK_PARTITIONS is 0: tasks isn't partitioned"),
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(TEST_DATABASE_URL)
+    try:
+        engine.connect().close()
+    except OperationalError as error:
+        engine.dispose()
+        pytest.skip(f"Postgres at TEST_DATABASE_URL is unreachable: {error.orig}")
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def test_user_scoped_task_queries_scan_one_partition(engine):
+    plans = explain_task_queries(engine, users=5, tasks_per_user=10)
+
+    assert plans
+    not_pruned = {summary: sorted(partitions) for summary, partitions in plans if len(partitions) != 1}
+    assert not_pruned == {}
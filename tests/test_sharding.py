@@ -0,0 +1,130 @@
+"""Users' tasks on SQLite shard files: routing, and moving them in a rebalance."""
+from typing import Dict, List
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import func, select
+
+from app.application.services.task_service import TaskService
+from app.domain.constants.TASK_STATUS import TaskStatus
+from app.infrastructure import database
+from app.infrastructure.common.sql_alchemy_unit_of_work import SQLModelUnitOfWork
+from app.infrastructure.dtos.task_dtos import CreateTaskDto
+from app.infrastructure.persistence.entities_configuration import Tag, Task as TaskEntity, TaskTag
+from app.infrastructure.sharding.rebalance import rebalance
+from app.infrastructure.sharding.shard_router import ShardRouter
+
+USERS = 20
+TASKS_PER_USER = 3
+
+
+@pytest.fixture
+def make_router(tmp_path):
+    routers = []
+
+    def make(shards: int) -> ShardRouter:
+        router = ShardRouter(
+            [(f"shard{index}", f"sqlite:///{tmp_path / f'shard{index}.db'}") for index in range(shards)]
+        )
+        router.create_tables()
+        routers.append(router)
+        return router
+
+    yield make
+    for router in routers:
+        router.dispose()
+
+
+@pytest.fixture
+def router(make_router, monkeypatch) -> ShardRouter:
+    router = make_router(2)
+    monkeypatch.setattr(database, "get_shard_router", lambda: router)
+    return router
+
+
+@pytest.fixture
+def user_ids(router) -> List[UUID]:
+    user_ids = [uuid4() for _ in range(USERS)]
+    for user_id in user_ids:
+        for index in range(TASKS_PER_USER):
+            service = TaskService(SQLModelUnitOfWork(database.get_session, shard_key=user_id))
+            service.create_task(CreateTaskDto(
+                title=f"task {index}",
+                status=TaskStatus.PENDING,
+                user_id=user_id,
+                tags=[f"tag{index}", "shared"],
+            ))
+    return user_ids
+
+
+def rows_by_shard(router: ShardRouter, user_id: UUID) -> Dict[str, Dict[str, int]]:
+    """The user's tasks, tags and tag links on each shard that has any."""
+    found = {}
+    for name in router.shard_names:
+        with router.engine_by_name(name).connect() as connection:
+            counts = {
+                "tasks": connection.execute(
+                    select(func.count()).select_from(TaskEntity).where(TaskEntity.user_id == user_id)
+                ).scalar(),
+                "tags": connection.execute(
+                    select(func.count()).select_from(Tag).where(Tag.user_id == user_id)
+                ).scalar(),
+                "task_tags": connection.execute(
+                    select(func.count()).select_from(TaskTag).join(TaskEntity, TaskEntity.id == TaskTag.task_id)
+                    .where(TaskEntity.user_id == user_id)
+                ).scalar(),
+            }
+        if any(counts.values()):
+            found[name] = counts
+    return found
+
+
+def orphan_links(router: ShardRouter) -> int:
+    orphans = 0
+    for name in router.shard_names:
+        with router.engine_by_name(name).connect() as connection:
+            orphans += connection.execute(
+                select(func.count()).select_from(TaskTag)
+                .where(TaskTag.task_id.not_in(select(TaskEntity.id)))
+            ).scalar()
+    return orphans
+
+
+EXPECTED = {"tasks": TASKS_PER_USER, "tags": TASKS_PER_USER + 1, "task_tags": 2 * TASKS_PER_USER}
+
+
+def test_each_user_lives_on_one_shard(router, user_ids):
+    for user_id in user_ids:
+        assert rows_by_shard(router, user_id) == {router.shard_for(user_id): EXPECTED}
+    # Enough users that both shards got some.
+    assert {router.shard_for(user_id) for user_id in user_ids} == set(router.shard_names)
+
+
+def test_reads_go_to_the_owning_shard(router, user_ids):
+    for user_id in user_ids:
+        with SQLModelUnitOfWork(database.get_session, read_only=True, shard_key=user_id) as uow:
+            tasks = uow.tasks.get_all(user_id)
+        assert sorted(task.title for task in tasks) == [f"task {index}" for index in range(TASKS_PER_USER)]
+        assert all("shared" in task.tags for task in tasks)
+
+
+def test_rebalance_moves_tasks_tags_and_links(router, user_ids, make_router):
+    # The two shards keep their files and a third one is added.
+    target = make_router(3)
+
+    plan = rebalance(router, target, batch_size=2)
+
+    moved = {user_id for user_ids in plan.values() for user_id in user_ids}
+    assert moved == {user_id for user_id in user_ids if target.shard_for(user_id) != router.shard_for(user_id)}
+    assert moved
+    for user_id in user_ids:
+        assert rows_by_shard(target, user_id) == {target.shard_for(user_id): EXPECTED}
+    assert orphan_links(target) == 0
+
+
+def test_rebalance_leaves_nothing_to_move(router, user_ids, make_router):
+    target = make_router(3)
+    rebalance(router, target)
+
+    assert rebalance(router, target) == {}
+    assert rebalance(target, target) == {}